@@ -0,0 +1,147 @@
+"""
+Contacted-address Bloom filter benchmark (core/utils/bloom.py).
+
+For each target false-positive rate, builds a ContactedFilter over a
+scratch dedup index holding --contacted outreach addresses, then checks
+that every contacted address is reported (no false negatives) and counts
+how many of --probes never-contacted addresses come back as maybes. The
+measured rate should sit at or below the target while the filter is
+within capacity. Also times a cold batch check (new process state) of
+--batch addresses, --batch-contacted of them already contacted, with
+the filter and its maybes confirmed in the on-disk hash table (as
+AuditAgent.contacted_mask() does) and with the in-memory exact index
+instead, which is what each worker and dashboard process pays on its
+first call.
+
+Exits non-zero if a contacted address is missed or a measured rate is
+above --tolerance times its target (plus three standard deviations of
+sampling noise, which dominates at low rates with few probes).
+
+Usage:
+    python benchmarks/bloom_filter.py --contacted 1000000 --fpr 0.01 0.001 0.0001
+    python benchmarks/bloom_filter.py --contacted 200000 --json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from core.agents.audit_agent import contacted_in_hash_index
+from core.utils.bloom import ContactedFilter
+from core.utils.dedup_index import DedupIndex, OUTREACH, QUEUE
+
+def addresses(count, prefix, seed):
+    rng = random.Random(seed)
+    return [f"{prefix}{i}.{rng.getrandbits(32):08x}@example{i % 997}.com" for i in range(count)]
+
+def write_index(path, contacted, queued):
+    with open(path, 'w', encoding='utf-8') as f:
+        for address in queued:
+            f.write(f"{QUEUE}\t{address}\n")
+        for address in contacted:
+            f.write(f"{OUTREACH}\t{address}\n")
+
+def cold_check(index_path, bloom_path, hash_path, emails, fpr):
+    """One fresh batch check, as a new process does it: (seconds with filter, without)"""
+    started = time.perf_counter()
+    bloom = ContactedFilter(bloom_path, index_path, fpr=fpr)
+    maybe = bloom.contains_many(emails)
+    candidates = [e for e, hit in zip(emails, maybe) if hit]
+    if candidates:
+        contacted_in_hash_index(candidates, index_path, hash_path)
+    with_filter = time.perf_counter() - started
+
+    started = time.perf_counter()
+    DedupIndex(index_path).contains_many(emails, (OUTREACH,))
+    return with_filter, time.perf_counter() - started
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="reachai-bloom-bench-")
+    index_path = os.path.join(workdir, "dedup_index.tsv")
+    contacted = addresses(args.contacted, "sent", args.seed)
+    fresh = addresses(args.probes, "new", args.seed + 1)
+    write_index(index_path, contacted, fresh[: args.probes // 2])  # queued, not contacted
+    hash_path = os.path.join(workdir, "contacted_hash.idx")
+    started = time.perf_counter()
+    contacted_in_hash_index([], index_path, hash_path)
+    hash_build = time.perf_counter() - started
+    already = int(args.batch * args.batch_contacted)
+    batch = contacted[:already] + fresh[: args.batch - already]
+
+    results, ok = [], True
+    try:
+        for fpr in args.fpr:
+            bloom_path = os.path.join(workdir, f"contacted-{fpr}.bloom")
+            bloom = ContactedFilter(bloom_path, index_path, fpr=fpr, capacity=args.capacity or args.contacted)
+            started = time.perf_counter()
+            bloom.sync()
+            build = time.perf_counter() - started
+
+            missed = bloom.contains_many(contacted).count(False)
+            started = time.perf_counter()
+            false_positives = sum(bloom.contains_many(fresh))
+            lookup = (time.perf_counter() - started) / len(fresh)
+            measured = false_positives / len(fresh)
+
+            cold_filter, cold_exact = cold_check(index_path, bloom_path, hash_path, batch, fpr)
+            stats = bloom.stats()
+            noise = 3 * math.sqrt(fpr * (1 - fpr) / len(fresh))
+            passed = missed == 0 and measured <= fpr * args.tolerance + noise
+            ok = ok and passed
+            results.append({
+                "target_fpr": fpr,
+                "measured_fpr": round(measured, 6),
+                "expected_fpr": stats["expected_fpr"],
+                "false_negatives": missed,
+                "hashes": stats["hashes"],
+                "bits_per_entry": round(stats["bits"] / max(args.contacted, 1), 1),
+                "filter_mb": round(stats["bytes"] / (1024 * 1024), 2),
+                "build_s": round(build, 2),
+                "lookup_us": round(lookup * 1e6, 2),
+                "cold_batch_ms": round(cold_filter * 1000, 1),
+                "cold_batch_exact_ms": round(cold_exact * 1000, 1),
+                "passed": passed,
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"contacted": args.contacted, "probes": args.probes, "batch": args.batch,
+            "batch_contacted": args.batch_contacted, "hash_build_s": round(hash_build, 2),
+            "runs": results}, ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the contacted Bloom filter's false-positive rate")
+    parser.add_argument("--contacted", type=int, default=200000, help="Addresses in the filter")
+    parser.add_argument("--probes", type=int, default=200000, help="Never-contacted addresses to look up")
+    parser.add_argument("--fpr", type=float, nargs="+", default=[0.01, 0.001, 0.0001])
+    parser.add_argument("--capacity", type=int, help="Filter capacity (default: --contacted)")
+    parser.add_argument("--batch", type=int, default=5000, help="Addresses in the cold batch check")
+    parser.add_argument("--batch-contacted", type=float, default=0.95,
+                        help="Share of the cold batch already contacted")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed measured/target ratio")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report, ok = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['contacted']:,} contacted, {report['probes']:,} never-contacted probes, "
+              f"hash table built in {report['hash_build_s']}s")
+        for r in report["runs"]:
+            print(f"  target {r['target_fpr']:g}: measured {r['measured_fpr']:.6f} "
+                  f"(expected {r['expected_fpr']:.6f}), {r['false_negatives']} missed, "
+                  f"k={r['hashes']}, {r['bits_per_entry']} bits/entry, {r['filter_mb']} MB, "
+                  f"build {r['build_s']}s, {r['lookup_us']} us/lookup, "
+                  f"cold {report['batch']:,}-address check "
+                  f"({report['batch_contacted']:.0%} contacted) {r['cold_batch_ms']} ms "
+                  f"vs {r['cold_batch_exact_ms']} ms exact  {'ok' if r['passed'] else 'FAIL'}")
+    sys.exit(0 if ok else 1)
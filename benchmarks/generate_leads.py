@@ -0,0 +1,53 @@
+"""
+Synthetic lead generator in the data/recruiters.csv schema.
+
+Rows are deterministic for a given --seed, emails are unique and roles are
+spread across every template family (SAP, AI, software, general) so the
+template selector sees a realistic mix.
+
+Usage:
+    python benchmarks/generate_leads.py --rows 100000 --out /tmp/leads.csv
+"""
+import argparse
+import csv
+import random
+
+COLUMNS = ["first_name", "email", "company", "role_hiring_for", "linkedin", "phone"]
+
+FIRST_NAMES = ["Alex", "Priya", "Jordan", "Mei", "Sam", "Fatima", "Diego", "Olga", "Kwame", "Hana",
+               "Noah", "Aisha", "Lucas", "Yuki", "Omar", "Elena", "Ravi", "Sofia", "Chen", "Maya"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Cyberdyne",
+             "Soylent", "Tyrell", "Wonka", "Aperture", "Massive", "Vandelay", "Pied Piper"]
+ROLES = ["SAP BW Consultant", "SAP S/4 HANA Analyst", "AI Engineer", "GenAI Developer",
+         "Machine Learning Engineer", "Software Engineer", "Backend Developer",
+         "Full-Stack Engineer", "Product Manager", "Data Analyst", "Business Analyst"]
+
+def generate(path, rows, seed=42):
+    """Write `rows` leads to `path`; returns the number written"""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            first = rng.choice(FIRST_NAMES)
+            company = rng.choice(COMPANIES)
+            domain = company.lower().replace(" ", "") + ".test"
+            writer.writerow([
+                first,
+                f"{first.lower()}.{i}@{domain}",
+                company,
+                rng.choice(ROLES),
+                f"https://linkedin.com/in/{first.lower()}-{i}",
+                f"+1555{i % 10_000_000:07d}"
+            ])
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic recruiter leads")
+    parser.add_argument("--rows", type=int, default=1000, help="Number of leads (1k-1M)")
+    parser.add_argument("--out", default="data/bench_recruiters.csv", help="Output CSV path")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    generate(args.out, args.rows, args.seed)
+    print(f"✅ Wrote {args.rows} leads to {args.out}")
@@ -0,0 +1,106 @@
+"""
+Bulk CSV importer throughput benchmark (core/csv-importer).
+
+Generates synthetic leads under vendor-style headers ("First Name",
+"Email Address", "Company Name", "Job Title", ...) with a share of
+repeated and malformed addresses, then imports them into a scratch
+directory with each requested worker count, from an empty queue every
+time. Reports rows/sec, outcome counts and peak RSS.
+
+Usage:
+    python benchmarks/import_csv.py --rows 1000000
+    python benchmarks/import_csv.py --rows 200000 --workers 0 4 --json
+"""
+import argparse
+import csv
+import importlib
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.generate_leads import generate
+
+VENDOR_HEADER = ["First Name", "Email Address", "Company Name", "Job Title", "LinkedIn URL", "Phone Number"]
+
+def build_input(path, rows, duplicate_every, invalid_every, seed):
+    """generate() output with a vendor header, repeats and bad addresses mixed in"""
+    clean_path = f"{path}.clean"
+    generate(clean_path, rows, seed)
+    with open(clean_path, 'r', newline='', encoding='utf-8') as src, \
+            open(path, 'w', newline='', encoding='utf-8') as dst:
+        reader, writer = csv.reader(src), csv.writer(dst)
+        next(reader)
+        writer.writerow(VENDOR_HEADER)
+        previous = None
+        for i, row in enumerate(reader):
+            if duplicate_every and previous and i % duplicate_every == 0:
+                row = row[:1] + [previous[1].upper()] + row[2:]
+            elif invalid_every and i % invalid_every == 0:
+                row = row[:1] + [row[1].replace("@", " at ")] + row[2:]
+            writer.writerow(row)
+            previous = row
+    os.remove(clean_path)
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="reachai-import-bench-")
+    input_path = os.path.join(workdir, "input.csv")
+    build_input(input_path, args.rows, args.duplicate_every, args.invalid_every, args.seed)
+    size_mb = os.path.getsize(input_path) / (1024 * 1024)
+    os.chdir(workdir)
+
+    importer = importlib.import_module("core.csv-importer")
+    dedup_index = importlib.import_module("core.utils.dedup_index")
+    results = []
+    try:
+        for workers in args.workers:
+            shutil.rmtree(os.path.join(workdir, "data"), ignore_errors=True)
+            os.makedirs(os.path.join(workdir, "data"))
+            index = dedup_index.DedupIndex(dedup_index.DEDUP_INDEX)
+            started = time.perf_counter()
+            stats = importer.CSVImporter(workers=workers, batch_size=args.batch_size,
+                                         dedup_index=index).run(input_path)
+            elapsed = time.perf_counter() - started
+            results.append({
+                "workers": workers,
+                "elapsed_s": round(elapsed, 3),
+                "rows_per_sec": round(stats.rows / elapsed),
+                "mb_per_sec": round(size_mb / elapsed, 1),
+                **{k: getattr(stats, k) for k in ("rows", "imported", "duplicates", "invalid_email")},
+            })
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"rows": args.rows, "input_mb": round(size_mb, 1), "peak_rss_mb": peak_rss_mb(), "runs": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the bulk CSV importer")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 4],
+                        help="Worker counts to compare (0 = in-process)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--duplicate-every", type=int, default=20, help="Repeat an address every N rows")
+    parser.add_argument("--invalid-every", type=int, default=50, help="Break an address every N rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['rows']:,} rows, {report['input_mb']} MB, peak RSS {report['peak_rss_mb']} MB")
+        for result in report["runs"]:
+            print(f"  workers={result['workers']}: {result['rows_per_sec']:,} rows/s "
+                  f"({result['mb_per_sec']} MB/s, {result['elapsed_s']}s)  imported {result['imported']:,}  "
+                  f"duplicates {result['duplicates']:,}  invalid {result['invalid_email']:,}")
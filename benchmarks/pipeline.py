@@ -0,0 +1,202 @@
+"""
+End-to-end outreach pipeline benchmark against local stand-ins.
+
+Generates synthetic leads, starts the SMTP sink and fake Groq/Hunter
+endpoints (benchmarks/stubs.py), then drives run_outreach_pipeline with
+delay 0 inside a scratch directory so logs/, data/ and config/ of the
+checkout are never touched. Reports leads/sec, per-stage latency
+percentiles and peak RSS; --json output can be diffed across commits.
+
+Usage:
+    python benchmarks/pipeline.py --rows 1000
+    python benchmarks/pipeline.py --rows 100000 --limit 2000 --groq-latency 0.05 --json --out bench.json
+    python benchmarks/pipeline.py --rows 1000 --discovery-domains 5
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.generate_leads import generate
+from benchmarks.stubs import SMTPSink, FakeGroq, FakeHunter
+
+PERCENTILES = (50, 90, 99)
+
+class StageTimer:
+    """Wraps methods in place and records their wall time per stage"""
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, owner, method, stage):
+        original = getattr(owner, method)
+        samples = self.samples[stage]
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+
+        setattr(owner, method, timed)
+        return original
+
+    def summary(self):
+        return {stage: summarize(values) for stage, values in self.samples.items() if values}
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(values):
+    ordered = sorted(values)
+    stats = {"count": len(ordered), "total_s": round(sum(ordered), 4),
+             "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3)}
+    for pct in PERCENTILES:
+        stats[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 3)
+    stats["max_ms"] = round(ordered[-1] * 1000, 3)
+    return stats
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def configure_env(smtp, groq, hunter):
+    """Point every agent at the stand-ins (set before the agents are built)"""
+    os.environ.update({
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp.port),
+        "SMTP_STARTTLS": "false",
+        "SMTP_EMAIL": "bench@reachai.test",
+        "SMTP_PASSWORD": "bench",
+        "SENDER_NAME": "ReachAI Bench",
+        "GROQ_API_KEY": "bench",
+        "GROQ_BASE_URL": groq.url,
+        "HUNTER_API_KEY": "bench",
+        "HUNTER_API_BASE": hunter.url,
+        "RESUME_PATH": "",
+        "SKIP_INBOX_CHECK": "true",
+    })
+
+def instrument(timer):
+    """Time each pipeline stage; returns the agents to hand to the pipeline"""
+    import main
+    from core.agents.data_agent import DataAgent
+
+    timer.wrap(DataAgent, "iter_leads", "data_load")
+    agents = main.build_agents()
+    timer.wrap(agents["audit"], "has_been_contacted", "contacted_check")
+    timer.wrap(agents["llm"], "generate_email", "draft")
+    timer.wrap(agents["llm"], "_generate_subject", "llm_subject")
+    timer.wrap(agents["email"], "send_email", "smtp_send")
+    timer.wrap(agents["audit"], "log_result", "audit_write")
+    return main, agents
+
+def run_discovery(timer, domains):
+    from core.agents.discovery_agent import DiscoveryAgent
+    from core.utils.discovery_cache import DiscoveryCache
+
+    agent = DiscoveryAgent(progress_callback=lambda msg, type: None,
+                           cache=DiscoveryCache(os.path.join("logs", "bench_discovery_cache.json")))
+    timer.wrap(agent, "find_companies", "discovery_groq")
+    timer.wrap(agent, "get_email_count", "discovery_hunter_count")
+    timer.wrap(agent, "get_contacts", "discovery_hunter_search")
+    started = time.perf_counter()
+    contacts = agent.run_discovery("benchmark companies", max_domains=domains, use_cache=False)
+    return {"domains": domains, "contacts": len(contacts), "elapsed_s": round(time.perf_counter() - started, 3)}
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="reachai-bench-")
+    os.makedirs(os.path.join(workdir, "data"))
+    csv_path = os.path.join(workdir, "data", "recruiters.csv")
+    generate(csv_path, args.rows, args.seed)
+
+    with SMTPSink(latency=args.smtp_latency) as smtp, \
+            FakeGroq(latency=args.groq_latency, companies=max(args.discovery_domains, 1)) as groq, \
+            FakeHunter(latency=args.hunter_latency) as hunter:
+        configure_env(smtp, groq, hunter)
+        os.chdir(workdir)
+
+        timer = StageTimer()
+        main, agents = instrument(timer)
+
+        started = time.perf_counter()
+        summary = main.run_outreach_pipeline(csv_path, "Benchmark bio", delay=0, limit=args.limit,
+                                             force=True, agents=agents, skip_inbox=True)
+        elapsed = time.perf_counter() - started
+
+        discovery = run_discovery(timer, args.discovery_domains) if args.discovery_domains else None
+
+        return {
+            "commit": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "rows": args.rows,
+            "limit": args.limit,
+            "latency_s": {"smtp": args.smtp_latency, "groq": args.groq_latency, "hunter": args.hunter_latency},
+            "pipeline": summary,
+            "elapsed_s": round(elapsed, 3),
+            "leads_per_sec": round(summary.get("processed", 0) / elapsed, 2) if elapsed else None,
+            "stages": timer.summary(),
+            "smtp_messages": smtp.messages,
+            "groq_requests": groq.requests,
+            "hunter_requests": hunter.requests,
+            "discovery": discovery,
+            "peak_rss_mb": peak_rss_mb(),
+            "workdir": workdir,
+        }
+
+def print_report(report):
+    print(f"ReachAI pipeline benchmark @ {report['commit']} ({report['rows']} leads)")
+    print(f"  processed {report['pipeline'].get('processed', 0)} in {report['elapsed_s']:.2f}s "
+          f"-> {report['leads_per_sec']} leads/s, peak RSS {report['peak_rss_mb']} MB")
+    print(f"  {'stage':26} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'total s':>9}")
+    for stage, stats in report["stages"].items():
+        print(f"  {stage:26} {stats['count']:7d} {stats['p50_ms']:9.2f} {stats['p90_ms']:9.2f} "
+              f"{stats['p99_ms']:9.2f} {stats['total_s']:9.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ReachAI end-to-end pipeline benchmark")
+    parser.add_argument("--rows", type=int, default=1000, help="Synthetic leads to generate (1k-1M)")
+    parser.add_argument("--limit", type=int, help="Stop after this many sends (batch size)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--smtp-latency", type=float, default=0.0, help="Seconds added per SMTP DATA")
+    parser.add_argument("--groq-latency", type=float, default=0.0, help="Seconds added per Groq request")
+    parser.add_argument("--hunter-latency", type=float, default=0.0, help="Seconds added per Hunter request")
+    parser.add_argument("--discovery-domains", type=int, default=0,
+                        help="Also run DiscoveryAgent over this many fake domains")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--out", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)  # the per-lead log lines would dominate the timings
+
+    out_path = os.path.abspath(args.out) if args.out else None  # run() changes directory
+    report = run(args)
+
+    if out_path:
+        with open(out_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
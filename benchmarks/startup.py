@@ -0,0 +1,107 @@
+"""
+Cold-start benchmark for the ReachAI entry points.
+
+Runs each entry point's import in a fresh interpreter with `-X importtime`,
+sums the per-module self times and fails (exit code 1) when a budget is
+exceeded or a heavy dependency (pandas, groq, ...) sneaks back into the
+import path.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 5 --budget-main 150 --budget-dashboard 600 --json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay lazy: importing the entry point alone must not load them
+HEAVY_MODULES = ("pandas", "numpy", "groq", "pytz")
+
+TARGETS = {
+    "main": "import main",
+    "dashboard": "import web_dashboard",
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(statement):
+    """Import once in a fresh interpreter; returns (import_ms, wall_ms, modules)"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed:\n{proc.stderr[-2000:]}")
+
+    self_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us += int(match.group(1))
+            modules.add(match.group(4).split(".")[0])
+    return self_us / 1000, wall_ms, modules
+
+def run(runs, budgets):
+    report = {"python": sys.version.split()[0], "runs": runs, "targets": {}}
+    failures = []
+
+    for name, statement in TARGETS.items():
+        samples, walls, modules = [], [], set()
+        for _ in range(runs):
+            import_ms, wall_ms, loaded = measure(statement)
+            samples.append(import_ms)
+            walls.append(wall_ms)
+            modules |= loaded
+
+        heavy = sorted(m for m in HEAVY_MODULES if m in modules)
+        median_ms = statistics.median(samples)
+        report["targets"][name] = {
+            "import_ms_median": round(median_ms, 1),
+            "import_ms_min": round(min(samples), 1),
+            "wall_ms_median": round(statistics.median(walls), 1),
+            "budget_ms": budgets[name],
+            "heavy_modules": heavy,
+        }
+
+        if median_ms > budgets[name]:
+            failures.append(f"{name}: import {median_ms:.1f} ms > budget {budgets[name]} ms")
+        if heavy:
+            failures.append(f"{name}: heavy modules imported at startup: {', '.join(heavy)}")
+
+    report["failures"] = failures
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ReachAI cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target")
+    parser.add_argument("--budget-main", type=float, default=float(os.getenv("STARTUP_BUDGET_MAIN_MS", 150)),
+                        help="Import budget for main.py in ms")
+    parser.add_argument("--budget-dashboard", type=float, default=float(os.getenv("STARTUP_BUDGET_DASHBOARD_MS", 600)),
+                        help="Import budget for web_dashboard.py in ms")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.runs, {"main": args.budget_main, "dashboard": args.budget_dashboard})
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, result in report["targets"].items():
+            print(f"{name:10} import {result['import_ms_median']:7.1f} ms (min {result['import_ms_min']:.1f}, "
+                  f"budget {result['budget_ms']:.0f})  wall {result['wall_ms_median']:.1f} ms")
+        for failure in report["failures"]:
+            print(f"❌ {failure}")
+        if not report["failures"]:
+            print("✅ Startup within budget")
+
+    sys.exit(1 if report["failures"] else 0)
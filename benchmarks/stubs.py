@@ -0,0 +1,235 @@
+"""
+Local stand-ins for the external services the pipeline talks to.
+
+- SMTPSink:    minimal ESMTP server (EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA)
+               that accepts and counts messages. No TLS: point EmailAgent at
+               it with SMTP_STARTTLS=false.
+- FakeGroq:    OpenAI-compatible /openai/v1/chat/completions with configurable
+               latency. The groq SDK picks it up from GROQ_BASE_URL.
+- FakeHunter:  /v2/email-count and /v2/domain-search with paging.
+               DiscoveryAgent picks it up from HUNTER_API_BASE.
+
+Every server binds 127.0.0.1 on a free port and runs on a daemon thread:
+
+    with SMTPSink() as smtp, FakeGroq(latency=0.05) as groq:
+        os.environ["SMTP_PORT"] = str(smtp.port)
+        os.environ["GROQ_BASE_URL"] = groq.url
+"""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class _ThreadedServer:
+    """Start/stop plumbing shared by the stand-ins"""
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+# --- SMTP ---
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    # Multi-line replies go out as several small writes; Nagle + delayed ACK
+    # would add ~40 ms to every command
+    disable_nagle_algorithm = True
+
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        sink = self.server.sink
+        self._reply("220 reachai-bench ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb == "EHLO":
+                self._reply("250-reachai-bench")
+                self._reply("250-AUTH PLAIN LOGIN")
+                self._reply("250 8BITMIME")
+            elif verb == "HELO":
+                self._reply("250 reachai-bench")
+            elif verb == "AUTH":
+                parts = command.split()
+                mechanism = parts[1].upper() if len(parts) > 1 else ""
+                if mechanism == "PLAIN" and len(parts) == 2:
+                    self._reply("334 ")
+                    self.rfile.readline()
+                elif mechanism == "LOGIN":
+                    self._reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                sink.logins += 1
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b".\r\n", b".\n"):
+                        break
+                    size += len(chunk)
+                if sink.latency:
+                    time.sleep(sink.latency)
+                sink.record(size)
+                self._reply("250 OK queued")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SMTPSink(_ThreadedServer):
+    """Accepts every message; `latency` seconds are added per DATA"""
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.messages = 0
+        self.bytes = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+        self.server = _TCPServer((host, port), _SMTPHandler)
+        self.server.sink = self
+
+    def record(self, size):
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+# --- HTTP stand-ins ---
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self._send(*self.server.stub.handle("GET", url.path, parse_qs(url.query), None))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self._send(*self.server.stub.handle("POST", url.path, parse_qs(url.query), payload))
+
+class _HTTPStub(_ThreadedServer):
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _JSONHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def handle(self, method, path, query, payload):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(method, path, query, payload)
+
+    def respond(self, method, path, query, payload):
+        raise NotImplementedError
+
+class FakeGroq(_HTTPStub):
+    """
+    Chat completions: JSON-mode requests get a {"companies": [...]} object
+    with `companies` entries, everything else a one-line subject.
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, companies=5):
+        super().__init__(host, port, latency)
+        self.companies = companies
+
+    def respond(self, method, path, query, payload):
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": f"Unknown route {path}"}}
+
+        if (payload.get("response_format") or {}).get("type") == "json_object":
+            content = json.dumps({"companies": [
+                {"name": f"Bench Co {i}", "domain": f"benchco{i}.test", "country": "USA",
+                 "reason": "Synthetic benchmark company"}
+                for i in range(self.companies)
+            ]})
+        else:
+            content = "Building reliable systems at your team"
+
+        return 200, {
+            "id": f"chatcmpl-bench-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        }
+
+class FakeHunter(_HTTPStub):
+    """Every domain has `contacts` HR contacts, served in limit/offset pages"""
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, contacts=25):
+        super().__init__(host, port, latency)
+        self.contacts = contacts
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/v2"
+
+    def respond(self, method, path, query, payload):
+        domain = (query.get("domain") or ["unknown.test"])[0]
+        if path.endswith("/email-count"):
+            return 200, {"data": {"total": self.contacts, "personal_emails": self.contacts,
+                                  "generic_emails": 0, "department": {"hr": self.contacts},
+                                  "seniority": {}}}
+        if path.endswith("/domain-search"):
+            limit = int((query.get("limit") or [10])[0])
+            offset = int((query.get("offset") or [0])[0])
+            emails = [{
+                "value": f"recruiter{i}@{domain}",
+                "first_name": f"Recruiter{i}",
+                "last_name": "Bench",
+                "position": "Technical Recruiter",
+                "department": "hr",
+                "seniority": "senior",
+                "confidence": 90
+            } for i in range(offset, min(offset + limit, self.contacts))]
+            return 200, {"data": {"domain": domain, "emails": emails}, "meta": {"results": self.contacts}}
+        return 404, {"errors": [{"details": f"Unknown route {path}"}]}
@@ -1,25 +1,62 @@
-import pandas as pd
+import csv
 import datetime
+import importlib
 import os
+from core.utils.dedup_index import get_dedup_index, log_stamp, OUTREACH
+from core.utils import columnar, metrics
+from core.utils.filelock import FileLock
+
+DEFAULT_LOG_PATH = "logs/outreach_log.csv"
+
+# On-disk hash table (core/csv-importer's HashIndex) that confirms Bloom filter
+# maybes one address at a time; kept apart from the importer's own table so a
+# long import doesn't hold up contacted checks
+CONTACTED_INDEX = os.path.join("data", "contacted_hash.idx")
+
+# Always allowed to be contacted again (used for test sends)
+TEST_EXCEPTIONS = {"rikinshahindia@gmail.com", "rikinshahusa@gmail.com", "rikin@reachai.net", "rshah88@asu.edu"}
+
+LOG_COLUMNS = [
+    'timestamp', 'email', 'company', 'status', 'subject',
+    'error', 'has_attachment', 'template_used', 'scheduled_time'
+]
+
+def contacted_in_hash_index(addresses, source, path=CONTACTED_INDEX):
+    """
+    Outreach flags for canonical addresses, probed in the hash table at
+    `path` after replaying the dedup index lines appended since the last
+    check; only the probed pages are read.
+    """
+    hash_index = importlib.import_module("core.csv-importer.hash_index")
+    outreach = hash_index.FLAGS[OUTREACH]
+    with FileLock(path), hash_index.HashIndex(path, source) as table:
+        table.sync()
+        return [bool(table.flags(hash_index.key_of(address)) & outreach) for address in addresses]
 
 class AuditAgent:
     """
     Tracks outreach status, logs results, and handles retries.
+    Writes hold an exclusive FileLock on the log so several pipeline
+    processes (main.py --workers) can share it.
     """
-    def __init__(self, log_path="logs/outreach_log.csv"):
+    def __init__(self, log_path=DEFAULT_LOG_PATH):
         self.log_path = log_path
         self._init_log()
 
     def _init_log(self):
-        if not os.path.exists(self.log_path):
-            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
-            df = pd.DataFrame(columns=[
-                'timestamp', 'email', 'company', 'status', 'subject', 
-                'error', 'has_attachment', 'template_used', 'scheduled_time'
-            ])
-            df.to_csv(self.log_path, index=False)
+        if os.path.exists(self.log_path):
+            return
+        os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+        with FileLock(self.log_path):
+            if not os.path.exists(self.log_path):
+                with open(self.log_path, 'w', newline='') as f:
+                    csv.writer(f).writerow(LOG_COLUMNS)
 
     def log_result(self, email, company, status, subject=None, error=None, has_attachment=False, template_used=None, scheduled_time=None):
+        with metrics.timer("audit_write"):
+            self._append_result(email, company, status, subject, error, has_attachment, template_used, scheduled_time)
+
+    def _append_result(self, email, company, status, subject, error, has_attachment, template_used, scheduled_time):
         new_entry = {
             'timestamp': datetime.datetime.now().isoformat(),
             'email': email,
@@ -31,22 +68,73 @@ class AuditAgent:
             'template_used': template_used,
             'scheduled_time': scheduled_time
         }
-        df = pd.read_csv(self.log_path)
-        df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-        df.to_csv(self.log_path, index=False)
+        # Append one row (column order taken from the existing header)
+        with FileLock(self.log_path):
+            in_sync = self._index_in_sync()
+            with open(self.log_path, 'r', newline='') as f:
+                header = next(csv.reader(f), None) or LOG_COLUMNS
+            with open(self.log_path, 'a', newline='') as f:
+                csv.DictWriter(f, fieldnames=header, extrasaction='ignore').writerow(
+                    {k: ('' if v is None else v) for k, v in new_entry.items()}
+                )
+            if status == 'SENT':
+                get_dedup_index().add(email, OUTREACH)
+            if in_sync:
+                get_dedup_index().set_outreach_stamp(log_stamp(self.log_path))
 
     def mark_as_replied(self, email):
         """Mark a recruiter as having replied"""
-        df = pd.read_csv(self.log_path)
-        df.loc[df['email'] == email, 'status'] = 'REPLIED'
-        df.to_csv(self.log_path, index=False)
+        import pandas as pd
+        with FileLock(self.log_path):
+            in_sync = self._index_in_sync()
+            df = pd.read_csv(self.log_path)
+            df.loc[df['email'] == email, 'status'] = 'REPLIED'
+            tmp_path = f"{self.log_path}.tmp"
+            df.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.log_path)
+            get_dedup_index().add(email, OUTREACH)
+            if in_sync:
+                get_dedup_index().set_outreach_stamp(log_stamp(self.log_path))
+
+    def _uses_index(self):
+        return os.path.abspath(self.log_path) == os.path.abspath(DEFAULT_LOG_PATH)
+
+    def _index_in_sync(self):
+        """Whether the index's OUTREACH entries still describe this log (only the default log has them)"""
+        return self._uses_index() and get_dedup_index().outreach_stamp() == log_stamp(self.log_path)
+
+    def sync_index(self):
+        """
+        Rebuild the dedup index's OUTREACH entries from the default log if
+        the log was replaced, truncated, deleted or edited outside this
+        class since they were recorded (its inode and size no longer match
+        the stamp kept with them), so a cleaned log makes its leads
+        contactable again. Returns False if the log couldn't be read;
+        callers then check the log itself.
+        """
+        if self._index_in_sync():
+            return True
+        try:
+            with FileLock(self.log_path):
+                if not self._index_in_sync():
+                    get_dedup_index().resync_outreach(self.contacted_emails(), log_stamp(self.log_path))
+        except (OSError, ValueError, csv.Error):
+            return False
+        return True
+
+    def read_log(self, columns=None):
+        """
+        The log as a DataFrame, limited to `columns`; large logs are read
+        from the memory-mapped columnar mirror (core.utils.columnar).
+        """
+        return columnar.read_csv(self.log_path, columns)
 
     def get_stats(self):
         """Get summary statistics for dashboard"""
         if not os.path.exists(self.log_path):
             return {'total': 0, 'sent': 0, 'failed': 0, 'replied': 0}
         
-        df = pd.read_csv(self.log_path)
+        df = self.read_log(['status'])
         return {
             'total': len(df),
             'sent': len(df[df['status'] == 'SENT']),
@@ -56,32 +144,88 @@ class AuditAgent:
 
     def get_recent_activity(self, limit=10):
         """Get recent activity for dashboard"""
+        import pandas as pd
         if not os.path.exists(self.log_path):
             return []
         
-        df = pd.read_csv(self.log_path)
+        if columnar.enabled_for(self.log_path):
+            # Only the last rows are converted; the rest stays mapped on disk
+            table = columnar.read_table(self.log_path)
+            df = table.slice(max(table.num_rows - limit, 0)).to_pandas()
+        else:
+            df = pd.read_csv(self.log_path)
         # Handle NaN values to ensure valid JSON
-        df = df.where(pd.notnull(df), None)
+        df = df.astype(object).where(pd.notnull(df), None)
         recent = df.tail(limit).to_dict('records')
         return list(reversed(recent))
 
     def has_been_contacted(self, email):
         """Check if a recruiter has already been contacted (with test exceptions)"""
-        # Test exceptions: always allow these to be contacted multiple times
-        test_exceptions = ["rikinshahindia@gmail.com", "rikinshahusa@gmail.com", "rikin@reachai.net", "rshah88@asu.edu"]
-        if email.lower() in [e.lower() for e in test_exceptions]:
-            return False
-            
+        return self.contacted_mask([email])[0]
+
+    def contacted_mask(self, emails):
+        """
+        has_been_contacted() for a batch of addresses, as a list of bools.
+        The default log is mirrored by the shared dedup index (SENT/REPLIED
+        rows), so this costs one lookup per address, not a log scan; the
+        contacted Bloom filter (core.utils.bloom) answers most never-contacted
+        addresses and its maybes are probed in a memory-mapped hash table,
+        so the index is never loaded into the process. The mirror is checked
+        against the log first (sync_index) and the log read directly if it
+        can't be brought up to date.
+        """
+        if self._uses_index() and self.sync_index():
+            contacted = self._contacted_in_index(emails)
+        else:
+            known = self.contacted_emails()
+            contacted = [email in known for email in emails]
+        return [hit and str(email).lower() not in TEST_EXCEPTIONS for email, hit in zip(emails, contacted)]
+
+    @staticmethod
+    def _contacted_in_index(emails):
+        """Outreach membership: Bloom filter first, its maybes confirmed in CONTACTED_INDEX"""
+        from core.utils.bloom import get_contacted_filter
+        index = get_dedup_index()
+        addresses = [index.canonical(e) for e in emails]
+        bloom = get_contacted_filter()
+        maybe = bloom.contains_many(addresses) if bloom else None
+        if maybe is None:
+            return index.contains_many(emails, (OUTREACH,))
+        candidates = [address for address, hit in zip(addresses, maybe) if hit]
+        if not candidates:
+            return maybe
+        exact = iter(contacted_in_hash_index(candidates, index.path))
+        return [hit and next(exact) for hit in maybe]
+
+    def contacted_emails(self):
+        """Every address with a SENT or REPLIED row, read in one pass"""
         if not os.path.exists(self.log_path):
-            return False
-        
-        df = pd.read_csv(self.log_path)
-        # Only count if status is SENT or REPLIED (ignore TEST or FAILED)
-        contacted_df = df[df['status'].isin(['SENT', 'REPLIED'])]
-        return email in contacted_df['email'].values
+            return set()
+        if columnar.enabled_for(self.log_path):
+            df = self.read_log(['email', 'status']).dropna()
+            return set(df.loc[df['status'].isin(['SENT', 'REPLIED']), 'email'])
+        with FileLock(self.log_path, shared=True):
+            with open(self.log_path, 'r', newline='') as f:
+                return {row['email'] for row in csv.DictReader(f)
+                        if row.get('status') in ('SENT', 'REPLIED') and row.get('email')}
+
+    def count_sent_since(self, since):
+        """Emails sent (SENT or since REPLIED) at or after the `since` datetime"""
+        if not os.path.exists(self.log_path):
+            return 0
+        since = since.isoformat()
+        if columnar.enabled_for(self.log_path):
+            df = self.read_log(['status', 'timestamp']).fillna('')
+            return int((df['status'].isin(['SENT', 'REPLIED']) & (df['timestamp'] >= since)).sum())
+        with FileLock(self.log_path, shared=True):
+            with open(self.log_path, 'r', newline='') as f:
+                # ISO timestamps compare correctly as strings
+                return sum(1 for row in csv.DictReader(f)
+                           if row.get('status') in ('SENT', 'REPLIED') and (row.get('timestamp') or '') >= since)
 
     def get_pending_follow_ups(self, days_limit=3):
         """Get recruiters who need follow-ups"""
+        import pandas as pd
         if not os.path.exists(self.log_path):
             return []
         
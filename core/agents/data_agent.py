@@ -1,27 +1,141 @@
-import pandas as pd
+import csv
 import os
 import logging
+from itertools import chain, islice
+
+from core.agents.lead import Lead, leads_from_frame
+from core.utils import columnar
+
+# Files below this size are parsed with the csv module instead of pandas,
+# which saves the pandas import (~0.5s) for typical small batches
+LIGHTWEIGHT_CSV_MAX_BYTES = int(os.getenv("LIGHTWEIGHT_CSV_MAX_BYTES", 1024 * 1024))
+
+# Rows parsed (and validated) per step by iter_leads()
+DEFAULT_CHUNKSIZE = 10000
 
 class DataAgent:
     """
     Ingests and validates recruiter data from CSV.
+    Valid rows come out as Lead records (missing values are None).
     """
     def __init__(self, csv_path):
         self.csv_path = csv_path
         self.required_columns = ['first_name', 'email', 'company', 'role_hiring_for']
+        self.excluded = 0  # rows dropped by the last iter_leads(exclude=...)
         
     def load_data(self):
         if not os.path.exists(self.csv_path):
             raise FileNotFoundError(f"CSV file not found at {self.csv_path}")
         
+        if os.path.getsize(self.csv_path) <= LIGHTWEIGHT_CSV_MAX_BYTES:
+            return self._load_small(self.csv_path)
+        
+        if columnar.enabled_for(self.csv_path):
+            return self.validate(columnar.read_frame(self.csv_path))
+        
+        import pandas as pd
         df = pd.read_csv(self.csv_path)
         return self.validate(df)
 
-    def validate(self, df):
-        # Check for missing columns
-        missing_cols = [col for col in self.required_columns if col not in df.columns]
+    def pending_leads(self, exclude, limit=None, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        The next `limit` leads not matched by `exclude` (e.g.
+        AuditAgent.contacted_mask); reading stops as soon as enough are found.
+        """
+        return list(islice(self.iter_leads(chunksize, exclude=exclude), limit))
+
+    def iter_leads(self, chunksize=DEFAULT_CHUNKSIZE, exclude=None):
+        """
+        Stream validated records without loading the whole file: rows are
+        parsed and validated `chunksize` at a time and yielded lazily, so
+        memory stays flat and the first lead is available right away.
+        `exclude(emails) -> [bool]` anti-joins each chunk in one call
+        (already contacted leads); dropped rows are counted in self.excluded.
+        Missing file/columns raise here, before iteration starts.
+        """
+        self.excluded = 0
+        if not os.path.exists(self.csv_path):
+            raise FileNotFoundError(f"CSV file not found at {self.csv_path}")
+
+        if os.path.getsize(self.csv_path) <= LIGHTWEIGHT_CSV_MAX_BYTES:
+            f = open(self.csv_path, 'r', newline='', encoding='utf-8')
+            reader = csv.DictReader(f)
+            try:
+                self._check_columns(reader.fieldnames or [])
+            except ValueError:
+                f.close()
+                raise
+            return self._iter_small(f, reader, chunksize, exclude)
+
+        if columnar.enabled_for(self.csv_path):
+            # Memory-mapped Arrow mirror: no text parsing once it is built
+            self._check_columns(columnar.columns_of(self.csv_path))
+            return self._iter_chunks(columnar.iter_frames(self.csv_path, chunksize), exclude)
+
+        import pandas as pd
+        # Strings only: no per-chunk dtype inference, and phone numbers keep their zeros
+        chunks = pd.read_csv(self.csv_path, chunksize=chunksize, dtype=str)
+        try:
+            first = next(chunks)
+        except StopIteration:
+            first = pd.DataFrame(columns=self.required_columns)
+        self._check_columns(first.columns)
+        return self._iter_chunks(chain([first], chunks), exclude)
+
+    def _check_columns(self, columns):
+        missing_cols = [col for col in self.required_columns if col not in columns]
         if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
+
+    def _iter_small(self, f, reader, chunksize, exclude):
+        with f:
+            while True:
+                rows = list(islice(reader, chunksize))
+                if not rows:
+                    return
+                records = [record for record in map(self._clean_row, rows) if record]
+                if exclude is not None:
+                    mask = exclude([record['email'] for record in records])
+                    self.excluded += sum(mask)
+                    records = [record for record, hit in zip(records, mask) if not hit]
+                yield from records
+
+    def _iter_chunks(self, chunks, exclude):
+        for chunk in chunks:
+            yield from self._chunk_records(chunk, exclude)
+
+    def _chunk_records(self, df, exclude=None):
+        """Validate one chunk (same rules as validate()) into Leads"""
+        clean_df = df.dropna(subset=self.required_columns)
+        clean_df = clean_df[clean_df['email'].str.contains('@')]
+        if exclude is not None and len(clean_df):
+            mask = exclude(clean_df['email'].tolist())
+            self.excluded += sum(mask)
+            clean_df = clean_df[[not hit for hit in mask]]
+        return leads_from_frame(clean_df)
+
+    def _clean_row(self, row):
+        # Empty cells become None (pandas would give NaN)
+        lead = Lead.from_record(row)
+        if any(lead[col] is None for col in self.required_columns):
+            return None
+        if '@' not in lead.email:
+            return None
+        return lead
+
+    def _load_small(self, path):
+        """Pandas-free path with the same validation rules as validate()"""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            self._check_columns(reader.fieldnames or [])
+            records = [record for record in map(self._clean_row, reader) if record]
+        
+        logging.info(f"Loaded {len(records)} valid recruiter records.")
+        return records
+
+    def validate(self, df):
+        # Check for missing columns
+        self._check_columns(df.columns)
         
         # Drop rows with missing critical info
         clean_df = df.dropna(subset=self.required_columns)
@@ -30,7 +144,7 @@ class DataAgent:
         clean_df = clean_df[clean_df['email'].str.contains('@')]
         
         logging.info(f"Loaded {len(clean_df)} valid recruiter records.")
-        return clean_df.to_dict('records')
+        return leads_from_frame(clean_df)
 
 if __name__ == "__main__":
     # Test logic
@@ -1,23 +1,54 @@
 import os
-import requests
 import json
-from groq import Groq
 from dotenv import load_dotenv
+from core.utils.discovery_cache import DiscoveryCache
+from core.utils import metrics
 
 load_dotenv()
 
+HUNTER_API_BASE = os.getenv("HUNTER_API_BASE", "https://api.hunter.io/v2")
+
+# Departments and seniority levels accepted by Hunter.io's domain-search filters
+HUNTER_DEPARTMENTS = {
+    'executive', 'it', 'finance', 'management', 'sales', 'legal', 'support', 'hr',
+    'marketing', 'communication', 'education', 'design', 'health', 'operations'
+}
+HUNTER_SENIORITIES = {'junior', 'senior', 'executive'}
+
+# Default server-side filters: recruiters, founders/execs and tech leads only
+DEFAULT_HUNTER_FILTERS = {
+    "department": ["hr", "executive", "it", "management"],
+    "seniority": [],
+    "type": "personal",
+    "limit": 10,
+    "offset": 0,
+    "max_results": 10
+}
+
+def _as_int(value, default):
+    """int(value), or `default` for anything non-numeric (filters arrive as dashboard strings)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return default
+
 class DiscoveryAgent:
     """
     Handles automated discovery with live progress updates:
     1. AI finds companies based on a query.
     2. Hunter.io finds contacts at those companies.
     """
-    def __init__(self, progress_callback=None):
+    def __init__(self, progress_callback=None, cache=None):
+        from groq import Groq  # heavy import, only paid when discovery actually runs
         self.groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.hunter_api_key = os.getenv("HUNTER_API_KEY")
         self.model = "llama-3.1-8b-instant"
         self.progress_callback = progress_callback or (lambda msg, type: print(f"[{type}] {msg}"))
         self.errors = []
+        self.cache = cache or DiscoveryCache()
     
     def log(self, message, msg_type="info"):
         """Send progress update"""
@@ -25,11 +56,18 @@ class DiscoveryAgent:
         if msg_type == "error":
             self.errors.append(message)
 
-    def find_companies(self, query, limit=5):
+    def find_companies(self, query, limit=5, use_cache=True):
         """
         Step 1: AI finds target companies based on user direction.
         Returns a list of companies with domains.
+        Results are cached per normalized query + limit (see DiscoveryCache).
         """
+        if use_cache:
+            cached = self.cache.get_companies(query, limit)
+            if cached is not None:
+                self.log(f"⚡ Using cached AI results for '{query}' ({len(cached)} companies)", "ai")
+                return cached
+        
         self.log(f"🤖 AI is analyzing query: '{query}'", "ai")
         
         prompt = f"""You are a B2B lead generation expert specializing in US-based companies. Find exactly {limit} real companies that match this criteria:
@@ -62,15 +100,16 @@ Example format:
         try:
             self.log("🧠 Calling Groq AI to find relevant companies...", "ai")
             
-            completion = self.groq_client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are a B2B lead generation expert. Output only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model,
-                response_format={"type": "json_object"},
-                temperature=0.7
-            )
+            with metrics.timer("groq_find_companies"):
+                completion = self.groq_client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": "You are a B2B lead generation expert. Output only valid JSON."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    model=self.model,
+                    response_format={"type": "json_object"},
+                    temperature=0.7
+                )
             
             content = completion.choices[0].message.content.strip()
             data = json.loads(content)
@@ -83,6 +122,7 @@ Example format:
                 companies = data
             
             if companies:
+                self.cache.put_companies(query, limit, companies)
                 self.log(f"✅ AI found {len(companies)} companies matching your query", "success")
                 for i, c in enumerate(companies, 1):
                     reason = c.get('reason', 'Matches query criteria')
@@ -99,43 +139,146 @@ Example format:
             self.log(f"❌ AI error: {str(e)}", "error")
             return []
 
-    def get_contacts(self, domain, company_name=""):
+    @staticmethod
+    def build_filters(filters=None):
+        """
+        Merge per-query Hunter.io filters with the defaults.
+        Unknown departments/seniorities are dropped and paging values clamped
+        to what the API accepts (limit 1-100); non-numeric ones fall back to
+        the defaults.
+        """
+        merged = dict(DEFAULT_HUNTER_FILTERS)
+        if isinstance(filters, dict):
+            merged.update({k: v for k, v in filters.items() if v is not None})
+        
+        for key, allowed in (("department", HUNTER_DEPARTMENTS), ("seniority", HUNTER_SENIORITIES)):
+            values = merged.get(key) or []
+            if isinstance(values, str):
+                values = values.split(',')
+            if not isinstance(values, (list, tuple)):
+                values = []
+            values = [str(v).strip().lower() for v in values]
+            merged[key] = [v for v in values if v in allowed]
+        
+        if merged.get("type") not in ("personal", "generic"):
+            merged["type"] = None
+        
+        merged["limit"] = max(1, min(_as_int(merged.get("limit") or 10, 10), 100))
+        merged["offset"] = max(0, _as_int(merged.get("offset") or 0, 0))
+        merged["max_results"] = max(1, _as_int(merged.get("max_results") or merged["limit"], merged["limit"]))
+        return merged
+
+    def _search_params(self, domain, filters):
+        """Build the domain-search query string from normalized filters"""
+        params = {
+            "domain": domain,
+            "api_key": self.hunter_api_key,
+            "limit": filters["limit"],
+            "offset": filters["offset"]
+        }
+        if filters["department"]:
+            params["department"] = ",".join(filters["department"])
+        if filters["seniority"]:
+            params["seniority"] = ",".join(filters["seniority"])
+        if filters["type"]:
+            params["type"] = filters["type"]
+        return params
+
+    def get_email_count(self, domain, filters=None):
+        """
+        Free Hunter.io pre-check (email-count does not consume credits).
+        Returns how many contacts match the department filter, or None if the
+        count could not be fetched (callers should then search anyway).
+        """
+        import requests
+        filters = filters or self.build_filters()
+        
+        try:
+            with metrics.timer("hunter_email_count"):
+                response = requests.get(
+                    f"{HUNTER_API_BASE}/email-count",
+                    params={"domain": domain, "api_key": self.hunter_api_key},
+                    timeout=10
+                )
+            if response.status_code != 200:
+                metrics.count_error("hunter_email_count")
+                return None
+            
+            data = response.json().get('data', {})
+            total = data.get('total', 0) or 0
+            if filters["type"] == "personal":
+                total = data.get('personal_emails', total) or 0
+            elif filters["type"] == "generic":
+                total = data.get('generic_emails', total) or 0
+            
+            if filters["department"]:
+                by_department = data.get('department', {}) or {}
+                total = min(total, sum(by_department.get(d, 0) or 0 for d in filters["department"]))
+            if filters["seniority"]:
+                by_seniority = data.get('seniority', {}) or {}
+                total = min(total, sum(by_seniority.get(s, 0) or 0 for s in filters["seniority"]))
+            return total
+        except Exception:
+            return None
+
+    def get_contacts(self, domain, company_name="", filters=None):
         """
         Step 2: Use Hunter.io to find contacts for a domain.
+        Department/seniority/type filtering and limit/offset paging are done
+        server-side so only relevant contacts are downloaded (and billed).
         """
         if not self.hunter_api_key:
             self.log("❌ HUNTER_API_KEY not configured in .env", "error")
             return []
         
+        import requests
+        filters = self.build_filters(filters)
         self.log(f"🔍 Searching Hunter.io for contacts at {company_name or domain}...", "hunter")
-            
-        url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={self.hunter_api_key}"
+        
+        contacts = []
+        offset = filters["offset"]
         
         try:
-            response = requests.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                emails = data.get('data', {}).get('emails', [])
+            while len(contacts) < filters["max_results"]:
+                page_filters = dict(filters, offset=offset,
+                                    limit=min(filters["limit"], filters["max_results"] - len(contacts)))
+                with metrics.timer("hunter_domain_search"):
+                    response = requests.get(f"{HUNTER_API_BASE}/domain-search",
+                                            params=self._search_params(domain, page_filters), timeout=15)
                 
-                if not emails:
-                    self.log(f"   ⚠️ No emails found for {domain}", "warning")
-                    return []
+                if response.status_code != 200:
+                    metrics.count_error("hunter_domain_search")
+                    break
                 
-                self.log(f"   📧 Found {len(emails)} contacts at {domain}", "success")
+                data = response.json()
+                emails = data.get('data', {}).get('emails', [])
                 
-                contacts = []
                 for entry in emails:
                     contacts.append({
                         "first_name": entry.get('first_name', 'Contact'),
                         "last_name": entry.get('last_name', ''),
                         "email": entry.get('value'),
                         "position": entry.get('position') or 'Staff',
+                        "department": entry.get('department'),
+                        "seniority": entry.get('seniority'),
                         "company": domain,
                         "company_name": company_name,
                         "linkedin": entry.get('linkedin'),
                         "confidence": entry.get('confidence', 0)
                     })
+                
+                # Stop when the page came back short or Hunter has nothing more
+                available = data.get('meta', {}).get('results', 0) or 0
+                offset += page_filters["limit"]
+                if len(emails) < page_filters["limit"] or offset >= available:
+                    break
+            
+            if response.status_code == 200:
+                if not contacts:
+                    self.log(f"   ⚠️ No emails found for {domain}", "warning")
+                    return []
+                
+                self.log(f"   📧 Found {len(contacts)} contacts at {domain}", "success")
                 return contacts
                 
             elif response.status_code == 401:
@@ -143,10 +286,10 @@ Example format:
                 return []
             elif response.status_code == 429:
                 self.log(f"   ⚠️ Hunter.io rate limit reached", "warning")
-                return []
+                return contacts
             elif response.status_code == 402:
                 self.log(f"   ❌ Hunter.io credits exhausted!", "error")
-                return []
+                return contacts
             else:
                 error_msg = response.json().get('errors', [{}])[0].get('details', 'Unknown error')
                 self.log(f"   ❌ Hunter.io error ({response.status_code}): {error_msg}", "error")
@@ -159,17 +302,21 @@ Example format:
             self.log(f"   ❌ Error: {str(e)}", "error")
             return []
 
-    def run_discovery(self, query, max_domains=5):
+    def run_discovery(self, query, max_domains=5, filters=None, skip_searched=False, use_cache=True):
         """
         Full automated discovery flow with progress updates.
         Limited to max_domains to control credit usage.
+        `filters` overrides DEFAULT_HUNTER_FILTERS for this query
+        (department, seniority, type, limit, offset, max_results).
+        `skip_searched` skips domains already mined on Hunter.io.
         """
+        filters = self.build_filters(filters)
         self.errors = []
         self.log(f"🚀 Starting AI Discovery for: '{query}'", "start")
         self.log(f"⚠️ This will search up to {max_domains} domains (uses Hunter.io credits)", "warning")
         
         # Step 1: AI finds companies
-        companies = self.find_companies(query, limit=max_domains)
+        companies = self.find_companies(query, limit=max_domains, use_cache=use_cache)
         
         if not companies:
             self.log("❌ No companies found. Discovery stopped.", "error")
@@ -186,19 +333,33 @@ Example format:
             if not domain:
                 continue
                 
+            if skip_searched and self.cache.was_searched(domain):
+                self.log(f"⏭️ {name} ({domain}) already searched, skipping", "info")
+                continue
+            
             searched += 1
             self.log(f"📡 [{searched}/{len(companies)}] Processing {name}...", "progress")
             
-            contacts = self.get_contacts(domain, name)
+            # Free pre-check: skip domains with no matching contacts before a paid search
+            if self.hunter_api_key:
+                available = self.get_email_count(domain, filters)
+                if available == 0:
+                    self.log(f"   ⏭️ No matching contacts at {domain}, skipping paid search", "info")
+                    continue
+            
+            contacts = self.get_contacts(domain, name, filters)
+            if contacts:
+                self.cache.mark_searched(domain)
             
-            # Filter for relevant personas
+            # Department filtering already happened server-side; only fall back to
+            # position keywords when the query asked for every department
             relevant_keywords = ['recruit', 'hr', 'found', 'talent', 'tech', 'engineer', 
                                'ceo', 'cto', 'coo', 'head', 'director', 'manager', 'lead']
             
             for contact in contacts:
                 position = (contact.get('position') or '').lower()
                 # Include if position matches OR if no position (include all)
-                if not position or any(kw in position for kw in relevant_keywords):
+                if filters["department"] or not position or any(kw in position for kw in relevant_keywords):
                     contact['search_query'] = query
                     contact['reason'] = company.get('reason', '')
                     results.append(contact)
@@ -6,6 +6,7 @@ from email.mime.base import MIMEBase
 from email import encoders
 from dotenv import load_dotenv
 import logging
+from core.utils import metrics
 
 load_dotenv()
 
@@ -13,63 +14,89 @@ class EmailAgent:
     """
     Sends emails via SMTP and manages communication.
     """
-    def __init__(self):
-        self.smtp_server = os.getenv("SMTP_SERVER")
-        self.smtp_port = int(os.getenv("SMTP_PORT", 587))
-        self.sender_email = os.getenv("SMTP_EMAIL")
-        self.password = os.getenv("SMTP_PASSWORD")
-        self.sender_name = os.getenv("SENDER_NAME")
+    def __init__(self, account=None):
+        """
+        `account` (one entry of config/senders.json) overrides the SMTP_*
+        environment settings; see core/agents/sender_pool.py.
+        """
+        account = account or {}
+        self.smtp_server = account.get("server") or os.getenv("SMTP_SERVER")
+        self.smtp_port = int(account.get("port") or os.getenv("SMTP_PORT", 587))
+        self.sender_email = account.get("email") or os.getenv("SMTP_EMAIL")
+        self.password = account.get("password") or os.getenv(account.get("password_env") or "SMTP_PASSWORD")
+        self.sender_name = account.get("sender_name") or os.getenv("SENDER_NAME")
+        # Only plain local relays (e.g. the benchmark SMTP sink) should turn this off
+        if "starttls" in account:
+            self.use_starttls = bool(account["starttls"])
+        else:
+            self.use_starttls = os.getenv("SMTP_STARTTLS", "true").lower() != "false"
+        # Exception from the latest failed send_email() (None after a success),
+        # so callers can tell a 4xx deferral from a 5xx rejection
+        self.last_error = None
 
-    def send_email(self, recipient_email, subject, body, attachment_path=None):
-        try:
-            # Create a multipart message
-            msg = MIMEMultipart('mixed')
-            msg['From'] = f"{self.sender_name} <{self.sender_email}>"
-            msg['To'] = recipient_email
-            msg['Subject'] = subject
+    def build_message(self, recipient_email, subject, body, attachment_path=None):
+        # Create a multipart message
+        msg = MIMEMultipart('mixed')
+        msg['From'] = f"{self.sender_name} <{self.sender_email}>"
+        msg['To'] = recipient_email
+        msg['Subject'] = subject
 
-            # Create the body part
-            msg_body = MIMEMultipart('alternative')
-            
-            # 1. Plain text version (strip HTML if needed or just use as is if simple)
-            # For robust stripping we'd use BeautifulSoup, but for now assuming body might be HTML
-            # We'll send the raw body as HTML and a simple version as text
-            
-            # Simple strip tags for plain text (rudimentary)
-            import re
-            plain_text = re.sub('<[^<]+?>', '', body)
-            
-            part1 = MIMEText(plain_text, 'plain')
-            part2 = MIMEText(body, 'html')
+        # Create the body part
+        msg_body = MIMEMultipart('alternative')
+        
+        # 1. Plain text version (strip HTML if needed or just use as is if simple)
+        # For robust stripping we'd use BeautifulSoup, but for now assuming body might be HTML
+        # We'll send the raw body as HTML and a simple version as text
+        
+        # Simple strip tags for plain text (rudimentary)
+        import re
+        plain_text = re.sub('<[^<]+?>', '', body)
+        
+        part1 = MIMEText(plain_text, 'plain')
+        part2 = MIMEText(body, 'html')
 
-            # Attach parts into message body
-            # According to RFC 2046, the last part of a multipart/alternative is the preferred one
-            msg_body.attach(part1)
-            msg_body.attach(part2)
-            
-            msg.attach(msg_body)
+        # Attach parts into message body
+        # According to RFC 2046, the last part of a multipart/alternative is the preferred one
+        msg_body.attach(part1)
+        msg_body.attach(part2)
+        
+        msg.attach(msg_body)
 
-            # Attach resume if provided
-            if attachment_path and os.path.exists(attachment_path):
-                with open(attachment_path, 'rb') as attachment:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                    encoders.encode_base64(part)
-                    filename = os.path.basename(attachment_path)
-                    part.add_header('Content-Disposition', f'attachment; filename= {filename}')
-                    msg.attach(part)
-                    logging.info(f"Attached resume: {filename}")
+        # Attach resume if provided
+        if attachment_path and os.path.exists(attachment_path):
+            with open(attachment_path, 'rb') as attachment:
+                part = MIMEBase('application', 'octet-stream')
+                part.set_payload(attachment.read())
+                encoders.encode_base64(part)
+                filename = os.path.basename(attachment_path)
+                part.add_header('Content-Disposition', f'attachment; filename= {filename}')
+                msg.attach(part)
+                logging.info(f"Attached resume: {filename}")
+        return msg
 
+    def connect(self):
+        """Open an authenticated SMTP session (caller must quit() it)"""
+        with metrics.timer("smtp_connect"):
             server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
+            if self.use_starttls:
+                server.starttls()
             server.login(self.sender_email, self.password)
-            server.send_message(msg)
-            server.quit()
+        return server
+
+    def send_email(self, recipient_email, subject, body, attachment_path=None):
+        self.last_error = None
+        try:
+            msg = self.build_message(recipient_email, subject, body, attachment_path)
+            server = self.connect()
+            with metrics.timer("smtp_send"):
+                server.send_message(msg)
+                server.quit()
             
             logging.info(f"Email successfully sent to {recipient_email}")
             return True
         except Exception as e:
             logging.error(f"Failed to send email to {recipient_email}: {e}")
+            self.last_error = e
             return False
 
 if __name__ == "__main__":
@@ -20,7 +20,8 @@ class InboxAgent:
     def check_for_replies(self):
         """
         Scans the inbox for emails from recruiters already in our logs.
-        Returns a list of email addresses that have replied.
+        Returns a list of email addresses that have replied; raises if the
+        inbox can't be read, so callers can tell that from "no replies".
         """
         replied_emails = []
         try:
@@ -48,7 +49,7 @@ class InboxAgent:
             
         except Exception as e:
             logger.error(f"IMAP monitoring failed: {e}")
-            return []
+            raise
 
 if __name__ == "__main__":
     agent = InboxAgent()
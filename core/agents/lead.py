@@ -0,0 +1,97 @@
+"""
+Lead record passed between the agents.
+A slotted object instead of a per-row dict: the queue columns are
+attributes, anything else from the CSV goes into `extra`, and a missing
+value is always None (never NaN or ''). Mapping-style reads
+(lead['email'], lead.get('company')) keep working for code written
+against the old record dicts, and to_dict() is the JSON form.
+"""
+import math
+
+LEAD_FIELDS = ('first_name', 'email', 'company', 'role_hiring_for', 'linkedin', 'phone')
+_FIELD_SET = frozenset(LEAD_FIELDS)
+
+def _clean(value):
+    """'' and NaN become None"""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, str) and value == '':
+        return None
+    return value
+
+class Lead:
+    __slots__ = LEAD_FIELDS + ('extra',)
+
+    def __init__(self, first_name=None, email=None, company=None, role_hiring_for=None,
+                 linkedin=None, phone=None, extra=None):
+        self.first_name = first_name
+        self.email = email
+        self.company = company
+        self.role_hiring_for = role_hiring_for
+        self.linkedin = linkedin
+        self.phone = phone
+        self.extra = extra or None  # only allocated when the CSV has other columns
+
+    @classmethod
+    def from_record(cls, record):
+        """Build from a dict (CSV row, journal entry); unknown keys land in `extra`"""
+        if isinstance(record, cls):
+            return record
+        return cls.from_values(record.keys(), record.values())
+
+    @classmethod
+    def from_values(cls, columns, values):
+        """Build from parallel column names and cell values (one CSV or DataFrame row)"""
+        lead = cls()
+        extra = None
+        for key, value in zip(columns, values):
+            if key in _FIELD_SET:
+                setattr(lead, key, _clean(value))
+            elif key is not None and key != 'extra':
+                if extra is None:
+                    extra = {}
+                extra[key] = _clean(value)
+        lead.extra = extra
+        return lead
+
+    def to_dict(self):
+        record = {field: getattr(self, field) for field in LEAD_FIELDS}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    # Read-only mapping interface, for callers that treat leads as dicts
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        """Like dict.get, except that a None field also gives `default`"""
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in _FIELD_SET or bool(self.extra and key in self.extra)
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __eq__(self, other):
+        if not isinstance(other, Lead):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Lead(email={self.email!r}, company={self.company!r}, role_hiring_for={self.role_hiring_for!r})"
+
+def leads_from_frame(df):
+    """Leads for every row of a DataFrame; NaN is replaced once per column, not per cell"""
+    columns = list(df.columns)
+    df = df.astype(object).where(df.notna(), None)
+    return [Lead.from_values(columns, values) for values in zip(*(df[col].tolist() for col in columns))]
@@ -1,7 +1,7 @@
 import os
-from groq import Groq
 from dotenv import load_dotenv
-from agents.templates import EmailTemplates
+from core.agents.templates import EmailTemplates
+from core.utils import metrics
 
 load_dotenv()
 
@@ -10,6 +10,7 @@ class LLMAgent:
     Uses role-specific templates with AI-generated subject lines
     """
     def __init__(self):
+        from groq import Groq  # heavy import, only paid when an LLMAgent is built
         self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-3.1-8b-instant"
 
@@ -18,7 +19,7 @@ class LLMAgent:
         Generate email using pre-written template with AI subject line
         
         Args:
-            recruiter_info: Dict with recruiter details
+            recruiter_info: Lead (or dict) with recruiter details
             user_bio: Not used (templates have built-in content)
             template_key: Optional template override
             
@@ -26,24 +27,27 @@ class LLMAgent:
             Dict with 'subject', 'body', 'template_used', 'template_name'
         """
         # Auto-select template if not specified
-        if not template_key:
-            template_key = EmailTemplates.select_template(recruiter_info)
-        
-        template_data = EmailTemplates.get_template(template_key)
-        
-        # Format the pre-written template (plain text)
-        body_text = EmailTemplates.format_email(template_key, recruiter_info)
+        with metrics.timer("template_select"):
+            if not template_key:
+                template_key = EmailTemplates.select_template(recruiter_info)
+            
+            template_data = EmailTemplates.get_template(template_key)
         
-        # Convert plain text to professional HTML
-        try:
-            from utils.html_formatter import text_to_html_email, format_email_links
-            body_html = text_to_html_email(body_text, template_key)
-            body_html = format_email_links(body_html)
-            body = body_html
-        except Exception as e:
-            # Fallback to plain text if HTML formatting fails
-            print(f"HTML formatting failed: {e}")
-            body = body_text
+        with metrics.timer("render"):
+            # Format the pre-written template (plain text)
+            body_text = EmailTemplates.format_email(template_key, recruiter_info)
+            
+            # Convert plain text to professional HTML
+            try:
+                from core.utils.html_formatter import text_to_html_email, format_email_links
+                body_html = text_to_html_email(body_text, template_key)
+                body_html = format_email_links(body_html)
+                body = body_html
+            except Exception as e:
+                # Fallback to plain text if HTML formatting fails
+                print(f"HTML formatting failed: {e}")
+                metrics.count_error("render")
+                body = body_text
         
         # Generate subject line with AI
         subject = self._generate_subject(recruiter_info, template_key)
@@ -56,6 +60,31 @@ class LLMAgent:
             'resume': template_data.get('resume')
         }
 
+    def generate_follow_up(self, recruiter_info, step, original_subject=None):
+        """
+        Follow-up email for sequence `step`; replies in the original thread
+        (Re: <first subject>) so no LLM call is needed.
+        """
+        with metrics.timer("render"):
+            template_name, body_text = EmailTemplates.format_follow_up(step, recruiter_info)
+            try:
+                from core.utils.html_formatter import text_to_html_email, format_email_links
+                body = format_email_links(text_to_html_email(body_text))
+            except Exception as e:
+                print(f"HTML formatting failed: {e}")
+                metrics.count_error("render")
+                body = body_text
+        
+        subject = original_subject or f"{recruiter_info.get('role_hiring_for') or 'Opportunity'} - Rikin Shah"
+        if not subject.lower().startswith("re:"):
+            subject = f"Re: {subject}"
+        return {
+            'subject': subject,
+            'body': body,
+            'template_used': f"follow_up_{step}",
+            'template_name': template_name
+        }
+
     def _generate_subject(self, recruiter_info, template_key):
         """Generate catchy subject line using AI"""
         role = recruiter_info.get('role_hiring_for', 'Position')
@@ -78,13 +107,14 @@ class LLMAgent:
         """
         
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You output only the subject line, nothing else."},
-                    {"role": "user", "content": prompt}
-                ],
-                model=self.model
-            )
+            with metrics.timer("llm_subject"):
+                chat_completion = self.client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": "You output only the subject line, nothing else."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    model=self.model
+                )
             
             subject = chat_completion.choices[0].message.content.strip()
             # Remove quotes if AI added them
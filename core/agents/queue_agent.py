@@ -1,103 +1,217 @@
+import csv
 import json
 import os
+import sqlite3
+import threading
 from datetime import datetime
-import pandas as pd
+from core.utils.dedup_index import get_dedup_index, QUEUE
+
+QUEUE_STATUSES = ('pending', 'sent', 'replied', 'failed')
 
 class QueueAgent:
     """
     Unified lead queue manager.
     Single source of truth for all leads (discovered, imported, sent).
+    Backed by SQLite in WAL mode: leads are keyed by email, status lookups
+    go through an index and every write is its own transaction.
     """
-    def __init__(self, queue_path="data/leads_queue.json"):
+    def __init__(self, queue_path="data/leads_queue.db", legacy_path="data/leads_queue.json"):
         self.queue_path = queue_path
+        self.dedup_index = get_dedup_index()
         os.makedirs(os.path.dirname(queue_path), exist_ok=True)
-        
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(queue_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS leads (
+                email TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                added_at TEXT,
+                last_updated TEXT,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_leads_status ON leads (status)")
+        self._conn.commit()
+        self._migrate_legacy(legacy_path)
+
+    def _migrate_legacy(self, legacy_path):
+        """One-time import of the old JSON-array queue"""
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, 'r') as f:
+                leads = json.load(f)
+        except (ValueError, OSError):
+            leads = []
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO leads (email, status, added_at, last_updated, data) VALUES (?, ?, ?, ?, ?)",
+                [self._to_row(lead) for lead in leads if lead.get('email')]
+            )
+        os.replace(legacy_path, f"{legacy_path}.migrated")
+
+    @staticmethod
+    def _to_row(lead):
+        data = {k: v for k, v in lead.items() if k not in ('email', 'status', 'added_at', 'last_updated')}
+        return (
+            lead['email'],
+            lead.get('status', 'pending'),
+            lead.get('added_at'),
+            lead.get('last_updated'),
+            json.dumps(data)
+        )
+
+    @staticmethod
+    def _from_row(row):
+        email, status, added_at, last_updated, data = row
+        lead = json.loads(data)
+        lead.update(email=email, status=status, added_at=added_at, last_updated=last_updated)
+        return lead
+
+    def iter_leads(self, status=None, batch_size=500):
+        """
+        Yield leads in insertion order without loading the whole queue.
+        Uses keyset paging on rowid so each batch is an indexed range scan.
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                if status:
+                    rows = self._conn.execute(
+                        "SELECT rowid, email, status, added_at, last_updated, data FROM leads "
+                        "WHERE status = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                        (status, last_rowid, batch_size)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT rowid, email, status, added_at, last_updated, data FROM leads "
+                        "WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                        (last_rowid, batch_size)
+                    ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._from_row(row[1:])
+            last_rowid = rows[-1][0]
+
     def get_all_leads(self):
         """Get all leads from queue"""
-        if not os.path.exists(self.queue_path):
-            return []
-        
-        with open(self.queue_path, 'r') as f:
-            try:
-                return json.load(f)
-            except:
-                return []
-    
+        return list(self.iter_leads())
+
+    def get_lead(self, email):
+        """Look up one lead by email (primary key)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT email, status, added_at, last_updated, data FROM leads WHERE email = ?", (email,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
     def add_lead(self, lead_data):
         """Add a new lead to the queue"""
-        leads = self.get_all_leads()
-        
-        # Check for duplicates by email
-        email = lead_data.get('email')
-        if any(l.get('email') == email for l in leads):
-            return {"status": "duplicate", "message": f"{email} already in queue"}
-        
-        # Add metadata
-        lead_data['added_at'] = datetime.now().isoformat()
-        lead_data['status'] = 'pending'  # pending, sent, replied, failed
-        lead_data['last_updated'] = datetime.now().isoformat()
-        
-        leads.append(lead_data)
-        self._save_queue(leads)
-        
-        return {"status": "success", "message": "Lead added to queue"}
-    
+        return self.add_leads([lead_data])[0]
+
+    def add_leads(self, leads):
+        """Add several leads in one transaction; returns a result dict per lead"""
+        now = datetime.now().isoformat()
+        results = []
+
+        with self._lock, self._conn:
+            for lead_data in leads:
+                email = lead_data.get('email')
+
+                # Check for duplicates by email (O(1) against the shared index)
+                if self.dedup_index.contains(email, (QUEUE,)):
+                    results.append({"status": "duplicate", "message": f"{email} already in queue"})
+                    continue
+
+                # Add metadata
+                lead_data['added_at'] = now
+                lead_data['status'] = 'pending'  # pending, sent, replied, failed
+                lead_data['last_updated'] = now
+
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO leads (email, status, added_at, last_updated, data) VALUES (?, ?, ?, ?, ?)",
+                    self._to_row(lead_data)
+                )
+                if cursor.rowcount == 0:
+                    results.append({"status": "duplicate", "message": f"{email} already in queue"})
+                else:
+                    results.append({"status": "success", "message": "Lead added to queue"})
+
+        self.dedup_index.add_many(
+            [lead.get('email') for lead, result in zip(leads, results) if result['status'] == 'success'], QUEUE
+        )
+        return results
+
     def update_lead_status(self, email, status, extra_data=None):
         """Update lead status after sending"""
-        leads = self.get_all_leads()
-        
-        for lead in leads:
-            if lead.get('email') == email:
-                lead['status'] = status
-                lead['last_updated'] = datetime.now().isoformat()
-                if extra_data:
-                    lead.update(extra_data)
-                break
-        
-        self._save_queue(leads)
-    
-    def get_pending_leads(self):
+        now = datetime.now().isoformat()
+
+        with self._lock, self._conn:
+            if not extra_data:
+                self._conn.execute(
+                    "UPDATE leads SET status = ?, last_updated = ? WHERE email = ?", (status, now, email)
+                )
+                return
+
+            row = self._conn.execute("SELECT data FROM leads WHERE email = ?", (email,)).fetchone()
+            if not row:
+                return
+            data = json.loads(row[0])
+            data.update({k: v for k, v in extra_data.items() if k not in ('email', 'status')})
+            self._conn.execute(
+                "UPDATE leads SET status = ?, last_updated = ?, data = ? WHERE email = ?",
+                (status, now, json.dumps(data), email)
+            )
+
+    def iter_pending_leads(self, batch_size=500):
+        """Cursor over leads that haven't been contacted yet"""
+        return self.iter_leads(status='pending', batch_size=batch_size)
+
+    def get_pending_leads(self, limit=None):
         """Get leads that haven't been contacted yet"""
-        leads = self.get_all_leads()
-        return [l for l in leads if l.get('status') == 'pending']
-    
+        pending = []
+        for lead in self.iter_pending_leads():
+            if limit and len(pending) >= limit:
+                break
+            pending.append(lead)
+        return pending
+
     def get_stats(self):
         """Get queue statistics"""
-        leads = self.get_all_leads()
-        return {
-            'total': len(leads),
-            'pending': len([l for l in leads if l.get('status') == 'pending']),
-            'sent': len([l for l in leads if l.get('status') == 'sent']),
-            'replied': len([l for l in leads if l.get('status') == 'replied']),
-            'failed': len([l for l in leads if l.get('status') == 'failed'])
-        }
-    
-    def _save_queue(self, leads):
-        """Save queue to disk"""
-        with open(self.queue_path, 'w') as f:
-            json.dump(leads, f, indent=2)
-    
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM leads GROUP BY status").fetchall())
+        stats = {'total': sum(counts.values())}
+        for status in QUEUE_STATUSES:
+            stats[status] = counts.get(status, 0)
+        return stats
+
     def export_to_csv(self, csv_path="data/recruiters.csv"):
         """Export pending leads to CSV for backward compatibility"""
-        pending = self.get_pending_leads()
-        if not pending:
-            return
-        
-        df = pd.DataFrame(pending)
         # Keep only required columns for main.py
         required_cols = ['first_name', 'email', 'company', 'role_hiring_for']
-        
-        # Ensure all required columns exist
-        for col in required_cols:
-            if col not in df.columns:
+        count = 0
+
+        tmp_path = f"{csv_path}.tmp"
+        with open(tmp_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(required_cols)
+            for lead in self.iter_pending_leads():
                 # Map from discovery format
-                if col == 'company' and 'company_name' in df.columns:
-                    df['company'] = df['company_name']
-                elif col == 'role_hiring_for' and 'position' in df.columns:
-                    df['role_hiring_for'] = df['position']
-                else:
-                    df[col] = 'N/A'
-        
-        df = df[required_cols]
-        df.to_csv(csv_path, index=False)
-        return len(df)
+                writer.writerow([
+                    lead.get('first_name') or 'N/A',
+                    lead['email'],
+                    lead.get('company') or lead.get('company_name') or 'N/A',
+                    lead.get('role_hiring_for') or lead.get('position') or 'N/A'
+                ])
+                count += 1
+
+        if not count:
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, csv_path)
+        return count
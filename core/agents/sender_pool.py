@@ -0,0 +1,304 @@
+"""
+Multi-account SMTP sender pool.
+Accounts come from config/senders.json:
+
+    {"accounts": [
+        {"name": "primary", "email": "me@gmail.com", "password_env": "SMTP_PASSWORD",
+         "server": "smtp.gmail.com", "port": 587, "daily_limit": 450, "hourly_limit": 60,
+         "connections": 2},
+        {"name": "alt", "email": "alt@outlook.com", "password_env": "ALT_SMTP_PASSWORD",
+         "server": "smtp.office365.com", "daily_limit": 250, "hourly_limit": 30}
+    ]}
+
+Each account gets `connections` worker threads, each holding one reused
+SMTP session. A recipient domain always maps to the same account
+(rendezvous hashing) while that account is healthy and has quota, so
+one company keeps hearing from one sender. Sends are counted per account
+in logs/sender_quota.db, which every pipeline process (main.py --workers)
+reads, so daily/hourly caps hold across restarts and processes. An account
+that fails `max_failures` times in a row is benched for `cooldown_minutes`
+and its queued sends move to the other accounts. Only failures of the
+account count (connection, authentication, 4xx, see retries.classify_error);
+a message the provider rejects for good (5xx content or policy) fails
+that one send without benching the account or trying the others.
+"""
+import hashlib
+import logging
+import os
+import queue
+import smtplib
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from core.agents.email_agent import EmailAgent
+from core.scheduler.retries import classify_error, PERMANENT
+from core.utils import metrics
+
+logger = logging.getLogger("SenderPool")
+
+SENDER_QUOTA_DB = os.path.join("logs", "sender_quota.db")
+HOUR = 3600
+DAY = 24 * HOUR
+
+class QuotaExhausted(Exception):
+    """No healthy sender account has quota left right now"""
+
+class _QuotaStore:
+    """Send timestamps per account, pruned to the last 24h"""
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sends (account TEXT NOT NULL, sent_at REAL NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sends_account ON sends (account, sent_at)")
+        with self._conn:
+            self._conn.execute("DELETE FROM sends WHERE sent_at < ?", (time.time() - DAY,))
+
+    def count(self, account, since):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM sends WHERE account = ? AND sent_at >= ?", (account, since)
+            ).fetchone()[0]
+
+    def add(self, account, sent_at):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO sends (account, sent_at) VALUES (?, ?)", (account, sent_at))
+
+class _SendRequest:
+    __slots__ = ("future", "recipient", "subject", "body", "attachment_path", "min_interval", "tried", "error")
+
+    def __init__(self, recipient, subject, body, attachment_path, min_interval):
+        self.future = Future()
+        self.recipient = recipient
+        self.subject = subject
+        self.body = body
+        self.attachment_path = attachment_path
+        self.min_interval = min_interval
+        self.tried = set()  # accounts that already failed this send
+        self.error = None   # latest exception, handed to the caller as future.error
+
+class SenderAccount:
+    """One SMTP identity with its quota window and health state"""
+    def __init__(self, settings, store):
+        self.name = settings.get("name") or settings["email"]
+        self.agent = EmailAgent(settings)
+        self.daily_limit = int(settings.get("daily_limit", 400))
+        self.hourly_limit = int(settings.get("hourly_limit", self.daily_limit))
+        self.connections = int(settings.get("connections", 1))
+        self.max_failures = int(settings.get("max_failures", 3))
+        self.cooldown = float(settings.get("cooldown_minutes", 15)) * 60
+        self.store = store
+        self.reserved = 0
+        self.failures = 0
+        self.disabled_until = 0.0
+        self.queue = queue.Queue()
+
+    def remaining(self, now):
+        """Sends still allowed in both windows, minus those already queued"""
+        last_day = self.store.count(self.name, now - DAY)
+        last_hour = self.store.count(self.name, now - HOUR)
+        return min(self.daily_limit - last_day, self.hourly_limit - last_hour) - self.reserved
+
+    def healthy(self, now):
+        return now >= self.disabled_until
+
+    def status(self, now):
+        return {
+            "name": self.name,
+            "email": self.agent.sender_email,
+            "healthy": self.healthy(now),
+            "sent_24h": self.store.count(self.name, now - DAY),
+            "remaining": max(self.remaining(now), 0),
+            "queued": self.reserved,
+            "failures": self.failures,
+            "daily_limit": self.daily_limit,
+            "hourly_limit": self.hourly_limit,
+        }
+
+class SenderPool:
+    """
+    Drop-in for EmailAgent: send_email() blocks for one message, while
+    submit() returns a Future so the pipeline can keep several sends in
+    flight. Futures resolve to True/False, or raise QuotaExhausted when no
+    account can take the message; a False future carries the exception
+    that failed it as `future.error`, and send_email() leaves it in
+    `last_error` like EmailAgent.
+    """
+    def __init__(self, accounts, db_path=SENDER_QUOTA_DB):
+        if not accounts:
+            raise ValueError("SenderPool needs at least one account")
+        store = _QuotaStore(db_path)
+        self._store = store
+        self._lock = threading.Lock()
+        self.accounts = [SenderAccount(settings, store) for settings in accounts]
+        self.last_error = None
+        for account in self.accounts:
+            for i in range(account.connections):
+                threading.Thread(target=self._worker, args=(account,),
+                                 name=f"sender-{account.name}-{i}", daemon=True).start()
+
+    @property
+    def capacity(self):
+        """How many sends are worth keeping in flight"""
+        return sum(account.connections for account in self.accounts) * 2
+
+    def status(self):
+        now = time.time()
+        with self._lock:
+            return [account.status(now) for account in self.accounts]
+
+    @staticmethod
+    def _rank(domain, account):
+        return hashlib.sha1(f"{domain}|{account.name}".encode()).hexdigest()
+
+    def _route(self, request):
+        """Queue `request` on the preferred available account (lock held)"""
+        now = time.time()
+        domain = request.recipient.rsplit("@", 1)[-1].lower()
+        for account in sorted(self.accounts, key=lambda a: self._rank(domain, a), reverse=True):
+            if account.name in request.tried or not account.healthy(now):
+                continue
+            if account.remaining(now) > 0:
+                account.reserved += 1
+                account.queue.put(request)
+                return account
+        return None
+
+    def submit(self, recipient_email, subject, body, attachment_path=None, min_interval=0):
+        """Queue one email; raises QuotaExhausted if no account can send it"""
+        request = _SendRequest(recipient_email, subject, body, attachment_path, min_interval)
+        with self._lock:
+            if not self._route(request):
+                raise QuotaExhausted("All sender accounts are exhausted or unhealthy")
+        return request.future
+
+    def send_email(self, recipient_email, subject, body, attachment_path=None):
+        self.last_error = None
+        try:
+            future = self.submit(recipient_email, subject, body, attachment_path)
+            success = future.result()
+        except QuotaExhausted as e:
+            logging.error(f"Failed to send email to {recipient_email}: {e}")
+            self.last_error = e
+            return False
+        if not success:
+            self.last_error = future.error
+        return success
+
+    def _reroute(self, account, request):
+        """Hand a send to another account, or fail it with QuotaExhausted"""
+        with self._lock:
+            account.reserved -= 1
+            if self._route(request):
+                return
+        if request.future.done():
+            return
+        if request.tried:
+            # Every account that could take it failed: a real send failure
+            request.future.error = request.error
+            request.future.set_result(False)
+        else:
+            request.future.set_exception(QuotaExhausted(f"No sender account left for {request.recipient}"))
+
+    def _bench(self, account, error):
+        with self._lock:
+            account.failures += 1
+            if account.failures < account.max_failures:
+                return
+            account.disabled_until = time.time() + account.cooldown
+        logger.warning(f"⛔ Sender '{account.name}' benched for {account.cooldown / 60:.0f} min after "
+                       f"{account.failures} failures: {error}")
+        metrics.inc("reachai_sender_benched_total", account=account.name)
+        # Move everything already queued for this account elsewhere
+        while True:
+            try:
+                request = account.queue.get_nowait()
+            except queue.Empty:
+                return
+            self._reroute(account, request)
+
+    def _account_failed(self, account, request, error):
+        """A send failed because of the account: count it against the account and try another"""
+        logging.error(f"Sender '{account.name}' failed for {request.recipient}: {error}")
+        metrics.inc("reachai_sender_sends_total", account=account.name, status="error")
+        self._bench(account, error)
+        request.error = error
+        request.tried.add(account.name)
+        self._reroute(account, request)
+
+    def _worker(self, account):
+        server = None
+        last_send = 0.0
+        while True:
+            request = account.queue.get()
+            if not account.healthy(time.time()):
+                self._reroute(account, request)
+                continue
+            if not request.future.running() and not request.future.set_running_or_notify_cancel():
+                with self._lock:
+                    account.reserved -= 1
+                continue
+
+            pause = last_send + request.min_interval - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+
+            stage = "build"
+            try:
+                msg = account.agent.build_message(request.recipient, request.subject, request.body,
+                                                  request.attachment_path)
+                for reused in (server is not None, False):
+                    try:
+                        if server is None:
+                            stage = "connect"
+                            server = account.agent.connect()
+                        stage = "send"
+                        with metrics.timer("smtp_send"):
+                            server.send_message(msg)
+                        break
+                    except smtplib.SMTPServerDisconnected:
+                        # Idle sessions get dropped by the server; retry once on a fresh one
+                        server = None
+                        if not reused:
+                            raise
+            except Exception as e:
+                # The recipient's or this message's fault, not the account's: another account won't do better
+                rejected = stage == "build" or isinstance(e, smtplib.SMTPRecipientsRefused) or \
+                    (stage == "send" and classify_error(e) == PERMANENT)
+                if rejected:
+                    with self._lock:
+                        account.reserved -= 1
+                    logging.error(f"Failed to send email to {request.recipient}: {e}")
+                    metrics.inc("reachai_sender_sends_total", account=account.name, status="rejected")
+                    request.future.error = e
+                    request.future.set_result(False)
+                    continue
+                if server is not None:
+                    try:
+                        server.close()
+                    except Exception:
+                        pass
+                    server = None
+                self._account_failed(account, request, e)
+                continue
+
+            now = time.time()
+            last_send = time.monotonic()
+            with self._lock:
+                account.reserved -= 1
+                account.failures = 0
+                self._store.add(account.name, now)
+            metrics.inc("reachai_sender_sends_total", account=account.name, status="sent")
+            logging.info(f"Email successfully sent to {request.recipient} via {account.name}")
+            request.future.set_result(True)
+
+def build_email_agent():
+    """SenderPool when config/senders.json lists accounts, else the single-account EmailAgent"""
+    from core.utils.config import load_sender_config
+    config = load_sender_config()
+    if config and config.get("accounts"):
+        return SenderPool(config["accounts"])
+    return EmailAgent()
@@ -109,11 +109,42 @@ rshah88@asu.edu | {phone}
 {linkedin}"""
         }
     }
+    # Follow-up steps (core/scheduler/sequences.py); the last one is reused
+    # if follow_up_days lists more steps than there are templates
+    FOLLOW_UPS = [
+        {
+            "name": "Follow-up 1",
+            "template": """Hi {recruiter_name},
+
+I wanted to follow up on my note about the {role} position at {company}. I'm still very interested and happy to share anything else that would help.
+
+Would you have 15 minutes this week or next for a quick call?
+
+Best regards,
+
+Rikin Shah
+rshah88@asu.edu | {phone}
+{linkedin}"""
+        },
+        {
+            "name": "Follow-up 2",
+            "template": """Hi {recruiter_name},
+
+I know inboxes get busy, so this is my last note on the {role} opportunity at {company}. If the timing isn't right, I'd still appreciate being considered for future openings on your team.
+
+Thank you for your time,
+
+Rikin Shah
+rshah88@asu.edu | {phone}
+{linkedin}"""
+        }
+    ]
+
     @classmethod
     def _load_templates(cls):
         """Load templates merging defaults with custom config"""
         try:
-            from utils.config import load_template_config
+            from core.utils.config import load_template_config
             config = load_template_config()
             
             if not config:
@@ -185,3 +216,15 @@ rshah88@asu.edu | {phone}
             portfolio=EmailTemplates.USER_INFO['portfolio'],
             github=EmailTemplates.USER_INFO['github']
         )
+
+    @staticmethod
+    def format_follow_up(step, recruiter_info):
+        """Format follow-up `step` (1-based) for a recruiter"""
+        template_data = EmailTemplates.FOLLOW_UPS[min(step, len(EmailTemplates.FOLLOW_UPS)) - 1]
+        return template_data['name'], template_data['template'].format(
+            recruiter_name=recruiter_info.get('first_name') or 'there',
+            company=recruiter_info.get('company') or 'your company',
+            role=recruiter_info.get('role_hiring_for') or 'the position',
+            phone=EmailTemplates.USER_INFO['phone'],
+            linkedin=EmailTemplates.USER_INFO['linkedin']
+        )
@@ -0,0 +1,16 @@
+"""
+Bulk CSV lead importer (the directory name isn't a Python identifier,
+so load it with importlib.import_module("core.csv-importer") or run
+`python -m core.csv-importer leads.csv`).
+"""
+from .importer import (
+    CSVImporter,
+    ImportStats,
+    detect_encoding,
+    map_columns,
+    print_progress,
+    COLUMN_ALIASES,
+    QUEUE_COLUMNS,
+)
+from .hash_index import HashIndex, HASH_INDEX
+from .upload import MultipartFileStream, UploadJobs
@@ -0,0 +1,67 @@
+"""
+Command line for the bulk importer.
+
+Usage:
+    python -m core.csv-importer leads.csv
+    python -m core.csv-importer export.csv --map "Work Email=email" --map "Org=company"
+    python -m core.csv-importer huge.csv --workers 8 --batch-size 20000 --dry-run
+"""
+import argparse
+import json
+import logging
+import sys
+
+from .importer import CSVImporter, QUEUE_CSV, DEFAULT_BATCH_SIZE, print_progress
+
+def parse_mapping(pairs):
+    mapping = {}
+    for pair in pairs or []:
+        source, sep, target = pair.rpartition("=")
+        if not sep or not source:
+            raise SystemExit(f"--map expects 'Source Header=queue_column', got {pair!r}")
+        mapping[source] = target.strip()
+    return mapping
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.csv-importer",
+                                     description="Stream a lead CSV into the outreach queue")
+    parser.add_argument("path", help="CSV file to import")
+    parser.add_argument("--queue", default=QUEUE_CSV, help=f"Queue CSV to append to (default {QUEUE_CSV})")
+    parser.add_argument("--map", action="append", metavar="HEADER=COLUMN",
+                        help="Map a source header onto a queue column (repeatable)")
+    parser.add_argument("--encoding", help="Input encoding (default: detected)")
+    parser.add_argument("--workers", type=int, help="Validation processes (0 = in-process)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Validate and dedup without writing")
+    parser.add_argument("--json", action="store_true", help="Print the final stats as JSON")
+    parser.add_argument("--quiet", action="store_true", help="No progress line")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    importer = CSVImporter(
+        queue_csv=args.queue,
+        mapping=parse_mapping(args.map),
+        encoding=args.encoding,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        progress=None if args.quiet else print_progress,
+    )
+    try:
+        stats = importer.run(args.path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(stats.as_dict(), indent=2))
+    else:
+        action = "Would import" if args.dry_run else "Imported"
+        print(f"✅ {action} {stats.imported:,} of {stats.rows:,} rows into {args.queue} "
+              f"({stats.duplicates:,} duplicates, {stats.invalid_email:,} invalid emails, "
+              f"{stats.missing_fields:,} missing fields) in {stats.elapsed:.1f}s, "
+              f"{stats.rate:,.0f} rows/s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
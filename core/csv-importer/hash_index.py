@@ -0,0 +1,203 @@
+"""
+On-disk hash set of canonical addresses for bulk imports.
+An open-addressing table of 64-bit slots in a memory-mapped file
+(data/import_hash.idx): each slot packs a 62-bit hash of the address with
+two source bits (queue, outreach), so an import of any size only touches
+the pages it probes instead of holding every address in memory. The
+table mirrors the shared dedup index (data/dedup_index.tsv): sync()
+replays the lines appended since the last import, and a compacted or
+replaced index file triggers a full replay.
+"""
+import hashlib
+import mmap
+import os
+import struct
+
+from core.utils.dedup_index import DEDUP_INDEX, QUEUE, OUTREACH
+
+HASH_INDEX = os.path.join("data", "import_hash.idx")
+
+# Source bits stored in the low two bits of a slot
+FLAGS = {QUEUE: 1, OUTREACH: 2}
+_FLAG_MASK = 3
+
+_MAGIC = b"RAIHIDX1"
+# magic, capacity, used slots (live + deleted), live entries, source offset, source inode
+_HEADER = struct.Struct("<8sQQQQQ")
+_HEADER_SLOTS = _HEADER.size // 8
+
+DEFAULT_CAPACITY = 1 << 16
+MAX_LOAD = 0.7
+
+def key_of(address):
+    """62-bit hash of a canonical address (never 0, so 0 can mean empty)"""
+    digest = hashlib.blake2b(address.encode('utf-8'), digest_size=8).digest()
+    return (int.from_bytes(digest, 'little') >> 2) or 1
+
+class HashIndex:
+    """
+    Usage:
+        with HashIndex() as index:
+            index.sync()                        # catch up with dedup_index.tsv
+            if not index.flags(key) & FLAGS[QUEUE]:
+                index.add(key, QUEUE)
+    Keys come from key_of(); distinct addresses share a key with
+    probability ~n/2^62, which only ever causes a skipped lead, never a
+    duplicate. One writer at a time (callers hold a FileLock).
+    """
+    def __init__(self, path=HASH_INDEX, source=DEDUP_INDEX):
+        self.path = path
+        self.source = source
+        self._file = None
+        self._map = None
+        self._slots = None
+        self.capacity = self.used = self.live = 0
+        self.source_offset = self.source_inode = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        if not self._is_valid(self.path):
+            self._create(self.path, DEFAULT_CAPACITY)
+        self._map_file()
+        return self
+
+    def close(self):
+        if self._map is None:
+            return
+        self._write_header()
+        self._slots.release()
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._file = self._map = self._slots = None
+
+    @staticmethod
+    def _is_valid(path):
+        if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+            return False
+        with open(path, 'rb') as f:
+            magic, capacity = _HEADER.unpack(f.read(_HEADER.size))[:2]
+        return magic == _MAGIC and os.path.getsize(path) == _HEADER.size + capacity * 8
+
+    @staticmethod
+    def _create(path, capacity, source_offset=0, source_inode=0):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, capacity, 0, 0, source_offset, source_inode))
+            f.truncate(_HEADER.size + capacity * 8)  # sparse: zero slots cost no disk
+        os.replace(tmp_path, path)
+
+    def _map_file(self):
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        _, self.capacity, self.used, self.live, self.source_offset, self.source_inode = \
+            _HEADER.unpack_from(self._map, 0)
+        self._slots = memoryview(self._map).cast('Q')[_HEADER_SLOTS:]
+
+    def _write_header(self):
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.capacity, self.used, self.live,
+                          self.source_offset, self.source_inode)
+
+    def _probe(self, key):
+        """(slot, found): the key's slot, else where it would be inserted"""
+        slots, mask = self._slots, self.capacity - 1
+        i = key & mask
+        free = None
+        while True:
+            value = slots[i]
+            if value == 0:
+                return (i if free is None else free), False
+            if value >> 2 == key and value & _FLAG_MASK:
+                return i, True
+            if free is None and not value & _FLAG_MASK:
+                free = i  # deleted slot, reusable
+            i = (i + 1) & mask
+
+    def flags(self, key):
+        """Source bits recorded for a key (0 if unknown)"""
+        slot, found = self._probe(key)
+        return self._slots[slot] & _FLAG_MASK if found else 0
+
+    def add(self, key, source):
+        """Record `key` under `source`; returns the flags it had before"""
+        slot, found = self._probe(key)
+        if found:
+            previous = self._slots[slot] & _FLAG_MASK
+            self._slots[slot] |= FLAGS[source]
+            return previous
+        if self._slots[slot] == 0:
+            self.used += 1
+        self._slots[slot] = (key << 2) | FLAGS[source]
+        self.live += 1
+        if self.used > self.capacity * MAX_LOAD:
+            self._grow()
+        return 0
+
+    def discard(self, key, source):
+        slot, found = self._probe(key)
+        if not found:
+            return
+        value = self._slots[slot] & ~FLAGS[source]
+        self._slots[slot] = value
+        if not value & _FLAG_MASK:
+            self.live -= 1
+
+    def _grow(self):
+        """Rehash live entries into a table twice the size (or just as big if mostly deleted)"""
+        capacity = self.capacity * 2 if self.live > self.capacity * MAX_LOAD / 2 else self.capacity
+        new_path = f"{self.path}.grow"
+        self._create(new_path, capacity, self.source_offset, self.source_inode)
+        with open(new_path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as new_map:
+            new_slots = memoryview(new_map).cast('Q')[_HEADER_SLOTS:]
+            mask = capacity - 1
+            for value in self._slots:
+                if value & _FLAG_MASK:
+                    i = (value >> 2) & mask
+                    while new_slots[i]:
+                        i = (i + 1) & mask
+                    new_slots[i] = value
+            _HEADER.pack_into(new_map, 0, _MAGIC, capacity, self.live, self.live,
+                              self.source_offset, self.source_inode)
+            new_slots.release()
+        self.close()
+        os.replace(new_path, self.path)
+        self._map_file()
+
+    def _reset(self):
+        self.close()
+        self._create(self.path, DEFAULT_CAPACITY)
+        self._map_file()
+
+    def sync(self):
+        """Replay dedup index lines (queue/outreach adds and removals) appended since the last sync"""
+        if not os.path.exists(self.source):
+            from core.utils.dedup_index import DedupIndex
+            DedupIndex(self.source).rebuild()
+        st = os.stat(self.source)
+        if st.st_ino != self.source_inode or st.st_size < self.source_offset:
+            self._reset()
+            self.source_inode = st.st_ino
+
+        with open(self.source, 'rb') as f:
+            f.seek(self.source_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                self.source_offset += len(line)
+                source, _, address = line.decode('utf-8').rstrip("\n").partition("\t")
+                removal = source.startswith("-")
+                source = source.lstrip("-")
+                if not address or source not in FLAGS:
+                    continue
+                if removal:
+                    self.discard(key_of(address), source)
+                else:
+                    self.add(key_of(address), source)
+        self._write_header()
@@ -0,0 +1,396 @@
+"""
+Streaming bulk importer for lead CSVs.
+The file is read in fixed-size batches, so memory stays flat for
+multi-GB inputs:
+  1. the encoding is detected from a sample (BOM, UTF-8, charset_normalizer
+     when installed, else cp1252)
+  2. the header is mapped onto the queue columns (common aliases such as
+     "Email Address" or "Job Title", or an explicit mapping)
+  3. batches are validated and canonicalized in worker processes
+  4. addresses already in the queue or outreach history, or earlier in the
+     same file, are dropped through the on-disk HashIndex
+  5. the rest is appended to data/recruiters.csv in bulk and recorded in
+     the shared dedup index
+"""
+import codecs
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+
+from core.utils.dedup_index import canonicalize, get_dedup_index, QUEUE, OUTREACH
+from core.utils.filelock import FileLock
+
+from .hash_index import HashIndex, HASH_INDEX, FLAGS, key_of
+
+logger = logging.getLogger("CSVImporter")
+
+QUEUE_CSV = "data/recruiters.csv"
+QUEUE_COLUMNS = ['first_name', 'email', 'company', 'role_hiring_for', 'linkedin', 'phone']
+REQUIRED_COLUMNS = ['first_name', 'email', 'company', 'role_hiring_for']
+_REQUIRED_POSITIONS = [QUEUE_COLUMNS.index(name) for name in REQUIRED_COLUMNS]
+
+# Normalized header -> queue column
+COLUMN_ALIASES = {
+    'first name': 'first_name', 'firstname': 'first_name', 'first': 'first_name',
+    'given name': 'first_name',
+    'email': 'email', 'e mail': 'email', 'email address': 'email', 'work email': 'email',
+    'mail': 'email',
+    'company': 'company', 'company name': 'company', 'organization': 'company',
+    'organisation': 'company', 'employer': 'company', 'account name': 'company',
+    'role hiring for': 'role_hiring_for', 'role': 'role_hiring_for', 'position': 'role_hiring_for',
+    'title': 'role_hiring_for', 'job title': 'role_hiring_for', 'hiring for': 'role_hiring_for',
+    'linkedin': 'linkedin', 'linkedin url': 'linkedin', 'linkedin profile': 'linkedin',
+    'phone': 'phone', 'phone number': 'phone', 'mobile': 'phone', 'telephone': 'phone',
+}
+# Used for first_name (first word only) when there is no first-name column
+FULL_NAME_ALIASES = ('name', 'full name', 'contact name', 'contact')
+# Files without a header row: Name, Email, Company, Position, LinkedIn
+HEADERLESS_POSITIONS = {'email': 1, 'company': 2, 'role_hiring_for': 3, 'linkedin': 4}
+
+EMAIL_PATTERN = re.compile(r"[^@\s]+@[^@\s.]+(\.[^@\s.]+)+")
+
+DEFAULT_BATCH_SIZE = 5000
+SAMPLE_BYTES = 64 * 1024
+# Below this size worker start-up costs more than it saves
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+def detect_encoding(path, sample_bytes=SAMPLE_BYTES):
+    """Best guess at a CSV file's text encoding from its first bytes"""
+    with open(path, 'rb') as f:
+        return sniff_encoding(f.read(sample_bytes))
+
+def sniff_encoding(sample):
+    """detect_encoding() for bytes already read"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # final=False: the sample may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(sample).best()
+        if best is not None:
+            return best.encoding
+    except ImportError:
+        pass
+    return 'cp1252'
+
+class _Replay(io.RawIOBase):
+    """A binary stream with its already-read first bytes put back in front; tell() counts bytes served"""
+    def __init__(self, head, stream):
+        self._head = head
+        self._stream = stream
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+        else:
+            data = self._stream.read(len(buffer))
+            n = len(data)
+            buffer[:n] = data
+        self.position += n
+        return n
+
+    def tell(self):
+        return self.position
+
+def _normalize_header(name):
+    return re.sub(r"[\s_\-]+", " ", (name or "").strip().lstrip("\ufeff").lower()).strip()
+
+def map_columns(header, mapping=None):
+    """
+    Column positions for the queue columns: {queue column: index}, plus
+    the index of a full-name column to take first_name from (or None).
+    `mapping` ({source header: queue column}) overrides the aliases.
+    Raises ValueError if a required column can't be found.
+    """
+    explicit = {_normalize_header(source): target for source, target in (mapping or {}).items()}
+    unknown = set(explicit.values()) - set(QUEUE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown target columns: {sorted(unknown)}")
+
+    positions, full_name = {}, None
+    for index, name in enumerate(header):
+        normalized = _normalize_header(name)
+        target = explicit.get(normalized) or COLUMN_ALIASES.get(normalized)
+        if target and target not in positions:
+            positions[target] = index
+        elif normalized in FULL_NAME_ALIASES and full_name is None:
+            full_name = index
+    if 'first_name' in positions:
+        full_name = None
+
+    missing = [col for col in REQUIRED_COLUMNS
+               if col not in positions and not (col == 'first_name' and full_name is not None)]
+    if missing:
+        raise ValueError(f"Missing required columns: {missing} (header: {header})")
+    return positions, full_name
+
+def validate_batch(rows, positions, full_name, fold_gmail=False):
+    """
+    Map raw rows onto QUEUE_COLUMNS and validate them.
+    Returns (records, invalid_email, missing_fields) where each record is
+    (values, key, address): the row in QUEUE_COLUMNS order, the HashIndex
+    key and the canonical address. Runs in worker processes, so it only
+    takes and returns plain data.
+    """
+    records, invalid_email, missing_fields = [], 0, 0
+    order = [positions.get(target) for target in QUEUE_COLUMNS]
+    width = max(index for index in order if index is not None) + 1
+    for row in rows:
+        if len(row) >= width:
+            values = [row[index].strip() if index is not None else '' for index in order]
+        else:  # short row
+            values = [row[index].strip() if index is not None and index < len(row) else ''
+                      for index in order]
+        if full_name is not None and not values[0] and full_name < len(row):
+            values[0] = (row[full_name].split() or [''])[0]
+        if not all(values[column] for column in _REQUIRED_POSITIONS):
+            missing_fields += 1
+            continue
+        address = canonicalize(values[1], fold_gmail)
+        if not address or not EMAIL_PATTERN.fullmatch(address):
+            invalid_email += 1
+            continue
+        records.append((values, key_of(address), address))
+    return records, invalid_email, missing_fields
+
+class ImportStats:
+    """Counters for one import; `rate` is input rows per second"""
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid_email = 0
+        self.missing_fields = 0
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.encoding = None
+        self.started = time.time()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def rate(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'invalid_email': self.invalid_email,
+            'missing_fields': self.missing_fields,
+            'bytes_read': self.bytes_read,
+            'total_bytes': self.total_bytes,
+            'encoding': self.encoding,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_sec': round(self.rate, 1),
+            'done': self.finished is not None,
+        }
+
+class CSVImporter:
+    """
+    Usage:
+        stats = CSVImporter(progress=print_progress).run("leads.csv")
+    `workers` validation processes (default: up to 4 for files over
+    PARALLEL_MIN_BYTES, else in-process); `progress(stats)` is called at
+    most every `progress_every` seconds and once at the end. With
+    dry_run=True nothing is written.
+    """
+    def __init__(self, queue_csv=QUEUE_CSV, mapping=None, encoding=None, workers=None,
+                 batch_size=DEFAULT_BATCH_SIZE, dry_run=False, progress=None,
+                 progress_every=1.0, index_path=HASH_INDEX, dedup_index=None):
+        self.queue_csv = queue_csv
+        self.mapping = mapping
+        self.encoding = encoding
+        self.workers = workers
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.progress_every = progress_every
+        self.index_path = index_path
+        self.dedup_index = dedup_index or get_dedup_index()
+        self._dry_run_seen = set()
+
+    def run(self, path):
+        with open(path, 'rb') as f:
+            return self.import_stream(f, total_bytes=os.path.getsize(path), name=path)
+
+    def import_stream(self, stream, total_bytes=None, name="stream"):
+        """
+        Import from any binary stream with a read(n) method (an open file,
+        an upload being received); rows are processed as bytes arrive.
+        """
+        stats = ImportStats()
+        self._dry_run_seen = set()
+        stats.total_bytes = total_bytes or 0
+        head = stream.read(SAMPLE_BYTES)
+        stats.encoding = self.encoding or sniff_encoding(head)
+        workers = self.workers
+        if workers is None:
+            workers = min(4, os.cpu_count() or 1) if stats.total_bytes > PARALLEL_MIN_BYTES else 0
+
+        raw = _Replay(head, stream)
+        f = io.TextIOWrapper(io.BufferedReader(raw, SAMPLE_BYTES), encoding=stats.encoding,
+                             errors='replace', newline='')
+        with f, FileLock(self.index_path):
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError(f"{name} is empty")
+            if not self.mapping and any('@' in value for value in header):
+                # No header row: Name, Email, Company, Position, LinkedIn by position
+                positions, full_name = HEADERLESS_POSITIONS, 0
+                reader = chain([header], reader)
+            else:
+                positions, full_name = map_columns(header, self.mapping)
+            logger.info(f"Importing {name} ({stats.encoding}), columns: {positions}")
+
+            with HashIndex(self.index_path, self.dedup_index.path) as index:
+                index.sync()
+                batches = self._validated(self._batches(reader, raw, stats), positions, full_name, workers)
+                last_report = 0.0
+                for records, invalid_email, missing_fields in batches:
+                    stats.invalid_email += invalid_email
+                    stats.missing_fields += missing_fields
+                    self._import_batch(records, index, stats)
+                    if self.progress and time.time() - last_report >= self.progress_every:
+                        last_report = time.time()
+                        self.progress(stats)
+                if not self.dry_run:
+                    # Catch up with lines other processes appended meanwhile
+                    index.sync()
+
+        stats.bytes_read = stats.total_bytes = raw.position
+        stats.finished = time.time()
+        if self.progress:
+            self.progress(stats)
+        logger.info(f"Import finished: {stats.as_dict()}")
+        return stats
+
+    def _batches(self, reader, raw, stats):
+        while True:
+            rows = []
+            for row in reader:
+                if row:
+                    rows.append(row)
+                    if len(rows) >= self.batch_size:
+                        break
+            if not rows:
+                return
+            stats.rows += len(rows)
+            stats.bytes_read = raw.position
+            yield rows
+
+    def _validated(self, batches, positions, full_name, workers):
+        """validate_batch() over every batch, in order; at most 2 batches per worker in flight"""
+        fold_gmail = self.dedup_index.fold_gmail
+        if workers <= 1:
+            for rows in batches:
+                yield validate_batch(rows, positions, full_name, fold_gmail)
+            return
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            pending = deque()
+            for rows in batches:
+                pending.append(pool.submit(validate_batch, rows, positions, full_name, fold_gmail))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _import_batch(self, records, index, stats):
+        against = FLAGS[QUEUE] | FLAGS[OUTREACH]
+        fresh = []
+        for values, key, address in records:
+            if index.flags(key) & against or key in self._dry_run_seen:
+                stats.duplicates += 1
+                continue
+            if self.dry_run:
+                self._dry_run_seen.add(key)  # leave the on-disk index untouched
+            else:
+                index.add(key, QUEUE)
+            fresh.append((values, address))
+        if not fresh or self.dry_run:
+            stats.imported += len(fresh)
+            return
+        self._append_rows([values for values, _ in fresh])
+        addresses = [address for _, address in fresh]
+        before = os.path.getsize(index.source) if os.path.exists(index.source) else 0
+        self.dedup_index.append_many(addresses, QUEUE)
+        if before == index.source_offset:
+            # Nobody else wrote in between: no need to replay our own lines into the table
+            written = sum(len(address.encode('utf-8')) + len(QUEUE) + 2 for address in addresses)
+            if os.path.getsize(index.source) == before + written:
+                index.source_offset += written
+        stats.imported += len(fresh)
+
+    def _append_rows(self, rows):
+        """One append per batch; the file is only rewritten if its header lacks queue columns"""
+        with FileLock(self.queue_csv):
+            header = self._queue_header()
+            order = [QUEUE_COLUMNS.index(name) if name in QUEUE_COLUMNS else None for name in header]
+            with open(self.queue_csv, 'a', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(
+                    [row[i] if i is not None else '' for i in order] for row in rows
+                )
+
+    def _queue_header(self):
+        if not os.path.exists(self.queue_csv) or os.path.getsize(self.queue_csv) == 0:
+            os.makedirs(os.path.dirname(self.queue_csv) or ".", exist_ok=True)
+            with open(self.queue_csv, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(QUEUE_COLUMNS)
+            return list(QUEUE_COLUMNS)
+
+        with open(self.queue_csv, 'r', newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f), [])
+        missing = [name for name in QUEUE_COLUMNS if name not in header]
+        if not missing:
+            return header
+
+        # Old queue without linkedin/phone: add the columns in one streaming pass
+        tmp_path = f"{self.queue_csv}.tmp"
+        with open(self.queue_csv, 'r', newline='', encoding='utf-8') as src, \
+                open(tmp_path, 'w', newline='', encoding='utf-8') as dst:
+            reader, writer = csv.reader(src), csv.writer(dst)
+            next(reader, None)
+            writer.writerow(header + missing)
+            for row in reader:
+                writer.writerow(row + [''] * (len(header) + len(missing) - len(row)))
+        os.replace(tmp_path, self.queue_csv)
+        return header + missing
+
+def print_progress(stats, stream=sys.stderr):
+    """One-line progress report, redrawn in place"""
+    percent = f"{stats.bytes_read / stats.total_bytes * 100:5.1f}%  " if stats.total_bytes else ""
+    end = "\n" if stats.finished else ""
+    stream.write(
+        f"\r{percent}{stats.rows:,} rows  {stats.rate:,.0f} rows/s  "
+        f"imported {stats.imported:,}  duplicates {stats.duplicates:,}  "
+        f"invalid {stats.invalid_email + stats.missing_fields:,}{end}"
+    )
+    stream.flush()
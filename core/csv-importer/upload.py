@@ -0,0 +1,131 @@
+"""
+Streaming CSV uploads for the dashboard.
+MultipartFileStream turns a multipart/form-data request body into a
+readable stream of one file field's bytes, decoding the body as it is
+read from the socket, so CSVImporter.import_stream() validates, dedups
+and writes rows while the upload is still arriving. Neither the body
+nor the file is ever held whole in memory or spooled to disk.
+UploadJobs tracks each upload's progress under a job id.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+READ_SIZE = 64 * 1024
+
+class MultipartFileStream:
+    """
+    Usage:
+        stream = MultipartFileStream(request.stream, boundary, field="file")
+        importer.import_stream(stream)
+    read(n) returns the next bytes of the `field` file part ('' at its
+    end); other form fields are skipped. `filename` is set once the part
+    header has been read.
+    """
+    def __init__(self, body, boundary, field="file", read_size=READ_SIZE):
+        from werkzeug.sansio.multipart import MultipartDecoder
+        self._body = body
+        self._decoder = MultipartDecoder(boundary.encode('latin-1') if isinstance(boundary, str) else boundary)
+        self._field = field
+        self._read_size = read_size
+        self._buffer = bytearray()
+        self._in_file = False
+        self._done = False
+        self.filename = None
+        self.body_bytes = 0
+
+    def read(self, n=-1):
+        while not self._done and (n < 0 or len(self._buffer) < n):
+            self._pump()
+        if n < 0 or n >= len(self._buffer):
+            data, self._buffer = bytes(self._buffer), bytearray()
+        else:
+            data = bytes(self._buffer[:n])
+            del self._buffer[:n]
+        return data
+
+    def start(self):
+        """Read up to the start of the file part (sets filename); False if the body has none"""
+        while not self._done and self.filename is None:
+            self._pump()
+        return self.filename is not None
+
+    def _pump(self):
+        from werkzeug.sansio.multipart import Data, Epilogue, File, NeedData
+        event = self._decoder.next_event()
+        while isinstance(event, NeedData):
+            chunk = self._body.read(self._read_size)
+            self.body_bytes += len(chunk)
+            self._decoder.receive_data(chunk or None)
+            event = self._decoder.next_event()
+            if not chunk and isinstance(event, NeedData):
+                raise ValueError("Upload ended before the multipart body was complete")
+
+        if isinstance(event, File) and event.name == self._field and self.filename is None:
+            self._in_file = True
+            self.filename = event.filename
+        elif isinstance(event, Data):
+            if self._in_file:
+                self._buffer += event.data
+                if not event.more_data:
+                    self._in_file = False
+                    self._done = True  # the rest of the body is other fields; not needed
+        elif isinstance(event, Epilogue):
+            self._done = True
+
+class UploadJobs:
+    """
+    In-memory registry of upload jobs for progress polling; only the
+    most recent `keep` jobs are remembered.
+    Job lifecycle: waiting -> running -> done | failed
+    """
+    def __init__(self, keep=50):
+        self.keep = keep
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self):
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._jobs[job_id] = {
+                'id': job_id,
+                'status': 'waiting',
+                'filename': None,
+                'progress': {},
+                'error': None,
+                'created_at': datetime.now().isoformat(),
+                'finished_at': None,
+            }
+            while len(self._jobs) > self.keep:
+                self._jobs.popitem(last=False)
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def start(self, job_id, filename=None):
+        """waiting -> running; False if the job is unknown or already used"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job['status'] != 'waiting':
+                return False
+            job.update(status='running', filename=filename)
+            return True
+
+    def update(self, job_id, stats):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id]['progress'] = stats.as_dict()
+
+    def finish(self, job_id, stats=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            if stats is not None:
+                job['progress'] = stats.as_dict()
+            job.update(status='failed' if error else 'done', error=error,
+                       finished_at=datetime.now().isoformat())
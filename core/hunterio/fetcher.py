@@ -84,7 +84,7 @@ def fetch_all_hunter_leads():
     return all_leads
 
 def save_to_dashboard(leads):
-    """Save leads to discovery_results.json for dashboard"""
+    """Append leads to the dashboard's discovery store (logs/discovery_results.jsonl)"""
     
     if not leads:
         print("\n❌ No leads to save")
@@ -99,12 +99,17 @@ def save_to_dashboard(leads):
     for lead in leads:
         lead['timestamp'] = timestamp
     
-    # Save to discovery log
-    os.makedirs("logs", exist_ok=True)
-    with open("logs/discovery_results.json", 'w') as f:
-        json.dump(leads, f, indent=2)
+    # Save to discovery log, skipping emails the dashboard already has
+    from core.utils.discovery_store import DiscoveryStore
+    from core.utils.dedup_index import get_dedup_index, DISCOVERY
+    dedup_index = get_dedup_index()
+    leads, skipped = dedup_index.filter_new(leads, DISCOVERY, record=False)
+    store = DiscoveryStore()
+    store.append(leads)
+    dedup_index.add_many([lead['email'] for lead in leads], DISCOVERY)
+    print(f"⏭️  Skipped {skipped} leads already in the dashboard")
     
-    print("✅ Saved to: logs/discovery_results.json")
+    print(f"✅ Saved to: {store.path}")
     
     # Show sample
     print(f"\n📧 Sample leads:")
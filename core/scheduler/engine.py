@@ -0,0 +1,326 @@
+"""
+Event-driven scheduler engine.
+Jobs sit in a heap ordered by their next due time; the scheduler thread
+sleeps until exactly that moment (or until it is notified that the
+config changed) instead of polling. The clock is injectable so the same
+engine runs deterministically under FakeClock.
+"""
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("Scheduler")
+
+SCHEDULER_STATE = os.path.join("logs", "scheduler_state.json")
+
+class SystemClock:
+    """Wall-clock time; waits are real Condition timeouts"""
+    def now(self):
+        return datetime.now()
+
+    def wait(self, condition, timeout):
+        condition.wait(timeout)
+
+class FakeClock:
+    """
+    Manually advanced clock for deterministic runs.
+    wait() blocks until advance() (or a notify) instead of real time passing.
+    """
+    def __init__(self, start=None):
+        self._now = start or datetime(2025, 1, 1, 9, 0)
+        self._conditions = set()
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def wait(self, condition, timeout):
+        with self._lock:
+            self._conditions.add(condition)
+        condition.wait()
+
+    def advance(self, seconds=0, **kwargs):
+        """Move time forward and wake every scheduler waiting on this clock"""
+        self._now += timedelta(seconds=seconds, **kwargs)
+        with self._lock:
+            conditions = list(self._conditions)
+        for condition in conditions:
+            with condition:
+                condition.notify_all()
+
+class ScheduledJob:
+    """A callback due at next_run, optionally repeating every `interval`"""
+    def __init__(self, name, callback, next_run, interval=None, end_time=None):
+        self.name = name
+        self.callback = callback
+        self.next_run = next_run
+        self.interval = interval
+        self.end_time = end_time
+        self.last_run = None
+        self.cancelled = False
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "next_run": self.next_run.strftime("%Y-%m-%d %H:%M:%S") if self.next_run else None,
+            "last_run": self.last_run.strftime("%Y-%m-%d %H:%M:%S") if self.last_run else None,
+            "interval_minutes": self.interval.total_seconds() / 60 if self.interval else None
+        }
+
+class Scheduler:
+    """
+    Heap-ordered timer queue. Cancelled/replaced jobs are dropped lazily
+    when they reach the top of the heap. Last run times are persisted to
+    `state_path` so intervals survive restarts. A callback returning False
+    means "couldn't run now" and is retried after `retry_delay`.
+    """
+    def __init__(self, clock=None, state_path=SCHEDULER_STATE, retry_delay=timedelta(seconds=30)):
+        self.clock = clock or SystemClock()
+        self.state_path = state_path
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._jobs = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._last_runs = self._load_state()
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, 'r') as f:
+                return {name: datetime.fromisoformat(ts) for name, ts in json.load(f).items()}
+        except (ValueError, OSError):
+            return {}
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({name: ts.isoformat() for name, ts in self._last_runs.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def last_run(self, name):
+        return self._last_runs.get(name)
+
+    def add_job(self, name, callback, next_run, interval=None, end_time=None):
+        """Schedule (or replace) a job; wakes the loop if it is now the earliest"""
+        with self._cond:
+            self._remove(name)
+            job = ScheduledJob(name, callback, next_run, interval, end_time)
+            job.last_run = self._last_runs.get(name)
+            self._jobs[name] = job
+            heapq.heappush(self._heap, (next_run, next(self._seq), job))
+            self._cond.notify_all()
+            return job
+
+    def _remove(self, name):
+        job = self._jobs.pop(name, None)
+        if job:
+            job.cancelled = True
+
+    def remove_job(self, name):
+        with self._cond:
+            self._remove(name)
+            self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            for name in list(self._jobs):
+                self._remove(name)
+            self._heap = []
+            self._cond.notify_all()
+
+    def jobs(self):
+        with self._cond:
+            return sorted(self._jobs.values(), key=lambda j: j.next_run)
+
+    def next_due(self):
+        """Earliest live job, dropping cancelled heap entries on the way"""
+        with self._cond:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            return self._heap[0][2] if self._heap else None
+
+    def notify(self):
+        """Wake the loop to re-evaluate (e.g. after a config change)"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def _pop_due(self):
+        job = self.next_due()
+        if job and job.next_run <= self.clock.now():
+            heapq.heappop(self._heap)
+            return job
+        return None
+
+    def _execute(self, job):
+        now = self.clock.now()
+        try:
+            result = job.callback(job)
+        except Exception:
+            logger.exception(f"Scheduled job '{job.name}' failed")
+            result = None
+
+        with self._cond:
+            if result is False and not job.cancelled:
+                job.next_run = now + self.retry_delay
+                heapq.heappush(self._heap, (job.next_run, next(self._seq), job))
+                return
+            job.last_run = now
+            self._last_runs[job.name] = now
+            self._save_state()
+            if job.cancelled or not job.interval:
+                if self._jobs.get(job.name) is job:
+                    del self._jobs[job.name]
+                return
+            # Next slot after the one just served; skip slots missed while down
+            next_run = job.next_run + job.interval
+            if next_run <= now:
+                next_run = now + job.interval
+            if job.end_time and next_run > job.end_time:
+                del self._jobs[job.name]
+                return
+            job.next_run = next_run
+            heapq.heappush(self._heap, (next_run, next(self._seq), job))
+
+    def run_pending(self):
+        """Run every job due at clock.now() synchronously; returns their names"""
+        ran = []
+        while True:
+            with self._cond:
+                job = self._pop_due()
+            if not job:
+                return ran
+            self._execute(job)
+            ran.append(job.name)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                job = self._pop_due()
+                if not job:
+                    upcoming = self.next_due()
+                    timeout = None
+                    if upcoming:
+                        timeout = max((upcoming.next_run - self.clock.now()).total_seconds(), 0)
+                    # Sleeps until the next due time, a new job, or notify()
+                    self.clock.wait(self._cond, timeout)
+                    continue
+            self._execute(job)
+
+def parse_start_time(value):
+    """Parse 'YYYY-MM-DDTHH:MM', 'YYYY-MM-DD HH:MM' or 'YYYY-MM-DD'"""
+    clean = (value or "").replace("T", " ").strip()
+    if not clean:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(clean, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unknown format: {value}")
+
+def schedules_from_config(config):
+    """
+    Schedules defined in config/schedule.json. A "schedules" list gives
+    several named schedules; otherwise the top-level keys form one
+    'default' schedule. Keys missing from an entry fall back to the
+    top-level values.
+    """
+    if not config or not config.get("auto_enabled", False):
+        return []
+
+    defaults = {k: v for k, v in config.items() if k != "schedules"}
+    entries = config.get("schedules") or [dict(defaults, name="default")]
+
+    schedules = []
+    for i, entry in enumerate(entries):
+        merged = dict(defaults, **entry)
+        if not merged.get("enabled", True):
+            continue
+        schedules.append({
+            "name": merged.get("name") or f"schedule-{i + 1}",
+            "start_time": parse_start_time(merged.get("start_time")),
+            "end_time": parse_start_time(merged.get("end_time")),
+            "interval": timedelta(minutes=float(merged.get("batch_interval", 60))),
+            "batch_size": int(merged.get("batch_size", 5)),
+            "delay_seconds": int(merged.get("delay_seconds", 30))
+        })
+    return schedules
+
+def first_run_time(schedule, last_run, now):
+    """
+    When a schedule should next fire:
+    a future start_time always wins (allows rescheduling), otherwise
+    last_run + interval, or right away if it never ran or that is past.
+    """
+    start = schedule["start_time"]
+    if start and start > now:
+        return start
+    if last_run is None:
+        return now
+    return max(last_run + schedule["interval"], now)
+
+class ConfigWatcher:
+    """
+    Watches a config file's mtime and calls on_change when it moves.
+    A stat() every `interval` seconds is all it costs; in-process writers
+    can call trigger() for an immediate reload.
+    """
+    def __init__(self, path, on_change, interval=2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._mtime = self._current_mtime()
+        self._event = threading.Event()
+        self._thread = None
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def trigger(self):
+        self._event.set()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            triggered = self._event.wait(self.interval)
+            self._event.clear()
+            mtime = self._current_mtime()
+            if triggered or mtime != self._mtime:
+                self._mtime = mtime
+                try:
+                    self.on_change()
+                except Exception:
+                    logger.exception("Config reload failed")
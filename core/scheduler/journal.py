@@ -0,0 +1,137 @@
+"""
+Write-ahead journal for outreach batches.
+Before a batch sends anything, its planned leads are written to
+logs/batch_journal.jsonl; every lead then moves through
+drafted -> sent -> audited (or failed/skipped) with a cursor record
+after each one. A crashed batch is recovered from the journal: sends
+that never reached the audit log are audited without re-sending, and
+the rest of the plan resumes at the cursor without rescanning the queue.
+A batch is only resumed by a run over the same CSV (params["csv_path"]);
+one planned from another CSV stays open until such a run comes along.
+"""
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from core.agents.lead import Lead
+
+BATCH_JOURNAL = os.path.join("logs", "batch_journal.jsonl")
+
+# Per-lead states: drafted -> sent -> audited, or failed/skipped
+LEAD_STATES = ('drafted', 'sent', 'audited', 'failed', 'skipped')
+
+class JournalBatch:
+    """In-memory view of one batch rebuilt from journal records"""
+    def __init__(self, batch_id, leads, params=None, created_at=None):
+        self.batch_id = batch_id
+        self.leads = leads
+        self.params = params or {}
+        self.created_at = created_at
+        self.cursor = 0
+        self.states = {}      # email -> latest state
+        self.details = {}     # email -> merged details (subject, template_used, ...)
+
+    def pending_leads(self):
+        """Planned leads from the cursor onwards"""
+        return self.leads[self.cursor:]
+
+    def unaudited(self):
+        """Leads whose send succeeded but never reached the audit log"""
+        return [(email, self.details.get(email, {})) for email, state in self.states.items() if state == 'sent']
+
+    def is_for(self, csv_path):
+        """Whether this batch was planned from `csv_path` (batches without one match any)"""
+        recorded = self.params.get('csv_path')
+        return recorded is None or os.path.abspath(recorded) == os.path.abspath(csv_path)
+
+class BatchJournal:
+    """
+    Append-only, fsync'd journal of open batches, normally just one.
+    Once a batch commits the file is cut back to the batches still open
+    (truncated when there are none), so it never grows past their size.
+    """
+    def __init__(self, path=BATCH_JOURNAL):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _append(self, record):
+        record['at'] = datetime.now().isoformat()
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+
+    def open_batches(self):
+        """Replay the journal; every unfinished JournalBatch, oldest first"""
+        batches = {}
+        for record in self._records():
+            kind, batch_id = record.get('type'), record.get('batch_id')
+            if kind == 'plan':
+                batches[batch_id] = JournalBatch(batch_id,
+                                                 [Lead.from_record(lead) for lead in record.get('leads', [])],
+                                                 record.get('params'), record.get('at'))
+                continue
+            batch = batches.get(batch_id)
+            if batch is None:
+                continue
+            if kind == 'lead':
+                batch.states[record['email']] = record['state']
+                batch.details.setdefault(record['email'], {}).update(record.get('details') or {})
+            elif kind == 'cursor':
+                batch.cursor = record['position']
+            elif kind == 'commit':
+                del batches[batch_id]
+        return list(batches.values())
+
+    def recover(self, csv_path=None):
+        """The newest unfinished JournalBatch (planned from `csv_path`, if given) or None"""
+        for batch in reversed(self.open_batches()):
+            if csv_path is None or batch.is_for(csv_path):
+                return batch
+        return None
+
+    def begin(self, leads, params=None):
+        """Record the planned leads before anything is sent"""
+        batch = JournalBatch(uuid.uuid4().hex[:12], leads, params)
+        self._append({'type': 'plan', 'batch_id': batch.batch_id,
+                      'leads': [Lead.from_record(lead).to_dict() for lead in leads], 'params': params or {}})
+        return batch
+
+    def record(self, batch, email, state, **details):
+        """Move one lead to `state` (see LEAD_STATES)"""
+        self._append({'type': 'lead', 'batch_id': batch.batch_id, 'email': email,
+                      'state': state, 'details': details})
+        batch.states[email] = state
+        batch.details.setdefault(email, {}).update(details)
+
+    def advance(self, batch, position):
+        """Persist the cursor: leads before `position` are done"""
+        self._append({'type': 'cursor', 'batch_id': batch.batch_id, 'position': position})
+        batch.cursor = position
+
+    def commit(self, batch):
+        """Close the batch and drop its records (other open batches keep theirs)"""
+        self._append({'type': 'commit', 'batch_id': batch.batch_id})
+        with self._lock:
+            still_open = {other.batch_id for other in self.open_batches()}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                for record in self._records() if still_open else ():
+                    if record.get('batch_id') in still_open:
+                        f.write(json.dumps(record) + "\n")
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,129 @@
+"""
+Send-window planner.
+Turns config/schedule.json (business hours, daily_limit, delay_seconds,
+start_time/end_time) into concrete dispatch times, computed once per
+batch instead of re-checking the clock and config for every lead. Slots
+are `delay` seconds apart plus a random jitter; the window only decides
+when a day's sends may start and stop, and daily_limit how many of them
+there are. A batch started outside the window waits for it to open, and
+when a window closes (or the day's quota is used up) the timeline
+continues at the next day's window, so a batch sleeps until its next
+slot instead of giving up.
+Given a `clock`, slots() also keeps that spacing after a stall (slow
+draft, SMTP timeout): a slot is never earlier than the previous send plus
+its planned gap, so overdue slots don't fire back to back. A slot that
+would only be used after its window's end is dropped, so neither the
+window nor the daily limit is overrun.
+"""
+import random
+from datetime import datetime, time as dtime, timedelta
+
+from core.scheduler.engine import parse_start_time
+
+DEFAULT_JITTER = 0.3  # up to this fraction of `delay` is added to each gap
+
+class SendPlanner:
+    """
+    Usage:
+        planner = SendPlanner(load_schedule_config(), delay=30, sent_today=12)
+        for slot in planner.slots():   # datetimes, earliest first
+            sleep_until(slot); send()
+    `shard=(index, count)` yields every count-th slot of the same timeline,
+    so cooperating workers built with the same `now` and `seed` never
+    share a slot. `clock` (e.g. datetime.now) is read each time the next
+    slot is asked for, i.e. right after the previous send.
+    """
+    def __init__(self, config=None, delay=None, sent_today=0, now=None, seed=None,
+                 jitter=DEFAULT_JITTER, shard=None, clock=None):
+        config = config or {}
+        self.business_hours_only = bool(config.get("business_hours_only", False))
+        self.start_hour = int(config.get("start_hour", 9))
+        self.end_hour = int(config.get("end_hour", 17))
+        daily_limit = config.get("daily_limit")
+        self.daily_limit = int(daily_limit) if daily_limit is not None else None
+        self.delay = float(delay if delay is not None else config.get("delay_seconds", 30))
+        self.start_time = parse_start_time(config.get("start_time")) if config.get("start_time") else None
+        self.end_time = parse_start_time(config.get("end_time")) if config.get("end_time") else None
+        self.sent_today = sent_today
+        self.now = now or datetime.now()
+        self.jitter = jitter
+        self.shard = shard
+        self.clock = clock
+        self._random = random.Random(seed)
+
+    def window(self, day):
+        """(start, end) datetimes in which sending is allowed on `day`"""
+        if self.business_hours_only:
+            start = datetime.combine(day, dtime(self.start_hour))
+            end = datetime.combine(day, dtime()) + timedelta(hours=self.end_hour)
+        else:
+            start = datetime.combine(day, dtime())
+            end = start + timedelta(days=1)
+        if self.start_time:
+            start = max(start, self.start_time)
+        if self.end_time:
+            end = min(end, self.end_time)
+        return start, end
+
+    def _day_slots(self, day, previous):
+        start, end = self.window(day)
+        start = max(start, self.now)
+        if previous:
+            start = max(start, previous + timedelta(seconds=self.delay))
+        if start >= end:
+            return
+
+        quota = None
+        if self.daily_limit is not None:
+            quota = self.daily_limit - (self.sent_today if day == self.now.date() else 0)
+            if quota <= 0:
+                return
+
+        count = 0
+        slot = start
+        while quota is None or count < quota:
+            if count:
+                slot += timedelta(seconds=self.delay + self._random.uniform(0, self.jitter * self.delay))
+            if slot >= end:
+                return
+            yield slot
+            count += 1
+
+    def slots(self):
+        """Dispatch times from `now` on; ends only at end_time"""
+        if self.daily_limit == 0 or (self.business_hours_only and self.end_hour <= self.start_hour):
+            return
+        day = self.now.date()
+        previous = None
+        index = 0
+        step = self.shard[1] if self.shard else 1
+        # Longest planned gap between two of our slots within a day
+        max_gap = timedelta(seconds=self.delay * (1 + self.jitter) * step)
+        mine = fired = None  # our previous planned slot, and when it was actually used
+        while True:
+            if self.end_time and datetime.combine(day, dtime()) >= self.end_time:
+                return
+            end = self.window(day)[1]
+            for slot in self._day_slots(day, previous):
+                previous = slot
+                if self.shard is None or index % self.shard[1] == self.shard[0]:
+                    due = slot
+                    if fired is not None and fired > mine:
+                        # The previous send went out late: keep its gap from when it really did
+                        due = max(slot, fired + min(slot - mine, max_gap))
+                    mine = slot
+                    used = max(due, self.clock()) if self.clock else due  # an overdue slot is used right away
+                    if used < end:
+                        fired = used
+                        yield due
+                index += 1
+            day += timedelta(days=1)
+
+    def timeline(self, count):
+        """The next `count` dispatch times as a list"""
+        timeline = []
+        for slot in self.slots():
+            if len(timeline) >= count:
+                break
+            timeline.append(slot)
+        return timeline
@@ -0,0 +1,299 @@
+"""
+Retry queue for failed first emails.
+A lead whose send (FAILED_SEND) or draft (FAILED_LLM) fails gets one row
+in logs/retry_queue.db instead of being forgotten: the error is
+classified, transient failures are scheduled again with exponential
+backoff and jitter, and permanent ones (or a lead out of attempts) are
+parked as 'dead'. Failures on the sender's side (bad SMTP credentials, every
+account out of quota) are retried without using up the lead's attempts.
+run_outreach_pipeline interleaves due retries with
+fresh leads (one after every `retry_interleave` fresh ones, then any
+left once the fresh leads run out) and skips queued leads when reading
+the CSV, so a failed lead comes back on its own schedule rather than
+on every batch. Dead leads stay out of fresh reads until requeue() (POST
+/api/retries/requeue) gives them a new set of attempts.
+
+Row lifecycle:
+    pending -> claimed (taken by a pipeline) -> sending -> done
+                                                       -> pending (transient, attempts left)
+                                                       -> dead (permanent, or out of attempts)
+Claims carry the claiming RetryQueue's id. A claim held longer than
+STALE_CLAIM (its pipeline died, or is still waiting for a send slot) is
+handed back, and the old owner then finds it can no longer start the
+send; a lead left mid-send that long is parked as dead rather than risk
+sending it twice.
+
+Settings (config/schedule.json):
+    retry_max_attempts   failed attempts before a lead is dead (default 5)
+    retry_base_minutes   first backoff; doubles per attempt (default 5)
+    retry_max_minutes    backoff ceiling (default 360)
+    retry_interleave     fresh leads between two retries (default 4)
+"""
+import json
+import logging
+import os
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger("Retries")
+
+RETRY_QUEUE_DB = os.path.join("logs", "retry_queue.db")
+
+DEFAULT_RETRY_SETTINGS = {
+    "retry_max_attempts": 5,
+    "retry_base_minutes": 5,
+    "retry_max_minutes": 360,
+    "retry_interleave": 4,
+}
+
+# pending -> claimed -> sending -> done | pending | dead
+RETRY_STATUSES = ('pending', 'claimed', 'sending', 'done', 'dead')
+# Pipeline stage that failed
+SEND, LLM = 'send', 'llm'
+
+STALE_CLAIM = 3600
+
+TRANSIENT, PERMANENT, SENDER = 'transient', 'permanent', 'sender'
+
+def classify_error(error):
+    """
+    'transient', 'permanent' or 'sender' for an exception from a send or
+    LLM call. 'sender' is a failure of the sending account rather than
+    the lead: rejected credentials or sender address, or no account with
+    quota left (sender_pool.QuotaExhausted); it is the configuration that
+    has to change, so it never counts against the lead. SMTP replies
+    otherwise follow their code class (4xx try again later, 5xx
+    rejected); a refused recipient list is transient only if every
+    refusal was. HTTP APIs (Groq) are transient on 408/409/429 and 5xx,
+    permanent on other 4xx. Dropped connections and timeouts are
+    transient. Bad data in the lead itself (ValueError, KeyError, ...) is
+    permanent; anything else, including a failure without an exception,
+    is transient and bounded by retry_max_attempts.
+    """
+    if error is None:
+        return TRANSIENT
+    if isinstance(error, (smtplib.SMTPAuthenticationError, smtplib.SMTPSenderRefused)):
+        return SENDER
+    if type(error).__name__ == "QuotaExhausted":
+        return SENDER  # core.agents.sender_pool, without importing it
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return TRANSIENT if codes and all(400 <= code < 500 for code in codes) else PERMANENT
+    if isinstance(error, smtplib.SMTPResponseException):
+        return TRANSIENT if 400 <= error.smtp_code < 500 else PERMANENT
+    if isinstance(error, (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError,
+                          socket.timeout, socket.gaierror)):
+        return TRANSIENT
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return TRANSIENT if status in (408, 409, 429) or status >= 500 else PERMANENT
+    name = type(error).__name__
+    if "Timeout" in name or "Connection" in name:
+        return TRANSIENT  # e.g. groq.APIConnectionError, without importing groq
+    if isinstance(error, (ValueError, KeyError, TypeError, AttributeError)):
+        return PERMANENT
+    return TRANSIENT
+
+def retry_settings(config=None):
+    """Backoff settings from the schedule config, with defaults"""
+    if config is None:
+        from core.utils.config import load_schedule_config
+        config = load_schedule_config()
+    return {key: config.get(key, default) for key, default in DEFAULT_RETRY_SETTINGS.items()}
+
+def backoff_delay(attempts, base_minutes, max_minutes, rng=random):
+    """
+    Seconds before retry number `attempts`: base * 2^(attempts-1), capped,
+    with equal jitter (half fixed, half random) so leads that failed
+    together (an outage) don't all come back in the same minute.
+    """
+    delay = min(base_minutes * 2 ** (attempts - 1), max_minutes) * 60
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+class RetryQueue:
+    """
+    One row per lead with a failed first email: the lead, the failing
+    stage, attempts so far, the next due time and the last error.
+    """
+    def __init__(self, db_path=RETRY_QUEUE_DB, settings=None):
+        self.db_path = db_path
+        self._settings = settings
+        self._owner = uuid.uuid4().hex[:12]  # marks this pipeline's claims
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS retries (
+                email TEXT PRIMARY KEY,
+                lead TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                due_at REAL,
+                status TEXT NOT NULL,
+                last_error TEXT,
+                error_kind TEXT,
+                claimed_by TEXT,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_retries_due ON retries (status, due_at)")
+
+    @property
+    def settings(self):
+        # Read per use so schedule.json edits apply without a restart
+        return self._settings if self._settings is not None else retry_settings()
+
+    @property
+    def interleave(self):
+        return max(int(self.settings["retry_interleave"]), 0)
+
+    def record_failure(self, lead, stage, error=None, now=None):
+        """
+        Count one failed attempt for `lead` (a Lead) and schedule the next
+        one, or park it as dead. A sender-side failure is scheduled again
+        without counting. Returns (status, due_at).
+        """
+        settings = self.settings
+        now = now or time.time()
+        kind = classify_error(error)
+        email = lead.email.lower()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT attempts FROM retries WHERE email = ?", (email,)).fetchone()
+            attempts = (row[0] if row else 0) + (kind != SENDER)
+            if kind == PERMANENT or attempts >= settings["retry_max_attempts"]:
+                status, due_at = 'dead', None
+            else:
+                status = 'pending'
+                due_at = now + backoff_delay(max(attempts, 1), settings["retry_base_minutes"],
+                                             settings["retry_max_minutes"])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO retries "
+                "(email, lead, stage, attempts, due_at, status, last_error, error_kind, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (email, json.dumps(lead.to_dict()), stage, attempts, due_at, status,
+                 None if error is None else str(error)[:500], kind, now)
+            )
+        return status, due_at
+
+    def take(self, now=None):
+        """
+        Claim the earliest due retry for this pipeline, as (Lead, attempts),
+        or None. Claims are per row, so several --workers processes never
+        take the same lead.
+        """
+        from core.agents.lead import Lead
+        now = now or time.time()
+        with self._lock:
+            self._expire_claims(now)
+            while True:
+                row = self._conn.execute(
+                    "SELECT email, lead, attempts FROM retries WHERE status = 'pending' AND due_at <= ? "
+                    "ORDER BY due_at LIMIT 1", (now,)
+                ).fetchone()
+                if row is None:
+                    return None
+                with self._conn:
+                    claimed = self._conn.execute(
+                        "UPDATE retries SET status = 'claimed', claimed_by = ?, updated_at = ? "
+                        "WHERE email = ? AND status = 'pending'",
+                        (self._owner, now, row[0])
+                    ).rowcount
+                if claimed:
+                    return Lead.from_record(json.loads(row[1])), row[2]
+
+    def _expire_claims(self, now):
+        """Hand back claims from pipelines that died; mid-send ones become dead (lock held)"""
+        cutoff = now - STALE_CLAIM
+        with self._conn:
+            self._conn.execute(
+                "UPDATE retries SET status = 'pending', updated_at = ? WHERE status = 'claimed' AND updated_at < ?",
+                (now, cutoff)
+            )
+            self._conn.execute(
+                "UPDATE retries SET status = 'dead', due_at = NULL, last_error = 'interrupted during send', "
+                "updated_at = ? WHERE status = 'sending' AND updated_at < ?",
+                (now, cutoff)
+            )
+
+    def _update_claim(self, email, status, due_at=None):
+        """Move one of this pipeline's claims to `status`; False if it is no longer ours"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE retries SET status = ?, due_at = COALESCE(?, due_at), updated_at = ? "
+                "WHERE email = ? AND status IN ('claimed', 'sending') AND claimed_by = ?",
+                (status, due_at, time.time(), email.lower(), self._owner)
+            ).rowcount > 0
+
+    def sending(self, email):
+        """The claimed lead is about to be handed to SMTP; False means skip it (claim expired)"""
+        return self._update_claim(email, 'sending')
+
+    def release(self, email):
+        """A claimed lead was not attempted after all (cancelled, out of quota): due again now"""
+        self._update_claim(email, 'pending', time.time())
+
+    def done(self, email):
+        """The retry was sent, or the lead turned out to be contacted already"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE retries SET status = 'done', due_at = NULL, updated_at = ? WHERE email = ? AND status != 'dead'",
+                (time.time(), email.lower())
+            )
+
+    def requeue(self, emails=None):
+        """
+        Give dead leads (all of them, or just `emails`) a fresh set of
+        attempts, due now, e.g. once a broken sender config is fixed.
+        Returns how many were requeued.
+        """
+        query = "UPDATE retries SET status = 'pending', attempts = 0, due_at = ?, claimed_by = NULL, updated_at = ? " \
+                "WHERE status = 'dead'"
+        now = time.time()
+        with self._lock, self._conn:
+            if emails is None:
+                return self._conn.execute(query, (now, now)).rowcount
+            lowered = [str(email).lower() for email in emails]
+            requeued = 0
+            for start in range(0, len(lowered), 500):
+                chunk = lowered[start:start + 500]
+                requeued += self._conn.execute(
+                    f"{query} AND email IN ({','.join('?' * len(chunk))})", (now, now, *chunk)
+                ).rowcount
+            return requeued
+
+    def queued_mask(self, emails):
+        """
+        For each address, whether the retry queue owns it (fresh-lead reads
+        skip those): queued, in flight or dead, but not done.
+        """
+        lowered = [str(email).lower() for email in emails]
+        known = set()
+        with self._lock:
+            for start in range(0, len(lowered), 500):
+                chunk = lowered[start:start + 500]
+                known.update(email for (email,) in self._conn.execute(
+                    f"SELECT email FROM retries WHERE status != 'done' AND email IN ({','.join('?' * len(chunk))})", chunk
+                ))
+        return [email in known for email in lowered]
+
+    def is_queued(self, email):
+        return self.queued_mask([email])[0]
+
+    def next_due(self):
+        """Due time of the earliest pending retry, or None"""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(due_at) FROM retries WHERE status = 'pending'").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM retries GROUP BY status").fetchall())
+            due_now = self._conn.execute(
+                "SELECT COUNT(*) FROM retries WHERE status = 'pending' AND due_at <= ?", (time.time(),)
+            ).fetchone()[0]
+        return dict({status: counts.get(status, 0) for status in RETRY_STATUSES}, due_now=due_now)
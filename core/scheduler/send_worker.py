@@ -0,0 +1,200 @@
+"""
+Long-lived, in-process send worker.
+Replaces spawning `python main.py` per batch: jobs go into a persistent
+SQLite queue and a single background thread runs them through
+run_outreach_pipeline with agents that stay warm between batches.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger("SendWorker")
+
+SEND_JOBS_DB = os.path.join("logs", "send_jobs.db")
+
+# Job lifecycle: queued -> running -> done | failed | cancelled
+# (running jobs found at startup were cut off by a restart -> interrupted)
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled', 'interrupted')
+
+class SendWorker:
+    """
+    Background thread that drains a persistent queue of send jobs.
+    A job's params are the keyword arguments of run_outreach_pipeline
+    (csv_path, bio, limit, delay, force, test_mode, skip_inbox).
+    """
+    def __init__(self, db_path=SEND_JOBS_DB, pipeline=None, agent_factory=None):
+        self.db_path = db_path
+        self._pipeline = pipeline
+        self._agent_factory = agent_factory
+        self._agents = None
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._cancel_event = threading.Event()
+        self._current_job_id = None
+        self._thread = None
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                source TEXT,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                progress TEXT,
+                result TEXT,
+                error TEXT,
+                created_at TEXT,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        with self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'interrupted', finished_at = ? WHERE status = 'running'",
+                (datetime.now().isoformat(),)
+            )
+
+    def start(self):
+        """Start the worker thread (idempotent)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="send-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, params, source="manual"):
+        """Queue a batch; returns the job id immediately"""
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, source, status, params, progress, created_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, source, json.dumps(params), json.dumps({}), datetime.now().isoformat())
+            )
+        self._wakeup.set()
+        return job_id
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or stop the running one between emails"""
+        with self._lock, self._conn:
+            if job_id == self._current_job_id:
+                self._cancel_event.set()
+                return True
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (datetime.now().isoformat(), job_id)
+            )
+            return cursor.rowcount > 0
+
+    def is_busy(self):
+        """True while a job is running or waiting in the queue"""
+        with self._lock:
+            if self._current_job_id:
+                return True
+            return self._conn.execute("SELECT 1 FROM jobs WHERE status = 'queued' LIMIT 1").fetchone() is not None
+
+    @property
+    def current_job_id(self):
+        return self._current_job_id
+
+    def sender_status(self):
+        """Per-account quota/health when the warm email agent is a SenderPool"""
+        email_agent = (self._agents or {}).get("email")
+        return email_agent.status() if hasattr(email_agent, "status") else None
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, source, status, params, progress, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, limit=20):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, source, status, params, progress, result, error, created_at, started_at, finished_at "
+                "FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    @staticmethod
+    def _to_dict(row):
+        keys = ('id', 'source', 'status', 'params', 'progress', 'result', 'error',
+                'created_at', 'started_at', 'finished_at')
+        job = dict(zip(keys, row))
+        for key in ('params', 'progress', 'result'):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+    def _next_job(self):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, params FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if not row:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), row[0])
+            )
+            self._current_job_id = row[0]
+            self._cancel_event.clear()
+            return row[0], json.loads(row[1])
+
+    def _set_progress(self, job_id, progress):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", (json.dumps(progress), job_id))
+
+    def _finish(self, job_id, status, result=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error,
+                 datetime.now().isoformat(), job_id)
+            )
+            self._current_job_id = None
+
+    def _load_pipeline(self):
+        """Import the pipeline and build agents once; later jobs reuse them"""
+        if self._pipeline is None:
+            from main import run_outreach_pipeline
+            self._pipeline = run_outreach_pipeline
+        if self._agents is None:
+            if self._agent_factory is None:
+                from main import build_agents
+                self._agent_factory = build_agents
+            self._agents = self._agent_factory()
+
+    def _run(self):
+        logger.info("📮 Send worker started")
+        while True:
+            job = self._next_job()
+            if not job:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            job_id, params = job
+            logger.info(f"🚀 Running send job {job_id}: {params}")
+            try:
+                self._load_pipeline()
+                result = self._pipeline(
+                    agents=self._agents,
+                    cancel_event=self._cancel_event,
+                    progress_callback=lambda progress: self._set_progress(job_id, progress),
+                    **params
+                ) or {}
+                status = 'cancelled' if result.get('cancelled') else 'done'
+                if result.get('error'):
+                    status = 'failed'
+                self._finish(job_id, status, result=result, error=result.get('error'))
+                logger.info(f"✅ Send job {job_id} {status}: {result}")
+            except Exception as e:
+                logger.exception(f"❌ Send job {job_id} failed")
+                self._finish(job_id, 'failed', error=str(e))
@@ -0,0 +1,191 @@
+"""
+Follow-up sequences.
+Every lead that receives a first email is enrolled in a sequence of
+follow-up steps (`follow_up_days` in config/schedule.json, days after the
+previous email). Each lead's next step is one row in logs/sequences.db;
+the (status, due_at) index makes "what is due now" a range scan that
+only touches due rows, so the store stays cheap with hundreds of
+thousands of leads mid-sequence. A reply cancels the remaining steps.
+Due steps are sent by run_outreach_pipeline through the normal email
+agent, audit log and metrics.
+"""
+import csv
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger("Sequences")
+
+SEQUENCES_DB = os.path.join("logs", "sequences.db")
+DEFAULT_FOLLOW_UP_DAYS = (3, 7)
+DAY = 24 * 3600
+
+# active -> done (all steps sent) | replied | cancelled
+SEQUENCE_STATUSES = ('active', 'done', 'replied', 'cancelled')
+
+def follow_up_days(config=None):
+    """Step delays (days) from the schedule config"""
+    if config is None:
+        from core.utils.config import load_schedule_config
+        config = load_schedule_config()
+    return tuple(config.get("follow_up_days", DEFAULT_FOLLOW_UP_DAYS))
+
+class SequenceStore:
+    """
+    One row per enrolled lead: the step that is due next and when.
+    `steps` are the follow-up delays in days; step 1 is the first
+    follow-up (the initial email is step 0).
+    """
+    def __init__(self, db_path=SEQUENCES_DB, steps=None, audit_log="logs/outreach_log.csv"):
+        self.db_path = db_path
+        self._steps = tuple(steps) if steps is not None else None
+        self._lock = threading.Lock()
+        new = not os.path.exists(db_path)
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sequences (
+                email TEXT PRIMARY KEY,
+                company TEXT,
+                first_name TEXT,
+                role_hiring_for TEXT,
+                subject TEXT,
+                step INTEGER NOT NULL,
+                due_at REAL,
+                status TEXT NOT NULL,
+                updated_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sequences_due ON sequences (status, due_at)")
+        if new and audit_log:
+            self.backfill(audit_log)
+
+    @property
+    def steps(self):
+        # Read per use so follow_up_days edits apply without a restart
+        return self._steps if self._steps is not None else follow_up_days()
+
+    def enroll(self, lead, subject=None, sent_at=None):
+        """Start a lead's sequence after its first email; no-op if already enrolled"""
+        steps = self.steps
+        if not steps:
+            return False
+        sent_at = sent_at or time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO sequences "
+                "(email, company, first_name, role_hiring_for, subject, step, due_at, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, 'active', ?)",
+                (lead['email'].lower(), lead.get('company'), lead.get('first_name'), lead.get('role_hiring_for'),
+                 subject, sent_at + steps[0] * DAY, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def due(self, now=None, limit=100):
+        """Active steps whose due time has passed, earliest first"""
+        now = now or time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT email, company, first_name, role_hiring_for, subject, step, due_at FROM sequences "
+                "WHERE status = 'active' AND due_at <= ? ORDER BY due_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        keys = ('email', 'company', 'first_name', 'role_hiring_for', 'subject', 'step', 'due_at')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def next_due(self):
+        """Due time of the earliest active step, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(due_at) FROM sequences WHERE status = 'active'"
+            ).fetchone()
+        return row[0]
+
+    def advance(self, email, sent_at=None):
+        """Mark the current step sent and schedule the next one (or finish)"""
+        steps = self.steps
+        sent_at = sent_at or time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT step FROM sequences WHERE email = ? AND status = 'active'", (email.lower(),)
+            ).fetchone()
+            if not row:
+                return
+            step = row[0] + 1
+            if step > len(steps):
+                self._conn.execute(
+                    "UPDATE sequences SET step = ?, due_at = NULL, status = 'done', updated_at = ? WHERE email = ?",
+                    (step, sent_at, email.lower())
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE sequences SET step = ?, due_at = ?, updated_at = ? WHERE email = ?",
+                    (step, sent_at + steps[step - 1] * DAY, sent_at, email.lower())
+                )
+
+    def postpone(self, email, seconds):
+        """Push a step back (e.g. its send failed) without losing its place"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sequences SET due_at = ?, updated_at = ? WHERE email = ? AND status = 'active'",
+                (time.time() + seconds, time.time(), email.lower())
+            )
+
+    def cancel(self, email, reason='cancelled'):
+        """Stop a lead's remaining steps (reason 'replied' when they answered)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE sequences SET status = ?, due_at = NULL, updated_at = ? WHERE email = ? AND status = 'active'",
+                (reason, time.time(), email.lower())
+            )
+            return cursor.rowcount > 0
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM sequences GROUP BY status").fetchall())
+            due_now = self._conn.execute(
+                "SELECT COUNT(*) FROM sequences WHERE status = 'active' AND due_at <= ?", (time.time(),)
+            ).fetchone()[0]
+        return dict({status: counts.get(status, 0) for status in SEQUENCE_STATUSES}, due_now=due_now)
+
+    def backfill(self, audit_log):
+        """Enroll leads already emailed before sequences existed (first run only)"""
+        if not os.path.exists(audit_log):
+            return 0
+        steps = self.steps
+        if not steps:
+            return 0
+        sent, replied = {}, set()
+        with open(audit_log, 'r', newline='', encoding='utf-8', errors='replace') as f:
+            for row in csv.DictReader(f):
+                email = (row.get('email') or '').lower()
+                if not email:
+                    continue
+                if row.get('status') == 'REPLIED':
+                    replied.add(email)
+                elif row.get('status') == 'SENT' and email not in sent:
+                    try:
+                        sent_at = datetime.fromisoformat(row['timestamp']).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        sent_at = time.time()
+                    sent[email] = (row.get('company'), row.get('subject'), sent_at)
+
+        # Leads older than the whole sequence are left alone rather than nudged months later
+        horizon = time.time() - sum(steps) * DAY
+        rows = [(email, company, subject, 1, sent_at + steps[0] * DAY, 'active', time.time())
+                for email, (company, subject, sent_at) in sent.items()
+                if email not in replied and sent_at >= horizon]
+        enrolled = len(rows)
+        rows += [(email, None, None, 1, None, 'replied', time.time()) for email in replied]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sequences (email, company, subject, step, due_at, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        if enrolled:
+            logger.info(f"📬 Enrolled {enrolled} previously emailed leads in follow-ups")
+        return enrolled
@@ -0,0 +1,192 @@
+"""
+Multi-process outreach: `main.py --workers N`.
+The queue is split into N shards by a stable hash of the email, so the
+same lead always lands on the same worker. Each worker streams the CSV
+itself and keeps only its shard's uncontacted leads, so the coordinator
+never holds the queue in memory. Each worker process builds its own
+agents (SMTP session, LLM client), journals to its own
+logs/batch_journal.w<i>.jsonl and writes to the shared, file-locked audit
+log. A GlobalGate shared by all workers spaces sends `delay` seconds apart
+and caps the total at `limit`, so N workers don't multiply the send rate;
+each worker also plans at most `limit` leads. A worker that dies without
+reporting (killed, out of memory) is noticed and reported as an error
+instead of leaving the coordinator waiting.
+Worker 0 also sends the due follow-up steps, so none goes out twice; the
+coordinator checks the inbox for replies once beforehand, and without a
+successful check no follow-ups are sent.
+Without --force every worker plans the same SendPlanner timeline (shared
+start time, seed and sent-today count) and takes every N-th slot of it.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import time
+from datetime import datetime
+
+logger = logging.getLogger("Coordinator")
+
+RESULT_POLL = 5  # seconds between checks for workers that died without a result
+
+def shard_of(email, shards):
+    """Stable shard index for an email (same on every run and machine)"""
+    digest = hashlib.md5(email.strip().lower().encode()).hexdigest()
+    return int(digest[:8], 16) % shards
+
+def journal_path(index):
+    return os.path.join("logs", f"batch_journal.w{index}.jsonl")
+
+class GlobalGate:
+    """
+    Cross-process send pacing and quota. acquire() blocks until this
+    process's next send slot and returns False once `quota` sends have
+    been granted (or on cancel); refund() hands back the slot of a send
+    that failed so it doesn't count against the quota.
+    """
+    def __init__(self, min_interval=0, quota=None, context=None):
+        context = context or multiprocessing.get_context("spawn")
+        self.min_interval = min_interval
+        self._lock = context.Lock()
+        self._next_slot = context.Value('d', 0.0, lock=False)
+        self._remaining = context.Value('q', -1 if quota is None else quota, lock=False)
+
+    def acquire(self, cancel_event=None):
+        with self._lock:
+            if self._remaining.value == 0:
+                return False
+            if self._remaining.value > 0:
+                self._remaining.value -= 1
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + self.min_interval
+        pause = slot - time.time()
+        if pause > 0:
+            if cancel_event is not None:
+                if cancel_event.wait(pause):
+                    self.refund()
+                    return False
+            else:
+                time.sleep(pause)
+        return True
+
+    def refund(self):
+        with self._lock:
+            if self._remaining.value >= 0:
+                self._remaining.value += 1
+
+def _worker(index, workers, params, gate, results, plan=None, resuming=False):
+    """
+    Entry point of one worker process. Streams its shard of the CSV, or
+    with `resuming` only finishes its open journal batch.
+    """
+    from main import run_outreach_pipeline
+    from core.scheduler.journal import BatchJournal
+
+    journal = None if params.get("test_mode") else BatchJournal(journal_path(index))
+    window = dict(plan, shard=[index, workers]) if plan else None
+    try:
+        summary = run_outreach_pipeline(leads=[] if resuming else None, shard=(index, workers),
+                                        journal=journal, send_gate=gate, skip_inbox=True,
+                                        follow_ups=index == 0, window=window, **params)
+    except Exception as e:
+        logging.getLogger("Coordinator").exception(f"Worker {index} crashed")
+        summary = {"error": str(e)}
+    results.put((index, summary))
+
+def run_sharded_pipeline(csv_path, bio, workers, test_mode=False, delay=30, resume_path=None,
+                         limit=None, force=False):
+    """Coordinator for `main.py --workers N`; returns the aggregated summary"""
+    from core.agents.audit_agent import AuditAgent
+    from core.scheduler.journal import BatchJournal
+
+    resuming = [i for i in range(workers) if BatchJournal(journal_path(i)).recover(csv_path)]
+    if resuming:
+        # Open shards finish first (worker 0 still sends follow-ups); new leads are planned on the next run
+        logger.info(f"♻️  Resuming interrupted shards {resuming}")
+        started = sorted(set(resuming) | {0})
+    else:
+        logger.info(f"📊 Streaming {csv_path} -> {workers} workers")
+        started = list(range(workers))
+
+    context = multiprocessing.get_context("spawn")
+    gate = GlobalGate(min_interval=0 if test_mode else delay, quota=limit, context=context)
+    results = context.Queue()
+    params = {"csv_path": csv_path, "bio": bio, "test_mode": test_mode,
+              "resume_path": resume_path, "force": force, "delay": 0, "limit": limit,
+              "replies_checked": not test_mode and _check_replies()}
+    plan = None
+    if not force and not test_mode:
+        # One timeline for all workers; each takes every N-th slot
+        params["delay"] = delay
+        now = datetime.now()
+        plan = {"now": now.isoformat(), "seed": random.randrange(2 ** 32), "workers": workers,
+                "sent_today": AuditAgent().count_sent_since(datetime.combine(now.date(), datetime.min.time()))}
+
+    processes = {}
+    for index in started:
+        process = context.Process(target=_worker, args=(index, workers, params, gate, results, plan,
+                                                        bool(resuming)),
+                                  name=f"outreach-w{index}")
+        process.start()
+        processes[index] = process
+
+    summaries = _collect(processes, results)
+    for process in processes.values():
+        process.join()
+
+    total = {"sent": 0, "skipped": 0, "failed": 0, "processed": 0, "total": 0, "retried": 0,
+             "cancelled": False, "workers": summaries}
+    for summary in summaries.values():
+        for key in ("sent", "skipped", "failed", "processed", "total", "retried"):
+            total[key] += summary.get(key, 0)
+        total["cancelled"] |= bool(summary.get("cancelled"))
+        for flag in ("quota_exhausted", "limit_reached"):
+            if summary.get(flag):
+                total[flag] = True
+        if summary.get("error"):
+            total.setdefault("errors", []).append(summary["error"])
+    logger.info(f"📊 All workers done: sent {total['sent']}, skipped {total['skipped']}, failed {total['failed']}")
+    return total
+
+def _check_replies():
+    """The pipeline's inbox check, run once for all workers (they skip theirs)"""
+    if os.getenv("SKIP_INBOX_CHECK", "false").lower() == "true":
+        logger.info("⏭️  Skipping inbox check (SKIP_INBOX_CHECK=true)")
+        return False
+    from main import check_replies
+    from core.agents.audit_agent import AuditAgent
+    from core.agents.inbox_agent import InboxAgent
+    from core.scheduler.sequences import SequenceStore
+    return check_replies(InboxAgent(), AuditAgent(), SequenceStore())
+
+def _collect(processes, results):
+    """
+    Each worker's summary, by index. A worker that exited without posting
+    one gets an error summary rather than blocking the coordinator.
+    """
+    summaries = {}
+    while len(summaries) < len(processes):
+        try:
+            index, summary = results.get(timeout=RESULT_POLL)
+            summaries[index] = summary
+            continue
+        except queue.Empty:
+            pass
+        exited = [i for i, p in processes.items() if i not in summaries and p.exitcode is not None]
+        if not exited:
+            continue
+        # A result posted just before exit may still be in flight
+        while True:
+            try:
+                index, summary = results.get(timeout=1)
+            except queue.Empty:
+                break
+            summaries[index] = summary
+        for index in exited:
+            if index not in summaries:
+                code = processes[index].exitcode
+                logger.error(f"Worker {index} exited with code {code} without a result")
+                summaries[index] = {"error": f"worker {index} exited with code {code}"}
+    return summaries
@@ -0,0 +1,340 @@
+"""
+Memory-mapped Bloom filter in front of the contacted-address index.
+The exact record of who has been contacted lives in the shared dedup
+index (data/dedup_index.tsv, `outreach` lines), and checking it means
+loading every address into a per-process map. ContactedFilter keeps a
+compact bit array in data/contacted.bloom instead, mapped read-only by
+every worker and dashboard process: an address it has never seen is
+answered from a few bits, and only the maybe-contacted answers go on
+to an exact check (AuditAgent probes them one by one in an on-disk hash
+table, data/contacted_hash.idx). The filter follows the dedup index the
+same way core/csv-importer's hash index does: each check replays the
+lines appended since the last one (one stat() when nothing changed), and a
+compacted or replaced index, a changed false-positive rate or a filter
+past its capacity triggers a rebuild. Removals are not replayed; a
+removed address stays a maybe until the next rebuild, which the exact
+index then answers.
+
+Configuration:
+    CONTACTED_BLOOM=off            always use the exact index
+    CONTACTED_BLOOM_FPR=0.0001     target false-positive rate (~19 bits per address)
+    CONTACTED_BLOOM_CAPACITY=1000000   addresses sized for (grows x2 when passed)
+
+Usage:
+    python -m core.utils.bloom stats
+    python -m core.utils.bloom rebuild
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+
+from core.utils.dedup_index import DEDUP_INDEX, OUTREACH
+from core.utils.filelock import FileLock
+
+BLOOM_PATH = os.path.join("data", "contacted.bloom")
+
+# auto: check the filter first, off: always use the exact index
+CONTACTED_BLOOM = os.getenv("CONTACTED_BLOOM", "auto").lower()
+CONTACTED_BLOOM_FPR = float(os.getenv("CONTACTED_BLOOM_FPR", 0.0001))
+CONTACTED_BLOOM_CAPACITY = int(os.getenv("CONTACTED_BLOOM_CAPACITY", 1_000_000))
+
+_MAGIC = b"RAIBLOM1"
+# magic, bits, hashes, capacity, entries, source offset, source inode, target fpr
+_HEADER = struct.Struct("<8sQQQQQQd")
+_SOURCE_PREFIX = f"{OUTREACH}\t".encode('utf-8')
+
+def sizing(capacity, fpr):
+    """(bits, hashes) for `capacity` entries at false-positive rate `fpr`"""
+    if not 0 < fpr < 1:
+        raise ValueError(f"Bloom filter false-positive rate must be between 0 and 1, got {fpr}")
+    capacity = max(int(capacity), 1)
+    bits = math.ceil(-capacity * math.log(fpr) / math.log(2) ** 2)
+    bits = (bits + 63) // 64 * 64
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+_MASK64 = (1 << 64) - 1
+
+def positions(address, bits, hashes):
+    """Bit positions of an address (double hashing over one blake2b digest, in uint64 arithmetic)"""
+    digest = hashlib.blake2b(address.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [((h1 + i * h2) & _MASK64) % bits for i in range(hashes)]
+
+def build_bitmap(addresses, bits, hashes):
+    """
+    Bit array with every address set, as bytes; positions() computed for
+    the whole list at once with numpy (the digests are still one call each)
+    """
+    import numpy as np
+    digests = np.frombuffer(b"".join(hashlib.blake2b(a.encode('utf-8'), digest_size=16).digest()
+                                     for a in addresses), dtype='<u8').reshape(-1, 2)
+    bitmap = np.zeros(bits // 8, dtype=np.uint8)
+    if len(digests):
+        h1, h2 = digests[:, 0], digests[:, 1] | np.uint64(1)
+        for i in range(hashes):
+            bit = (h1 + np.uint64(i) * h2) % np.uint64(bits)  # wraps mod 2**64 like positions()
+            np.bitwise_or.at(bitmap, bit >> np.uint64(3), np.left_shift(1, bit & np.uint64(7)).astype(np.uint8))
+    set_bits = int(np.unpackbits(bitmap).sum())
+    return bitmap.tobytes(), set_bits
+
+def estimate_entries(set_bits, bits, hashes):
+    """Distinct entries implied by the number of set bits: -(m/k) ln(1 - X/m)"""
+    if set_bits >= bits:
+        return bits
+    return round(-bits / hashes * math.log(1 - set_bits / bits))
+
+class BloomFilter:
+    """
+    Usage:
+        with BloomFilter.create("seen.bloom", capacity=10**6, fpr=0.001) as bloom:
+            bloom.add("a@x.com")
+            "a@x.com" in bloom     # True
+            "b@x.com" in bloom     # False, or True with probability ~fpr
+    The bit array is the file's mapped pages; a filter opened by several
+    processes shares them. Writers must hold a lock on the file (adds are
+    byte read-modify-writes).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self._map = None
+        self.inode = 0
+        self.bits = self.hashes = self.capacity = self.entries = 0
+        self.source_offset = self.source_inode = 0
+        self.fpr = 0.0
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @classmethod
+    def create(cls, path, capacity, fpr, bitmap=None, entries=0, source_offset=0, source_inode=0):
+        """Write a new filter file (atomically replacing any old one) and open it"""
+        bits, hashes = sizing(capacity, fpr)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, bits, hashes, capacity, entries, source_offset, source_inode, fpr))
+            if bitmap is not None:
+                f.write(bitmap)
+            f.truncate(_HEADER.size + bits // 8)  # sparse: empty pages cost no disk
+        os.replace(tmp_path, path)
+        return cls(path).open()
+
+    @staticmethod
+    def is_valid(path):
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(_HEADER.size)
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        if len(header) < _HEADER.size:
+            return False
+        magic, bits = _HEADER.unpack(header)[:2]
+        return magic == _MAGIC and bits and size == _HEADER.size + bits // 8
+
+    def open(self):
+        self._file = open(self.path, 'r+b')
+        self.inode = os.fstat(self._file.fileno()).st_ino
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self.read_header()
+        return self
+
+    def close(self):
+        if self._map is None:
+            return
+        self._map.close()
+        self._file.close()
+        self._file = self._map = None
+
+    def read_header(self):
+        (_, self.bits, self.hashes, self.capacity, self.entries,
+         self.source_offset, self.source_inode, self.fpr) = _HEADER.unpack_from(self._map, 0)
+
+    def write_header(self):
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.bits, self.hashes, self.capacity, self.entries,
+                          self.source_offset, self.source_inode, self.fpr)
+
+    def add(self, address):
+        """Set an address's bits; returns True if any was unset (the address is new)"""
+        data, base, new = self._map, _HEADER.size, False
+        for bit in positions(address, self.bits, self.hashes):
+            i, mask = base + (bit >> 3), 1 << (bit & 7)
+            if not data[i] & mask:
+                data[i] |= mask
+                new = True
+        if new:
+            self.entries += 1
+        return new
+
+    def __contains__(self, address):
+        data, base = self._map, _HEADER.size
+        return all(data[base + (bit >> 3)] & (1 << (bit & 7))
+                   for bit in positions(address, self.bits, self.hashes))
+
+    def contains_many(self, addresses):
+        return [address in self for address in addresses]
+
+    def expected_fpr(self):
+        """False-positive rate at the current fill: (1 - e^(-kn/m))^k"""
+        return (1 - math.exp(-self.hashes * self.entries / self.bits)) ** self.hashes
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'bits': self.bits,
+            'hashes': self.hashes,
+            'bytes': self.bits // 8,
+            'capacity': self.capacity,
+            'entries': self.entries,
+            'target_fpr': self.fpr,
+            'expected_fpr': round(self.expected_fpr(), 8),
+        }
+
+class ContactedFilter:
+    """
+    Usage:
+        bloom = get_contacted_filter()
+        maybe = bloom.contains_many(canonical_addresses)  # None: no dedup index yet
+    A False answer is final (the address has no outreach line); True
+    still has to be confirmed against the exact dedup index.
+    """
+    def __init__(self, path=BLOOM_PATH, source=DEDUP_INDEX, fpr=None, capacity=None):
+        self.path = path
+        self.source = source
+        self.fpr = CONTACTED_BLOOM_FPR if fpr is None else fpr
+        self.capacity = CONTACTED_BLOOM_CAPACITY if capacity is None else capacity
+        self._bloom = None
+        self._lock = threading.Lock()
+
+    def sync(self):
+        """Catch up with the dedup index; False if there is no index to follow"""
+        with self._lock:
+            return self._sync()
+
+    def _sync(self):
+        try:
+            st = os.stat(self.source)
+        except OSError:
+            return False
+        self._remap()
+        bloom = self._bloom
+        if bloom is not None:
+            bloom.read_header()
+            if (bloom.source_inode == st.st_ino and bloom.source_offset == st.st_size
+                    and bloom.fpr == self.fpr):
+                return True
+        with FileLock(self.path):
+            self._remap()
+            self._update(st)
+        return True
+
+    def _remap(self):
+        """(Re)open the filter file if it is missing here or was replaced by another process"""
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            inode = None
+        if self._bloom is not None and self._bloom.inode == inode:
+            return
+        if self._bloom is not None:
+            self._bloom.close()
+            self._bloom = None
+        if inode is not None and BloomFilter.is_valid(self.path):
+            self._bloom = BloomFilter(self.path).open()
+
+    def _update(self, st):
+        """Replay new outreach lines, or rebuild; caller holds the file lock"""
+        bloom = self._bloom
+        if (bloom is None or bloom.source_inode != st.st_ino or bloom.source_offset > st.st_size
+                or bloom.fpr != self.fpr):
+            self.rebuild()
+            return
+        bloom.read_header()
+        with open(self.source, 'rb') as f:
+            f.seek(bloom.source_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                bloom.source_offset += len(line)
+                if line.startswith(_SOURCE_PREFIX):
+                    bloom.add(line[len(_SOURCE_PREFIX):-1].decode('utf-8'))
+        bloom.write_header()
+        if bloom.entries > bloom.capacity:
+            self.rebuild()
+
+    def rebuild(self):
+        """Build a fresh filter from every outreach line of the dedup index"""
+        with FileLock(self.path):
+            st = os.stat(self.source)
+            addresses, offset = [], 0
+            with open(self.source, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    if line.startswith(_SOURCE_PREFIX):
+                        addresses.append(line[len(_SOURCE_PREFIX):-1].decode('utf-8'))
+
+            capacity = self.capacity
+            while capacity < len(addresses):
+                capacity *= 2
+            bits, hashes = sizing(capacity, self.fpr)
+            bitmap, set_bits = build_bitmap(addresses, bits, hashes)
+            entries = estimate_entries(set_bits, bits, hashes)
+
+            if self._bloom is not None:
+                self._bloom.close()
+            self._bloom = BloomFilter.create(self.path, capacity, self.fpr, bitmap, entries,
+                                             offset, st.st_ino)
+            return self._bloom
+
+    def contains_many(self, addresses):
+        """Maybe-contacted flags for canonical addresses, after a sync; None without a dedup index"""
+        with self._lock:
+            if not self._sync():
+                return None
+            bloom = self._bloom
+            return [bool(address) and address in bloom for address in addresses]
+
+    def stats(self):
+        with self._lock:
+            return self._bloom.stats() if self._bloom is not None else {}
+
+_shared_filter = None
+
+def get_contacted_filter():
+    """Process-wide ContactedFilter, or None when CONTACTED_BLOOM=off"""
+    global _shared_filter
+    if CONTACTED_BLOOM == "off":
+        return None
+    if _shared_filter is None:
+        _shared_filter = ContactedFilter()
+    return _shared_filter
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(prog="python -m core.utils.bloom",
+                                     description="Inspect or rebuild the contacted-address Bloom filter")
+    parser.add_argument("command", choices=["stats", "rebuild"])
+    args = parser.parse_args()
+
+    contacted = ContactedFilter()
+    if not os.path.exists(contacted.source):
+        from core.utils.dedup_index import DedupIndex
+        DedupIndex(contacted.source).rebuild()
+    if args.command == "rebuild":
+        contacted.rebuild()
+    else:
+        contacted.sync()
+    print(json.dumps(contacted.stats(), indent=2))
@@ -0,0 +1,293 @@
+"""
+Optional columnar mirror of the lead queue and outreach log.
+With pyarrow installed, a large CSV (data/recruiters.csv,
+logs/outreach_log.csv) gets an Arrow IPC / Feather v2 copy next to it
+(recruiters.arrow). The copy is uncompressed, so reads are memory-mapped
+and only the requested columns are touched; a reader that needs
+`email` and `status` never parses the rest of the row. The CSV stays the
+source of truth: the mirror is rebuilt when the CSV is replaced, and rows
+appended to it (the log's only in-place change) are parsed on the next
+read into a small second segment (recruiters.tail.arrow) that is read
+along with it. Only the new rows are parsed and only the tail is
+rewritten, so a send per second doesn't rewrite a million-row mirror;
+the tail is folded into the main mirror once it covers
+COLUMNAR_FOLD_BYTES of the CSV. Without pyarrow, or with
+COLUMNAR_STORE=off, callers keep reading the CSV.
+
+Usage:
+    python -m core.utils.columnar convert data/recruiters.csv
+    python -m core.utils.columnar export data/recruiters.arrow out.csv
+    python -m core.utils.columnar bench data/recruiters.csv --columns email
+"""
+import csv
+import importlib.util
+import json
+import os
+import threading
+
+from core.utils.filelock import FileLock
+
+# auto: use the mirror when pyarrow is installed, off: always read the CSV
+COLUMNAR_STORE = os.getenv("COLUMNAR_STORE", "auto").lower()
+
+# Smaller files are cheaper to parse with the csv module than to import pyarrow for
+COLUMNAR_MIN_BYTES = int(os.getenv("COLUMNAR_MIN_BYTES", 1024 * 1024))
+
+# Appended rows stay in the tail segment until they cover this much of the CSV
+COLUMNAR_FOLD_BYTES = int(os.getenv("COLUMNAR_FOLD_BYTES", 8 * 1024 * 1024))
+
+MIRROR_SUFFIX = ".arrow"
+TAIL_SUFFIX = ".tail.arrow"
+_SOURCE_KEY = b"reachai.source"
+
+_available = None
+_lock = threading.Lock()
+
+def available():
+    """True when pyarrow can be imported (checked without importing it)"""
+    global _available
+    if _available is None:
+        _available = importlib.util.find_spec("pyarrow") is not None
+    return _available
+
+def mirror_path(csv_path):
+    return os.path.splitext(csv_path)[0] + MIRROR_SUFFIX
+
+def tail_path(csv_path):
+    return os.path.splitext(csv_path)[0] + TAIL_SUFFIX
+
+def enabled_for(csv_path):
+    """Whether reads of `csv_path` should go through the mirror"""
+    if COLUMNAR_STORE == "off" or not available():
+        return False
+    try:
+        return os.path.getsize(csv_path) > COLUMNAR_MIN_BYTES
+    except OSError:
+        return False
+
+def _fingerprint(csv_path):
+    st = os.stat(csv_path)
+    return {"ino": st.st_ino, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _string_options(columns):
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    # Everything stays a string (like pd.read_csv(dtype=str)); empty cells are null
+    return pacsv.ConvertOptions(column_types={name: pa.string() for name in columns},
+                                strings_can_be_null=True)
+
+def _read_header(csv_path):
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), [])
+
+def _write(path, schema, batches, source):
+    import pyarrow as pa
+    schema = schema.with_metadata({_SOURCE_KEY: json.dumps(source).encode()})
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+    os.replace(tmp_path, path)
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _source_of(path):
+    """Fingerprint of the CSV the mirror at `path` was built from, or None"""
+    import pyarrow as pa
+    try:
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        return json.loads(metadata[_SOURCE_KEY])
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid):
+        return None
+
+def convert(csv_path, out_path=None):
+    """Rebuild the mirror from the whole CSV, streaming block by block"""
+    import pyarrow.csv as pacsv
+    out_path = out_path or mirror_path(csv_path)
+    with FileLock(csv_path, shared=True):
+        source = _fingerprint(csv_path)
+        header = _read_header(csv_path)
+        reader = pacsv.open_csv(csv_path, convert_options=_string_options(header))
+        _write(out_path, reader.schema, reader, source)
+    if out_path == mirror_path(csv_path):
+        _remove(tail_path(csv_path))
+    return out_path
+
+def _read_rows(csv_path, start, names):
+    """
+    Rows of `csv_path` from byte `start` on as a Table, plus the CSV's
+    fingerprint with `size` cut back to the last complete row (a row
+    still being written has no newline yet; it is picked up next time).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    source = _fingerprint(csv_path)
+    with open(csv_path, 'rb') as f:
+        f.seek(start)
+        tail = f.read(source["size"] - start)
+    complete = tail.rfind(b"\n") + 1
+    source["size"] = start + complete
+    if not complete:
+        return None, source
+    return pacsv.read_csv(
+        pa.py_buffer(tail[:complete]),
+        read_options=pacsv.ReadOptions(column_names=names),
+        convert_options=_string_options(names),
+    ), source
+
+def _mapped(path):
+    import pyarrow.feather as feather
+    return feather.read_table(path, memory_map=True)
+
+def _update_tail(csv_path, path, built_from):
+    """
+    Add the rows appended since the tail segment was written (or since
+    the main mirror was built) to the tail; once the tail covers
+    COLUMNAR_FOLD_BYTES, fold everything into the main mirror instead.
+    Returns the segment paths to read.
+    """
+    import pyarrow as pa
+    tail = tail_path(csv_path)
+    with FileLock(csv_path, shared=True):
+        schema = _mapped(path).schema.remove_metadata()
+        tail_from = _source_of(tail) if os.path.exists(tail) else None
+        if not tail_from or tail_from.get("base") != built_from:
+            tail_from = None  # left over from an earlier build
+        if tail_from and tail_from["ino"] == built_from["ino"] and tail_from["size"] > _fingerprint(csv_path)["size"]:
+            tail_from = None
+        start = tail_from["size"] if tail_from else built_from["size"]
+        added, source = _read_rows(csv_path, start, schema.names)
+        if added is None and tail_from:
+            return [path, tail]
+        parts = [_mapped(tail).cast(schema)] if tail_from else []
+        if added is not None:
+            parts.append(added.cast(schema))
+        if source["size"] - built_from["size"] > COLUMNAR_FOLD_BYTES:
+            table = pa.concat_tables([_mapped(path).cast(schema)] + parts)
+            _write(path, schema, table.to_batches(), source)
+            _remove(tail)
+            return [path]
+        if not parts:
+            return [path]
+        _write(tail, schema, pa.concat_tables(parts).to_batches(), dict(source, base=built_from))
+    return [path, tail]
+
+def sync(csv_path):
+    """Bring the mirror up to date with the CSV; returns its segment paths (main, then tail)"""
+    path = mirror_path(csv_path)
+    current = _fingerprint(csv_path)
+    with _lock:
+        built_from = _source_of(path) if os.path.exists(path) else None
+        if built_from == current:
+            return [path]
+        appended = (built_from and built_from["ino"] == current["ino"]
+                    and built_from["size"] < current["size"])
+        if appended:
+            try:
+                return _update_tail(csv_path, path, built_from)
+            except Exception:
+                pass  # not a clean append (rewritten in place, odd quoting): rebuild
+        convert(csv_path, path)
+    return [path]
+
+def read_table(csv_path, columns=None):
+    """
+    Memory-mapped pyarrow Table for `csv_path`, limited to `columns`
+    (names the file doesn't have are skipped).
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    paths = sync(csv_path)
+    if columns is not None:
+        names = feather.read_table(paths[0], columns=[], memory_map=True).schema.names
+        columns = [name for name in columns if name in names]
+    tables = [feather.read_table(path, columns=columns, memory_map=True).replace_schema_metadata(None)
+              for path in paths]
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+
+def read_frame(csv_path, columns=None):
+    """read_table() as a DataFrame; missing values are NA, as with pd.read_csv"""
+    return read_table(csv_path, columns).to_pandas()
+
+def iter_frames(csv_path, chunksize, columns=None):
+    """DataFrames of at most `chunksize` rows, for chunked readers"""
+    for batch in read_table(csv_path, columns).to_batches(max_chunksize=chunksize):
+        yield batch.to_pandas()
+
+def read_csv(csv_path, columns=None):
+    """
+    pd.read_csv(csv_path) limited to `columns`, served from the mirror
+    when enabled_for(csv_path); the drop-in for readers of large CSVs.
+    """
+    if enabled_for(csv_path):
+        return read_frame(csv_path, columns)
+    import pandas as pd
+    usecols = None if columns is None else (lambda name: name in columns)
+    return pd.read_csv(csv_path, usecols=usecols)
+
+def columns_of(csv_path):
+    return read_table(csv_path, columns=[]).schema.names
+
+def export_csv(path, out_path):
+    """Write a mirror (or any Feather/Arrow file) back out as CSV"""
+    import pyarrow.csv as pacsv
+    import pyarrow.feather as feather
+    table = feather.read_table(path, memory_map=True)
+    tmp_path = f"{out_path}.tmp"
+    pacsv.write_csv(table.replace_schema_metadata(None), tmp_path,
+                    pacsv.WriteOptions(quoting_style="needed"))
+    os.replace(tmp_path, out_path)
+    return out_path
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Columnar (Arrow) mirror of a lead/log CSV")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("convert", help="build the .arrow mirror").add_argument("csv_path")
+    export = sub.add_parser("export", help="write a mirror back to CSV")
+    export.add_argument("path")
+    export.add_argument("out_path")
+    bench = sub.add_parser("bench", help="time a pandas CSV parse against a mirror read")
+    bench.add_argument("csv_path")
+    bench.add_argument("--columns", default="email,status",
+                       help="comma-separated columns the reader needs")
+    args = parser.parse_args()
+
+    if not available():
+        raise SystemExit("pyarrow is not installed (pip install pyarrow)")
+
+    if args.command == "convert":
+        started = time.perf_counter()
+        print(f"{convert(args.csv_path)} written in {time.perf_counter() - started:.2f}s")
+    elif args.command == "export":
+        print(export_csv(args.path, args.out_path))
+    else:
+        import pandas as pd
+        wanted = args.columns.split(",")
+        started = time.perf_counter()
+        convert(args.csv_path)
+        built = time.perf_counter() - started
+
+        started = time.perf_counter()
+        df = pd.read_csv(args.csv_path)
+        full = time.perf_counter() - started
+        started = time.perf_counter()
+        pd.read_csv(args.csv_path, usecols=[c for c in wanted if c in df.columns])
+        pruned = time.perf_counter() - started
+        started = time.perf_counter()
+        mirrored = read_frame(args.csv_path, wanted)
+        mapped = time.perf_counter() - started
+
+        print(f"rows: {len(df)}  columns: {list(mirrored.columns)}")
+        print(f"mirror build (one-off):   {built:.3f}s")
+        print(f"pd.read_csv, all columns: {full:.3f}s")
+        print(f"pd.read_csv, usecols:     {pruned:.3f}s")
+        print(f"mirror, mmap + pruned:    {mapped:.3f}s  ({full / mapped:.0f}x faster than a full parse)")
@@ -1,49 +1,290 @@
 """
-Config utility for loading/saving templates and schedule configurations
+Config utility for loading/saving templates and schedule configurations.
+Each file is served by a ConfigStore: reads come from an in-memory copy
+that is only re-parsed when the file's mtime changes, writes are atomic
+(temp file + rename) and validated, and subscribers are called on change.
 """
+import copy
 import json
+import logging
 import os
+import threading
 from pathlib import Path
 
+logger = logging.getLogger("Config")
+
 CONFIG_DIR = "config"
 TEMPLATES_CONFIG = os.path.join(CONFIG_DIR, "templates.json")
 SCHEDULE_CONFIG = os.path.join(CONFIG_DIR, "schedule.json")
+SENDERS_CONFIG = os.path.join(CONFIG_DIR, "senders.json")
+
+DEFAULT_SCHEDULE_CONFIG = {
+    "daily_limit": 30,
+    "business_hours_only": False,
+    "start_hour": 9,
+    "end_hour": 17,
+    "delay_seconds": 30,
+    "smtp_email": "rikinshah787@gmail.com"
+}
+
+# key -> (allowed types, minimum, maximum)
+SCHEDULE_SCHEMA = {
+    "auto_enabled": (bool, None, None),
+    "business_hours_only": (bool, None, None),
+    "start_time": (str, None, None),
+    "end_time": (str, None, None),
+    "batch_size": ((int,), 1, None),
+    "batch_interval": ((int, float), 0.1, None),
+    "daily_limit": ((int,), 0, None),
+    "delay_seconds": ((int,), 0, None),
+    "start_hour": ((int,), 0, 24),
+    "end_hour": ((int,), 0, 24),
+    "smtp_email": (str, None, None),
+    "schedules": (list, None, None),
+    "follow_up_days": (list, None, None),
+    "retry_max_attempts": ((int,), 1, None),
+    "retry_base_minutes": ((int, float), 0, None),
+    "retry_max_minutes": ((int, float), 0, None),
+    "retry_interleave": ((int,), 0, None),
+    "name": (str, None, None),
+    "enabled": (bool, None, None),
+}
+
+TEMPLATE_FIELDS = {
+    "name": str,
+    "resume": str,
+    "custom_template": str,
+    "template": str,
+    "role_keywords": list,
+}
+
+# field -> (type, minimum, maximum) for one account in config/senders.json
+SENDER_ACCOUNT_SCHEMA = {
+    "name": (str, None, None),
+    "email": (str, None, None),
+    "server": (str, None, None),
+    "port": (int, 1, 65535),
+    "password": (str, None, None),
+    "password_env": (str, None, None),
+    "sender_name": (str, None, None),
+    "starttls": (bool, None, None),
+    "daily_limit": (int, 1, None),
+    "hourly_limit": (int, 1, None),
+    "connections": (int, 1, 10),
+    "max_failures": (int, 1, None),
+    "cooldown_minutes": ((int, float), 0, None),
+}
 
 def ensure_config_dir():
     """Create config directory if it doesn't exist"""
     Path(CONFIG_DIR).mkdir(parents=True, exist_ok=True)
 
+def _check_schedule_entry(entry, where):
+    """Validate one schedule mapping; blank (None) form fields are dropped"""
+    if not isinstance(entry, dict):
+        raise ValueError(f"{where} must be an object")
+    clean = {}
+    for key, value in entry.items():
+        if value is None:
+            continue
+        spec = SCHEDULE_SCHEMA.get(key)
+        if spec:
+            types, minimum, maximum = spec
+            # bool is an int subclass; don't let True pass as a number
+            if not isinstance(value, types) or (types is not bool and isinstance(value, bool)):
+                raise ValueError(f"{where}.{key} has invalid type {type(value).__name__}")
+            if minimum is not None and value < minimum:
+                raise ValueError(f"{where}.{key} must be >= {minimum}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"{where}.{key} must be <= {maximum}")
+        clean[key] = value
+    if clean.get("start_hour", 0) > clean.get("end_hour", 24):
+        raise ValueError(f"{where}.start_hour must not be after end_hour")
+    return clean
+
+def validate_schedule_config(config):
+    """Schema check for config/schedule.json; returns the cleaned config"""
+    clean = _check_schedule_entry(config, "schedule")
+    if "schedules" in clean:
+        clean["schedules"] = [_check_schedule_entry(entry, f"schedule.schedules[{i}]")
+                              for i, entry in enumerate(clean["schedules"])]
+    for days in clean.get("follow_up_days", ()):
+        if isinstance(days, bool) or not isinstance(days, (int, float)) or days <= 0:
+            raise ValueError("schedule.follow_up_days must be a list of positive day counts")
+    # Parsed here so a bad date is rejected on save, not at the next tick
+    from core.scheduler.engine import schedules_from_config
+    schedules_from_config(dict(clean, auto_enabled=True))
+    return clean
+
+def validate_template_config(config):
+    """Schema check for config/templates.json; returns the config"""
+    if not isinstance(config, dict):
+        raise ValueError("templates config must be an object")
+    for key, data in config.items():
+        if key == "custom_template" and isinstance(data, str):
+            continue
+        if not isinstance(data, dict):
+            raise ValueError(f"template '{key}' must be an object")
+        for field, expected in TEMPLATE_FIELDS.items():
+            if field in data and data[field] is not None and not isinstance(data[field], expected):
+                raise ValueError(f"template '{key}'.{field} must be {expected.__name__}")
+    return config
+
+def validate_sender_config(config):
+    """Schema check for config/senders.json; returns the config"""
+    if not isinstance(config, dict) or not isinstance(config.get("accounts"), list):
+        raise ValueError("senders config must be an object with an 'accounts' list")
+    names = set()
+    for i, account in enumerate(config["accounts"]):
+        where = f"senders.accounts[{i}]"
+        if not isinstance(account, dict):
+            raise ValueError(f"{where} must be an object")
+        for field, (types, minimum, maximum) in SENDER_ACCOUNT_SCHEMA.items():
+            value = account.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, types) or (types is not bool and isinstance(value, bool)):
+                raise ValueError(f"{where}.{field} has invalid type {type(value).__name__}")
+            if minimum is not None and value < minimum:
+                raise ValueError(f"{where}.{field} must be >= {minimum}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"{where}.{field} must be <= {maximum}")
+        if not account.get("email"):
+            raise ValueError(f"{where}.email is required")
+        name = account.get("name") or account["email"]
+        if name in names:
+            raise ValueError(f"{where}: duplicate account name '{name}'")
+        names.add(name)
+    return config
+
+class ConfigStore:
+    """
+    Cached view of one JSON config file.
+    get() costs a stat() while the file is unchanged; the file is only
+    re-read when its mtime/size moves. save() validates, writes to a temp
+    file and renames it over the original, so readers never see a
+    half-written file. subscribe(callback) is called with the new config
+    after every save or detected external edit.
+    """
+    def __init__(self, path, default=None, validator=None):
+        self.path = path
+        self.default = default
+        self.validator = validator
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._signature = None
+        self._value = None
+        self._subscribers = []
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _reload(self):
+        """Re-read the file if it changed; returns True when the value changed"""
+        signature = self._stat()
+        if self._loaded and signature == self._signature:
+            return False
+        value = None
+        if signature is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    value = json.load(f)
+            except ValueError as e:
+                if self._value is None:
+                    raise
+                # Keep serving the last good copy while an editor is mid-write
+                logger.warning(f"Ignoring unreadable {self.path}: {e}")
+                return False
+        # The first load isn't a change anyone needs to hear about
+        changed = self._loaded
+        self._loaded = True
+        self._signature = signature
+        self._value = value
+        return changed
+
+    def _current(self):
+        if self._value is None:
+            return copy.deepcopy(self.default)
+        return copy.deepcopy(self._value)
+
+    def get(self):
+        """Current config (a private copy the caller may modify)"""
+        with self._lock:
+            changed = self._reload()
+            value = self._current()
+        if changed:
+            self._notify(value)
+        return value
+
+    def refresh(self):
+        """Pick up external edits now; returns True if the config changed"""
+        with self._lock:
+            changed = self._reload()
+            value = self._current()
+        if changed:
+            self._notify(value)
+        return changed
+
+    def save(self, config):
+        """Validate and atomically replace the file"""
+        if self.validator:
+            config = self.validator(config)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._loaded = True
+            self._signature = self._stat()
+            self._value = copy.deepcopy(config)
+            value = self._current()
+        self._notify(value)
+
+    def subscribe(self, callback):
+        """Call callback(config) whenever the config changes"""
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def _notify(self, value):
+        for callback in list(self._subscribers):
+            try:
+                callback(copy.deepcopy(value))
+            except Exception:
+                logger.exception(f"Config subscriber failed for {self.path}")
+
+schedule_config = ConfigStore(SCHEDULE_CONFIG, default=DEFAULT_SCHEDULE_CONFIG, validator=validate_schedule_config)
+template_config = ConfigStore(TEMPLATES_CONFIG, validator=validate_template_config)
+sender_config = ConfigStore(SENDERS_CONFIG, validator=validate_sender_config)
+
 def load_template_config():
-    """Load template configuration from JSON file"""
-    ensure_config_dir()
-    if os.path.exists(TEMPLATES_CONFIG):
-        with open(TEMPLATES_CONFIG, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+    """Load template configuration (cached; None if not configured)"""
+    return template_config.get()
 
 def save_template_config(config):
     """Save template configuration to JSON file"""
-    ensure_config_dir()
-    with open(TEMPLATES_CONFIG, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2, ensure_ascii=False)
+    template_config.save(config)
 
 def load_schedule_config():
-    """Load schedule configuration from JSON file"""
-    ensure_config_dir()
-    if os.path.exists(SCHEDULE_CONFIG):
-        with open(SCHEDULE_CONFIG, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {
-        "daily_limit": 30,
-        "business_hours_only": False,
-        "start_hour": 9,
-        "end_hour": 17,
-        "delay_seconds": 30,
-        "smtp_email": "rikinshah787@gmail.com"
-    }
+    """Load schedule configuration (cached; defaults if not configured)"""
+    return schedule_config.get()
 
 def save_schedule_config(config):
     """Save schedule configuration to JSON file"""
-    ensure_config_dir()
-    with open(SCHEDULE_CONFIG, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2)
+    schedule_config.save(config)
+
+def load_sender_config():
+    """Sender pool accounts (None when only the SMTP_* env account is used)"""
+    return sender_config.get()
@@ -0,0 +1,348 @@
+"""
+Shared, persistent dedup index for lead ingestion.
+One in-memory map of canonical email -> sources (queue, discovery,
+outreach) backed by an append-only file, so every ingestion path gets
+O(1) membership checks and only pays for the incoming batch.
+
+The OUTREACH entries mirror logs/outreach_log.csv, which can be edited,
+truncated or deleted behind the index's back. The log's inode and size
+as of the last sync are kept in data/dedup_index.tsv.outreach; a log that
+no longer matches them has its entries rebuilt (AuditAgent.sync_index).
+"""
+import csv
+import json
+import os
+import threading
+
+DEDUP_INDEX = os.path.join("data", "dedup_index.tsv")
+
+# Sources an address can be known from
+QUEUE = "queue"            # data/recruiters.csv + QueueAgent
+DISCOVERY = "discovery"    # logs/discovery_results.jsonl
+OUTREACH = "outreach"      # SENT/REPLIED rows in logs/outreach_log.csv
+SOURCES = (QUEUE, DISCOVERY, OUTREACH)
+
+GMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+def canonicalize(email, fold_gmail=False):
+    """
+    Case-fold and trim an address. With fold_gmail, Gmail dots and
+    +tags are dropped (j.doe+jobs@gmail.com -> jdoe@gmail.com).
+    Returns '' for anything that isn't an address.
+    """
+    email = str(email or "").strip().casefold()
+    if email.count("@") != 1:
+        return ""
+    local, domain = email.split("@")
+    if not local or not domain:
+        return ""
+    if fold_gmail and domain in GMAIL_DOMAINS:
+        local = local.split("+", 1)[0].replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}"
+
+class DedupIndex:
+    """
+    Canonical address index persisted to data/dedup_index.tsv.
+    Each line is '<source>\\t<address>' (or '-<source>\\t<address>' for a
+    removal); the file is only ever appended to, except on compaction.
+    """
+    def __init__(self, path=DEDUP_INDEX, fold_gmail=None):
+        self.path = path
+        if fold_gmail is None:
+            fold_gmail = os.getenv("DEDUP_FOLD_GMAIL", "false").lower() == "true"
+        self.fold_gmail = fold_gmail
+        self._lock = threading.RLock()
+        self._entries = {}     # canonical address -> set of sources
+        self._removals = 0
+        self._offset = 0
+        self._inode = None
+        self._loaded = False
+
+    def canonical(self, email):
+        return canonicalize(email, self.fold_gmail)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            if not os.path.exists(self.path):
+                self.rebuild()
+        self._refresh()
+
+    def _refresh(self):
+        """Apply lines appended by other processes since our last read"""
+        try:
+            st = os.stat(self.path)
+            size, inode = st.st_size, st.st_ino
+        except FileNotFoundError:
+            size, inode = 0, None
+        if size < self._offset or inode != self._inode:
+            # Compacted or replaced by another process: read it again from the start
+            self._entries, self._removals, self._offset = {}, 0, 0
+            self._inode = inode
+        if size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].decode('utf-8').splitlines():
+            source, _, address = line.partition("\t")
+            if not address:
+                continue
+            if source.startswith("-"):
+                self._discard(address, source[1:])
+            else:
+                self._entries.setdefault(address, set()).add(source)
+        self._offset += end
+
+    def _discard(self, address, source):
+        sources = self._entries.get(address)
+        if sources and source in sources:
+            sources.discard(source)
+            if not sources:
+                del self._entries[address]
+            self._removals += 1
+
+    def _write(self, lines):
+        if not lines:
+            return
+        payload = "".join(lines).encode('utf-8')
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.write(payload)
+        self._offset += len(payload)
+
+    def contains(self, email, sources=None):
+        """True if the address is known from any of `sources` (default: all)"""
+        address = self.canonical(email)
+        if not address:
+            return False
+        with self._lock:
+            self._ensure_loaded()
+            known = self._entries.get(address)
+            if not known:
+                return False
+            return True if sources is None else not known.isdisjoint(sources)
+
+    def contains_many(self, emails, sources=None):
+        """contains() for a batch: one refresh and one lock for the lot"""
+        sources = set(sources) if sources is not None else None
+        with self._lock:
+            self._ensure_loaded()
+            result = []
+            for email in emails:
+                known = self._entries.get(self.canonical(email))
+                result.append(bool(known) and (sources is None or not known.isdisjoint(sources)))
+            return result
+
+    def add(self, email, source):
+        """Record an address; returns True if it was new for that source"""
+        return bool(self.add_many([email], source))
+
+    def add_many(self, emails, source):
+        """Record a batch in one append; returns the canonical addresses that were new"""
+        with self._lock:
+            self._ensure_loaded()
+            added, lines = [], []
+            for email in emails:
+                address = self.canonical(email)
+                if not address:
+                    continue
+                sources = self._entries.setdefault(address, set())
+                if source not in sources:
+                    sources.add(source)
+                    added.append(address)
+                    lines.append(f"{source}\t{address}\n")
+            self._write(lines)
+            return added
+
+    def append_many(self, addresses, source):
+        """
+        Record canonical addresses without loading the map first, for bulk
+        importers that dedup on their own index; a loaded map is updated
+        as usual, otherwise the lines are picked up on the next load.
+        """
+        with self._lock:
+            if self._loaded:
+                return self.add_many(addresses, source)
+            payload = "".join(f"{source}\t{address}\n" for address in addresses).encode('utf-8')
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(payload)
+            return list(addresses)
+
+    def remove_many(self, emails, source):
+        with self._lock:
+            self._ensure_loaded()
+            lines = []
+            for email in emails:
+                address = self.canonical(email)
+                if source in self._entries.get(address, ()):
+                    self._discard(address, source)
+                    lines.append(f"-{source}\t{address}\n")
+            self._write(lines)
+            if self._removals > max(1000, len(self._entries)):
+                self.compact()
+
+    def remove(self, email, source):
+        self.remove_many([email], source)
+
+    def clear_source(self, source):
+        """Forget every address from one source (e.g. discovery history cleared)"""
+        with self._lock:
+            self._ensure_loaded()
+            self.remove_many([a for a, s in self._entries.items() if source in s], source)
+
+    def filter_new(self, leads, source, against=None, key='email', record=True):
+        """
+        Split incoming leads into (new_leads, skipped_count), checking
+        `against` sources (default: just `source`) and duplicates within
+        the batch itself; invalid addresses are skipped too. New addresses
+        are recorded under `source` unless record=False (callers that must
+        persist the leads first then call add_many themselves).
+        """
+        against = set(against or (source,))
+        new_leads, seen = [], set()
+        with self._lock:
+            self._ensure_loaded()
+            for lead in leads:
+                address = self.canonical(lead.get(key))
+                if not address or address in seen:
+                    continue
+                known = self._entries.get(address)
+                if known and not known.isdisjoint(against):
+                    continue
+                seen.add(address)
+                new_leads.append(lead)
+            if record:
+                self.add_many(seen, source)
+        return new_leads, len(leads) - len(new_leads)
+
+    def compact(self):
+        """Rewrite the file with only live entries (temp file + atomic rename)"""
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for address, sources in self._entries.items():
+                    for source in sorted(sources):
+                        f.write(f"{source}\t{address}\n")
+            os.replace(tmp_path, self.path)
+            self._removals = 0
+            st = os.stat(self.path)
+            self._offset, self._inode = st.st_size, st.st_ino
+
+    @property
+    def stamp_path(self):
+        return f"{self.path}.outreach"
+
+    def outreach_stamp(self):
+        """(inode, size) of the outreach log the OUTREACH entries were synced with, or None"""
+        try:
+            with open(self.stamp_path, 'r') as f:
+                inode, size = f.read().split()
+            return int(inode), int(size)
+        except (OSError, ValueError):
+            return None
+
+    def set_outreach_stamp(self, stamp):
+        """Record that the OUTREACH entries match the log as of `stamp` (see log_stamp())"""
+        tmp_path = f"{self.stamp_path}.tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(tmp_path, 'w') as f:
+            f.write(f"{stamp[0]} {stamp[1]}\n")
+        os.replace(tmp_path, self.stamp_path)
+
+    def resync_outreach(self, emails, stamp):
+        """
+        Replace every OUTREACH entry with `emails` (the log's SENT/REPLIED
+        addresses as of `stamp`). The file is compacted, so other processes
+        and the contacted Bloom filter reload it.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            for address in [a for a, s in self._entries.items() if OUTREACH in s]:
+                self._entries[address].discard(OUTREACH)
+                if not self._entries[address]:
+                    del self._entries[address]
+            for email in emails:
+                address = self.canonical(email)
+                if address:
+                    self._entries.setdefault(address, set()).add(OUTREACH)
+            self.compact()
+            self.set_outreach_stamp(stamp)
+
+    def rebuild(self, queue_csv="data/recruiters.csv", discovery_path=None,
+                outreach_log="logs/outreach_log.csv", queue_json="data/leads_queue.json",
+                queue_db="data/leads_queue.db"):
+        """One-time scan of every existing source; later writes keep it current"""
+        from core.utils.discovery_store import DISCOVERY_STORE
+        discovery_path = discovery_path or DISCOVERY_STORE
+
+        with self._lock:
+            self._entries, self._removals = {}, 0
+            stamp = log_stamp(outreach_log)  # before the scan: a later append just means one more sync
+
+            def record(email, source):
+                address = self.canonical(email)
+                if address:
+                    self._entries.setdefault(address, set()).add(source)
+
+            for row in _read_csv_rows(queue_csv):
+                record(row.get('email'), QUEUE)
+            for row in _read_csv_rows(outreach_log):
+                if row.get('status') in ('SENT', 'REPLIED'):
+                    record(row.get('email'), OUTREACH)
+            if os.path.exists(queue_json):
+                try:
+                    with open(queue_json, 'r') as f:
+                        for lead in json.load(f):
+                            record(lead.get('email'), QUEUE)
+                except (ValueError, OSError):
+                    pass
+            if os.path.exists(queue_db):
+                import sqlite3
+                conn = sqlite3.connect(queue_db)
+                try:
+                    for (email,) in conn.execute("SELECT email FROM leads"):
+                        record(email, QUEUE)
+                except sqlite3.Error:
+                    pass
+                finally:
+                    conn.close()
+            if os.path.exists(discovery_path):
+                with open(discovery_path, 'r') as f:
+                    for line in f:
+                        try:
+                            record(json.loads(line).get('email'), DISCOVERY)
+                        except ValueError:
+                            continue
+
+            self._loaded = True
+            self.compact()
+            self.set_outreach_stamp(stamp)
+
+def log_stamp(path):
+    """(inode, size) of a log file, (0, 0) if it doesn't exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return 0, 0
+    return st.st_ino, st.st_size
+
+def _read_csv_rows(path):
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+        yield from csv.DictReader(f)
+
+_shared_index = None
+
+def get_dedup_index():
+    """Process-wide DedupIndex so every ingestion path shares one loaded map"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = DedupIndex()
+    return _shared_index
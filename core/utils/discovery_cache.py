@@ -0,0 +1,102 @@
+"""
+Disk-backed cache for AI company discovery results.
+Keyed by the normalized query text + limit so repeated searches, or ones
+that differ only in case, punctuation or filler words, skip the Groq call
+entirely.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+DISCOVERY_CACHE = os.path.join("logs", "discovery_cache.json")
+
+# Filler words that don't change which companies a query targets
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'at', 'by', 'companies', 'company', 'find', 'for',
+    'from', 'in', 'is', 'me', 'of', 'on', 'or', 'please', 'show', 'some', 'that',
+    'the', 'to', 'which', 'who', 'with'
+}
+
+def normalize_query(query):
+    """
+    Fold case, punctuation, whitespace and stopwords so 'AI startups in
+    SF' and 'ai startups, sf' share a cache entry. Word order and repeated
+    words are kept: they can change what a query means.
+    """
+    tokens = (t.strip('.') for t in re.findall(r"[a-z0-9+#.]+", (query or "").lower()))
+    return " ".join(t for t in tokens if t and t not in STOPWORDS)
+
+class DiscoveryCache:
+    """
+    Persists AI company lists per normalized query and remembers which
+    domains have already been mined on Hunter.io.
+    """
+    def __init__(self, path=DISCOVERY_CACHE, ttl_hours=None):
+        self.path = path
+        if ttl_hours is None:
+            ttl_hours = float(os.getenv("DISCOVERY_CACHE_TTL_HOURS", 168))
+        self.ttl_seconds = ttl_hours * 3600
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = {"queries": {}, "searched_domains": {}}
+            if os.path.exists(self.path):
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._data.update(json.load(f))
+                except (ValueError, OSError):
+                    pass
+        return self._data
+
+    def _save(self):
+        """Write via temp file + rename so readers never see a partial file"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Per-writer temp name: the dashboard and CLI discovery can save at the same time
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def make_key(query, limit):
+        return f"{normalize_query(query)}|{int(limit)}"
+
+    def get_companies(self, query, limit):
+        """Return cached companies for this query, or None on miss/expiry"""
+        entry = self._load()["queries"].get(self.make_key(query, limit))
+        if not entry:
+            return None
+        if time.time() - entry.get("cached_at", 0) > self.ttl_seconds:
+            return None
+        return entry.get("companies")
+
+    def put_companies(self, query, limit, companies):
+        data = self._load()
+        now = time.time()
+        # Drop expired entries while we're rewriting anyway
+        data["queries"] = {
+            k: v for k, v in data["queries"].items()
+            if now - v.get("cached_at", 0) <= self.ttl_seconds
+        }
+        data["queries"][self.make_key(query, limit)] = {
+            "query": query,
+            "companies": companies,
+            "cached_at": now
+        }
+        self._save()
+
+    def was_searched(self, domain):
+        """True if this domain's contacts were already pulled from Hunter.io"""
+        return (domain or "").lower() in self._load()["searched_domains"]
+
+    def mark_searched(self, domain):
+        self._load()["searched_domains"][(domain or "").lower()] = time.time()
+        self._save()
+
+    def clear(self):
+        self._data = {"queries": {}, "searched_domains": {}}
+        if os.path.exists(self.path):
+            os.remove(self.path)
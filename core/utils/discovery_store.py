@@ -0,0 +1,190 @@
+"""
+Append-only JSONL store for discovered leads.
+New leads are appended as one JSON object per line instead of rewriting
+the whole history; an in-memory email index supports O(1) lookups and
+compaction drops superseded rows once enough of them pile up.
+Every row carries a sequence number (`_seq`, assigned under a FileLock so
+processes never reuse one) that survives compaction; page() cursors are
+sequence numbers, so a cursor keeps its place when the file is rewritten.
+"""
+import bisect
+import json
+import math
+import os
+import threading
+
+from core.utils.filelock import FileLock
+
+DISCOVERY_STORE = os.path.join("logs", "discovery_results.jsonl")
+LEGACY_DISCOVERY_LOG = os.path.join("logs", "discovery_results.json")
+
+def _clean(obj):
+    """Replace NaN with None once at write time so reads never need a scrub pass"""
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    if isinstance(obj, dict):
+        return {k: _clean(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_clean(i) for i in obj]
+    return obj
+
+class DiscoveryStore:
+    """
+    Discovery history backed by logs/discovery_results.jsonl.
+    Rows are kept in append order; readers get them newest-first.
+    A lead re-discovered under the same email supersedes its older row.
+    """
+    def __init__(self, path=DISCOVERY_STORE, legacy_path=LEGACY_DISCOVERY_LOG, compact_min_dead=1000):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_min_dead = compact_min_dead
+        self._lock = threading.RLock()
+        self._rows = []        # append order; None marks a superseded row
+        self._seqs = []        # sequence number of each row, ascending
+        self._index = {}       # lowercased email -> position in self._rows
+        self._dead = 0
+        self._offset = 0       # bytes of the file already loaded
+        self._inode = None
+        self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """One-time import of the old newest-first JSON array"""
+        if os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                legacy = json.load(f)
+        except (ValueError, OSError):
+            legacy = []
+        if isinstance(legacy, list):
+            self.append(list(reversed(legacy)))
+        os.replace(self.legacy_path, f"{self.legacy_path}.migrated")
+
+    def _reset(self):
+        self._rows, self._seqs, self._index, self._dead, self._offset = [], [], {}, 0, 0
+
+    def _refresh(self):
+        """Pick up rows appended by other processes; full reload if the file was rewritten"""
+        try:
+            st = os.stat(self.path)
+            size, inode = st.st_size, st.st_ino
+        except FileNotFoundError:
+            size, inode = 0, None
+        if size < self._offset or inode != self._inode:
+            # Compacted (replaced) or cleared by another process: read it again from the start
+            self._reset()
+            self._inode = inode
+        if size == self._offset:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        # Leave a trailing partial line (concurrent writer) for the next refresh
+        end = chunk.rfind(b'\n') + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._add_row(json.loads(line))
+            except ValueError:
+                continue
+        self._offset += end
+
+    def _add_row(self, row):
+        # Rows written before sequence numbers existed count up from the previous one
+        seq = row.pop('_seq', None)
+        self._seqs.append(seq if isinstance(seq, int) else (self._seqs[-1] + 1 if self._seqs else 1))
+        email = (row.get('email') or '').lower()
+        if email:
+            previous = self._index.get(email)
+            if previous is not None:
+                self._rows[previous] = None
+                self._dead += 1
+            self._index[email] = len(self._rows)
+        self._rows.append(row)
+
+    def append(self, leads):
+        """Append leads in one write; returns the number of rows written"""
+        if not leads:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, FileLock(self.path):
+            self._refresh()
+            first = self._seqs[-1] + 1 if self._seqs else 1
+            rows = [dict(_clean(dict(lead)), _seq=first + i) for i, lead in enumerate(leads)]
+            payload = "".join(json.dumps(row) + "\n" for row in rows).encode('utf-8')
+
+            with open(self.path, 'ab') as f:
+                f.write(payload)
+            for row in rows:
+                self._add_row(row)
+            self._offset += len(payload)
+            self._inode = os.stat(self.path).st_ino
+
+            if self._dead >= max(self.compact_min_dead, len(self._index)):
+                self.compact()
+            return len(rows)
+
+    def compact(self):
+        """Rewrite the file without superseded rows (temp file + atomic rename)"""
+        with self._lock, FileLock(self.path):
+            self._refresh()
+            live = [dict(row, _seq=seq) for row, seq in zip(self._rows, self._seqs) if row is not None]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                for row in live:
+                    f.write(json.dumps(row) + "\n")
+            os.replace(tmp_path, self.path)
+
+            self._reset()
+            for row in live:
+                self._add_row(row)
+            st = os.stat(self.path)
+            self._offset, self._inode = st.st_size, st.st_ino
+
+    def contains(self, email):
+        with self._lock:
+            self._refresh()
+            return (email or '').lower() in self._index
+
+    def get(self, email):
+        with self._lock:
+            self._refresh()
+            position = self._index.get((email or '').lower())
+            return None if position is None else self._rows[position]
+
+    def all(self):
+        """Every live lead, newest first"""
+        with self._lock:
+            self._refresh()
+            return [row for row in reversed(self._rows) if row is not None]
+
+    def page(self, cursor=None, limit=50):
+        """
+        Cursor-paginated read, newest first.
+        Returns (leads, next_cursor); next_cursor is None on the last page.
+        A cursor is the sequence number of the previous page's last row:
+        the next page starts at the row appended just before it.
+        """
+        with self._lock:
+            self._refresh()
+            position = len(self._rows) if cursor is None else bisect.bisect_left(self._seqs, int(cursor))
+            leads = []
+            while position > 0 and len(leads) < limit:
+                position -= 1
+                if self._rows[position] is not None:
+                    leads.append(self._rows[position])
+            return leads, (self._seqs[position] if position > 0 else None)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._rows) - self._dead
+
+    def clear(self):
+        with self._lock, FileLock(self.path):
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._reset()
+            self._inode = None
@@ -0,0 +1,61 @@
+"""
+Advisory file lock shared by processes writing the same log file.
+Locks a sidecar `<path>.lock` so the data file itself can still be
+replaced atomically. Uses fcntl on POSIX and msvcrt on Windows, where
+shared locks degrade to exclusive ones.
+"""
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """
+    Usage:
+        with FileLock("logs/outreach_log.csv"):            # exclusive
+            append_row()
+        with FileLock("logs/outreach_log.csv", shared=True):
+            read_all()
+    Re-entrant within a thread; not shared between threads.
+    """
+    _local = threading.local()
+
+    def __init__(self, path, shared=False):
+        self.lock_path = f"{path}.lock"
+        self.shared = shared
+        self._fd = None
+
+    def _depths(self):
+        return self._local.__dict__.setdefault("depths", {})
+
+    def __enter__(self):
+        depths = self._depths()
+        if depths.get(self.lock_path):
+            depths[self.lock_path] += 1
+            return self
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        depths[self.lock_path] = 1
+        return self
+
+    def __exit__(self, *exc):
+        depths = self._depths()
+        depths[self.lock_path] -= 1
+        if depths[self.lock_path] or self._fd is None:
+            return
+        del depths[self.lock_path]
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
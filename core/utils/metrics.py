@@ -0,0 +1,158 @@
+"""
+Lightweight in-process metrics.
+Counters and fixed-bucket histograms keyed by (name, labels), rendered in
+the Prometheus text exposition format for the dashboard's /metrics and
+dumped by `main.py --metrics-out`. Pipeline stages are timed with
+
+    with metrics.timer("smtp_send"):
+        ...
+
+which observes reachai_stage_seconds{stage="smtp_send"} and, if the block
+raises, bumps reachai_stage_errors_total{stage="smtp_send"}.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers a cached config read up to a slow SMTP handshake
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = "reachai_stage_seconds"
+STAGE_ERRORS = "reachai_stage_errors_total"
+
+HELP = {
+    STAGE_SECONDS: "Time spent per pipeline stage",
+    STAGE_ERRORS: "Failures per pipeline stage",
+    "reachai_leads_total": "Leads processed by outcome",
+}
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms"""
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}    # name -> {label_key: value}
+        self._histograms = {}  # name -> {label_key: _Histogram}
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block as `stage`; exceptions are counted and re-raised"""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(STAGE_ERRORS, stage=stage)
+            raise
+        finally:
+            self.observe(STAGE_SECONDS, time.perf_counter() - started, stage=stage)
+
+    def count_error(self, stage):
+        """Record a stage failure that didn't raise (e.g. an HTTP error status)"""
+        self.inc(STAGE_ERRORS, stage=stage)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, {'le': bound})} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': '+Inf'})} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Plain-dict view (counters, and count/sum/mean per histogram series)"""
+        with self._lock:
+            counters = {name: {_format_labels(key) or "": value for key, value in series.items()}
+                        for name, series in self._counters.items()}
+            histograms = {
+                name: {_format_labels(key) or "": {
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "mean": round(h.sum / h.count, 6) if h.count else None,
+                    "buckets": dict(zip(map(str, h.buckets), h.counts))
+                } for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def dump(self, path):
+        """Write Prometheus text, or JSON if `path` ends in .json"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.render_prometheus())
+
+REGISTRY = MetricsRegistry()
+
+timer = REGISTRY.timer
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+count_error = REGISTRY.count_error
+render_prometheus = REGISTRY.render_prometheus
+dump = REGISTRY.dump
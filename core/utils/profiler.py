@@ -0,0 +1,190 @@
+"""
+On-demand profiling for pipeline runs and dashboard requests.
+A Profiler wraps a block with cProfile plus a sampling thread that reads
+the profiled thread's stack every `interval` seconds, and optionally
+tracemalloc. On stop it writes to logs/profiles/:
+
+    <id>.prof       pstats dump (snakeviz / python -m pstats)
+    <id>.collapsed  folded stacks for flamegraph.pl / speedscope
+    <id>.txt        top-N functions by cumulative time (+ memory growth)
+    <id>.json       metadata used by the dashboard's profile list
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.path.join("logs", "profiles")
+PROFILE_FILES = {"prof": ".prof", "collapsed": ".collapsed", "report": ".txt", "meta": ".json"}
+PROFILE_ID = re.compile(r"^[\w.-]+$")
+
+# Only one cProfile can be active at a time on newer Pythons; concurrent
+# profiled requests fall back to sampling only
+_cprofile_lock = threading.Lock()
+
+def _slug(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_")[:60] or "profile"
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+class Profiler:
+    """
+    Usage:
+        with Profiler("batch", memory=True) as profiler:
+            run()
+        print(profiler.profile_id)
+    """
+    def __init__(self, name, interval=0.005, top=30, memory=False, out_dir=PROFILE_DIR):
+        self.name = name
+        self.interval = interval
+        self.top = top
+        self.memory = memory
+        self.out_dir = out_dir
+        self.profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{_slug(name)}"
+        self.stacks = Counter()
+        self.samples = 0
+        self._cprofile = None
+        self._sampler = None
+        self._stop = threading.Event()
+        self._snapshot = None
+        self._started_tracemalloc = False
+        self._running = False
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._started = time.perf_counter()
+        self._started_at = datetime.now()
+
+        if _cprofile_lock.acquire(blocking=False):
+            self._cprofile = cProfile.Profile()
+            try:
+                self._cprofile.enable()
+            except ValueError:
+                _cprofile_lock.release()
+                self._cprofile = None
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(25)
+                self._started_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+
+        self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._sampler.start()
+        self._running = True
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def stop(self):
+        """Stop collecting and write the profile files; returns the metadata"""
+        if not self._running:
+            return None
+        self._running = False
+        duration = time.perf_counter() - self._started
+        if self._cprofile:
+            self._cprofile.disable()
+            _cprofile_lock.release()
+        # Snapshot before tearing down the sampler so its frames aren't counted
+        after = tracemalloc.take_snapshot() if self.memory else None
+        self._stop.set()
+        self._sampler.join()
+
+        memory_report = None
+        if self.memory:
+            growth = after.compare_to(self._snapshot, "lineno")[:self.top]
+            current, peak = tracemalloc.get_traced_memory()
+            memory_report = {
+                "current_mb": round(current / 1024 / 1024, 2),
+                "peak_mb": round(peak / 1024 / 1024, 2),
+                "top_growth": [str(stat) for stat in growth]
+            }
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, self.profile_id)
+
+        with open(base + ".collapsed", "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        report = io.StringIO()
+        report.write(f"Profile {self.profile_id}: {self.name}\n")
+        report.write(f"Duration {duration:.3f}s, {self.samples} samples every {self.interval * 1000:.0f} ms\n\n")
+        if self._cprofile:
+            self._cprofile.dump_stats(base + ".prof")
+            stats = pstats.Stats(self._cprofile, stream=report)
+            stats.sort_stats("cumulative").print_stats(self.top)
+        else:
+            report.write("(cProfile unavailable: another profile was running; sampled stacks only)\n\n")
+        report.write("Hottest sampled stacks:\n")
+        for stack, count in self.stacks.most_common(self.top):
+            report.write(f"{count:6d}  {stack.split(';')[-1]}  <- {';'.join(stack.split(';')[-4:-1])}\n")
+        if memory_report:
+            report.write(f"\nMemory: current {memory_report['current_mb']} MB, peak {memory_report['peak_mb']} MB\n")
+            report.write("Top allocation growth:\n")
+            report.writelines(f"  {line}\n" for line in memory_report["top_growth"])
+        with open(base + ".txt", "w") as f:
+            f.write(report.getvalue())
+
+        meta = {
+            "id": self.profile_id,
+            "name": self.name,
+            "started_at": self._started_at.isoformat(timespec="seconds"),
+            "duration_s": round(duration, 4),
+            "samples": self.samples,
+            "cprofile": self._cprofile is not None,
+            "memory": memory_report,
+            "files": sorted(kind for kind, ext in PROFILE_FILES.items() if os.path.exists(base + ext))
+        }
+        with open(base + ".json", "w") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def list_profiles(out_dir=PROFILE_DIR, limit=50):
+    """Metadata of the most recent profiles, newest first"""
+    if not os.path.isdir(out_dir):
+        return []
+    names = sorted((n for n in os.listdir(out_dir) if n.endswith(".json")), reverse=True)[:limit]
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(out_dir, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+def profile_path(profile_id, kind, out_dir=PROFILE_DIR):
+    """Path of one profile artifact, or None for unknown ids/kinds"""
+    if kind not in PROFILE_FILES or not PROFILE_ID.match(profile_id or ""):
+        return None
+    path = os.path.join(out_dir, profile_id + PROFILE_FILES[kind])
+    return path if os.path.exists(path) else None
@@ -4,11 +4,7 @@ import time
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
-from core.agents.data_agent import DataAgent
-from core.agents.llm_agent import LLMAgent
-from core.agents.email_agent import EmailAgent
-from core.agents.audit_agent import AuditAgent
-from core.agents.inbox_agent import InboxAgent
+from core.utils import metrics
 
 # Configure logging
 os.makedirs("logs", exist_ok=True)
@@ -23,6 +19,9 @@ logging.basicConfig(
 
 logger = logging.getLogger("Orchestrator")
 
+# Leads planned into one journal batch when streaming a CSV without --limit
+PLAN_CHUNK = 500
+
 def is_business_hours():
     """Check if current time is within business hours (using config)"""
     try:
@@ -43,15 +42,199 @@ def is_business_hours():
         # Fallback to env vars or default
         return True
 
-def run_outreach_pipeline(csv_path, bio, test_mode=False, delay=30, resume_path=None, limit=None, force=False):
+def build_agents():
+    """Initialize the long-lived agents (can be reused across batches)"""
+    # Imported here so --help and dashboard imports don't pay for groq/pandas
+    from core.agents.llm_agent import LLMAgent
+    from core.agents.sender_pool import build_email_agent
+    from core.agents.audit_agent import AuditAgent
+    from core.agents.inbox_agent import InboxAgent
+    from core.scheduler.sequences import SequenceStore
+    from core.scheduler.retries import RetryQueue
+    
     load_dotenv()
+    return {
+        "llm": LLMAgent(),
+        "email": build_email_agent(),
+        "audit": AuditAgent(),
+        "inbox": InboxAgent(),
+        "sequences": SequenceStore(),
+        "retries": RetryQueue()
+    }
+
+def _wait(seconds, cancel_event=None):
+    """Sleep between emails; returns early (True) if the batch was cancelled"""
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
+
+def build_planner(audit_agent, delay, window=None):
+    """
+    SendPlanner for one batch from config/schedule.json. `window` may add
+    a campaign's start_time/end_time (scheduled batches) and, for
+    --workers, the shared now/seed/sent_today plus this worker's shard.
+    """
+    from core.utils.config import load_schedule_config
+    from core.scheduler.planner import SendPlanner
+    
+    window = window or {}
+    # The top-level start/end_time belong to the auto-scheduler; manual runs only take hours and quota
+    config = {k: v for k, v in load_schedule_config().items() if k not in ("start_time", "end_time")}
+    config.update({k: window[k] for k in ("start_time", "end_time") if window.get(k)})
+    now = datetime.fromisoformat(window["now"]) if window.get("now") else datetime.now()
+    sent_today = window.get("sent_today")
+    if sent_today is None:
+        sent_today = audit_agent.count_sent_since(datetime.combine(now.date(), datetime.min.time()))
+    shard = tuple(window["shard"]) if window.get("shard") else None
+    return SendPlanner(config, delay=delay, sent_today=sent_today, now=now, seed=window.get("seed"), shard=shard,
+                       clock=datetime.now)
+
+def check_replies(inbox_agent, audit_agent, sequences=None):
+    """
+    Mark inbox replies as REPLIED and stop their follow-up sequences.
+    True if the inbox was read; follow-ups only go out after that.
+    """
+    logger.info("📬 Checking inbox for replies...")
+    try:
+        with metrics.timer("imap_check"):
+            replied_emails = inbox_agent.check_for_replies()
+        for email in replied_emails:
+            audit_agent.mark_as_replied(email)
+            if sequences:
+                sequences.cancel(email, 'replied')
+            logger.info(f"✅ Marked {email} as REPLIED")
+    except Exception as e:
+        logger.warning(f"⚠️  Inbox check failed (continuing anyway): {e}")
+        return False
+    return True
+
+def _wait_for_slot(slots, cancel_event=None):
+    """Sleep until the next planned send time; False if the plan ran out or the batch was cancelled"""
+    slot = next(slots, None)
+    if slot is None:
+        logger.warning("⏰ No send slots left in the schedule window. Pausing pipeline.")
+        return False
+    pause = (slot - datetime.now()).total_seconds()
+    if pause <= 0:
+        return True
+    if pause > 60:
+        logger.info(f"⏰ Next send slot at {slot.strftime('%Y-%m-%d %H:%M:%S')}")
+    return not _wait(pause, cancel_event)
+
+def send_follow_ups(agents, limit=None, delay=30, cancel_event=None, send_gate=None, force=False, slots=None):
+    """
+    Send every follow-up step that is due (earliest first, at most `limit`)
+    through the same email agent, audit log and pacing as first emails.
+    `slots` is the batch's planned dispatch times (SendPlanner.slots()).
+    Returns {"sent", "failed", "cancelled"}.
+    """
+    sequences = agents.get("sequences")
+    result = {"sent": 0, "failed": 0, "cancelled": False}
+    if sequences is None:
+        return result
+    
+    while not limit or result["sent"] < limit:
+        page = sequences.due(limit=min(100, limit - result["sent"]) if limit else 100)
+        if not page:
+            break
+        for step in page:
+            if cancel_event is not None and cancel_event.is_set():
+                result["cancelled"] = True
+                return result
+            if slots is not None:
+                if not _wait_for_slot(slots, cancel_event):
+                    result["cancelled"] = cancel_event is not None and cancel_event.is_set()
+                    return result
+            elif not force and not is_business_hours():
+                return result
+            recipient = step['email']
+            draft = agents["llm"].generate_follow_up(step, step['step'], step['subject'])
+            if send_gate and not send_gate.acquire(cancel_event):
+                return result
+            logger.info(f"🔁 Follow-up {step['step']} to {recipient}")
+            success = agents["email"].send_email(recipient, draft['subject'], draft['body'])
+            if success:
+                sequences.advance(recipient)
+                agents["audit"].log_result(recipient, step['company'], "SENT", subject=draft['subject'],
+                                           template_used=draft['template_used'])
+                metrics.inc("reachai_leads_total", status="follow_up")
+                result["sent"] += 1
+            else:
+                if send_gate:
+                    send_gate.refund()
+                # Keep the step, try again in an hour
+                sequences.postpone(recipient, 3600)
+                agents["audit"].log_result(recipient, step['company'], "FAILED_SEND", subject=draft['subject'],
+                                           template_used=draft['template_used'])
+                metrics.inc("reachai_leads_total", status="failed_follow_up")
+                result["failed"] += 1
+            if limit and result["sent"] >= limit:
+                break
+            if slots is None and delay and _wait(delay, cancel_event):
+                result["cancelled"] = True
+                return result
+    if result["sent"] or result["failed"]:
+        logger.info(f"🔁 Follow-ups: {result['sent']} sent, {result['failed']} failed")
+    return result
+
+def run_outreach_pipeline(csv_path, bio, test_mode=False, delay=30, resume_path=None, limit=None, force=False,
+                          agents=None, skip_inbox=None, cancel_event=None, progress_callback=None, journal=None,
+                          leads=None, send_gate=None, follow_ups=True, window=None, shard=None,
+                          replies_checked=False):
+    """
+    Run one outreach batch over csv_path.
+    `agents` lets a long-lived worker pass warm agents from build_agents();
+    `cancel_event` (threading.Event) stops the batch between emails and
+    `progress_callback(dict)` receives sent/skipped/processed counts.
+    Real sends go through a BatchJournal (logs/batch_journal.jsonl): an
+    interrupted batch is resumed from its cursor on the next run over the
+    same CSV, which then goes on to the new leads as usual. With a
+    SenderPool (config/senders.json) several sends run in parallel and the
+    batch pauses when every account is out of quota.
+    `leads` (already filtered against the audit log) replaces loading the
+    CSV, `shard=(index, count)` streams only the CSV leads that hash to
+    that worker (sharding.shard_of), and `send_gate` (sharding.GlobalGate)
+    paces sends and caps them across processes; all three are set by the
+    `--workers` coordinator.
+    Due follow-up steps are sent first and count against `limit`, but only
+    after a successful inbox check, here or by the caller
+    (`replies_checked`, the --workers coordinator), so nobody who replied
+    gets one; every successful first email enrolls the lead in the
+    follow-up sequence.
+    Unless `force` is set, sends follow a SendPlanner timeline (business
+    hours, daily_limit, jitter; `window` see build_planner) and the batch
+    sleeps until each slot.
+    Failed sends and drafts go to the retry queue (logs/retry_queue.db);
+    due retries are interleaved with the fresh leads and count against
+    `limit` like any other send.
+    Returns a summary dict.
+    """
+    load_dotenv()
+    
+    from collections import deque
+    from concurrent.futures import CancelledError, wait
+    from itertools import islice
+    from core.agents.data_agent import DataAgent
+    from core.agents.lead import Lead
+    from core.agents.sender_pool import QuotaExhausted
+    from core.scheduler.retries import SEND, LLM
     
     # Initialize Team
+    agents = agents or build_agents()
     data_agent = DataAgent(csv_path)
-    llm_agent = LLMAgent()
-    email_agent = EmailAgent()
-    audit_agent = AuditAgent()
-    inbox_agent = InboxAgent()
+    llm_agent = agents["llm"]
+    email_agent = agents["email"]
+    audit_agent = agents["audit"]
+    inbox_agent = agents["inbox"]
+    sequences = agents.get("sequences")
+    retries = None if test_mode else agents.get("retries")
+    summary = {"sent": 0, "skipped": 0, "failed": 0, "processed": 0, "total": 0, "cancelled": False,
+               "retried": 0}
+    
+    def report(current=None):
+        if progress_callback:
+            progress_callback(dict(summary, current=current))
     
     # Get resume path from env if not provided
     if not resume_path:
@@ -65,47 +248,341 @@ def run_outreach_pipeline(csv_path, bio, test_mode=False, delay=30, resume_path=
         logger.info("⚡ FORCE MODE: Bypassing business hours checks")
     
     # Check for replies first (skip if disabled for faster testing)
-    skip_inbox = os.getenv("SKIP_INBOX_CHECK", "false").lower() == "true"
+    if skip_inbox is None:
+        skip_inbox = os.getenv("SKIP_INBOX_CHECK", "false").lower() == "true"
     if not skip_inbox:
-        logger.info("📬 Checking inbox for replies...")
-        try:
-            replied_emails = inbox_agent.check_for_replies()
-            for email in replied_emails:
-                audit_agent.mark_as_replied(email)
-                logger.info(f"✅ Marked {email} as REPLIED")
-        except Exception as e:
-            logger.warning(f"⚠️  Inbox check failed (continuing anyway): {e}")
+        replies_checked = check_replies(inbox_agent, audit_agent, sequences) or replies_checked
     else:
         logger.info("⏭️  Skipping inbox check (SKIP_INBOX_CHECK=true)")
     
-    # 1. Ingest Data
-    try:
-        recruiters = data_agent.load_data()
-        logger.info(f"📊 Loaded {len(recruiters)} recruiter records")
-    except Exception as e:
-        logger.error(f"Data ingestion failed: {e}")
-        return
+    # Dispatch times for the whole batch; --force sends back to back
+    slots = None
+    if not force and not test_mode:
+        slots = build_planner(audit_agent, delay, window).slots()
+    
+    # Due follow-ups go out before new leads and share the batch limit
+    if follow_ups and sequences and not test_mode and not replies_checked:
+        logger.info("⏭️  Skipping follow-ups: the inbox wasn't checked for replies in this run")
+    elif follow_ups and sequences and not test_mode:
+        followed = send_follow_ups(agents, limit=limit, delay=delay, cancel_event=cancel_event,
+                                   send_gate=send_gate, force=force, slots=slots)
+        summary["follow_ups"] = followed["sent"]
+        summary["failed"] += followed["failed"]
+        if followed["cancelled"]:
+            summary["cancelled"] = True
+            return summary
+        if limit:
+            limit -= followed["sent"]
+            if limit <= 0:
+                logger.info("🛑 Batch limit used up by follow-ups.")
+                return summary
+    
+    # 1. Resume an interrupted batch from the journal, or plan a new one
+    if journal is None and not test_mode:
+        from core.scheduler.journal import BatchJournal
+        journal = BatchJournal()
+    batch = None
+    if journal:
+        # Only a batch planned from this CSV is resumed; others stay open for a run over theirs
+        batch = journal.recover(csv_path)
+        for other in journal.open_batches():
+            if other.batch_id != (batch and batch.batch_id):
+                logger.warning(f"📒 Batch {other.batch_id} from {other.params.get('csv_path')} is still open; "
+                               f"a run over that CSV will resume it")
+    skipped_count = 0
+    stream = None
+    planned_total = 0
+    
+    def contacted_mask(emails):
+        """Contacted leads, plus leads the retry queue owns (they come back through it)"""
+        with metrics.timer("contacted_check"):
+            mask = audit_agent.contacted_mask(emails)
+            if retries:
+                mask = [hit or queued for hit, queued in zip(mask, retries.queued_mask(emails))]
+            return mask
+    
+    foreign = 0  # other shards' leads, dropped by the anti-join but not skipped by this worker
+    exclude = contacted_mask
+    if shard:
+        from core.scheduler.sharding import shard_of
+        
+        def exclude(emails):
+            """Other shards' leads, then contacted_mask() for the rest"""
+            nonlocal foreign
+            theirs = [shard_of(str(email), shard[1]) != shard[0] for email in emails]
+            foreign += sum(theirs)
+            checked = iter(contacted_mask([email for email, other in zip(emails, theirs) if not other]))
+            return [other or next(checked) for other in theirs]
+    
+    def plan_chunk():
+        """Next uncontacted leads from the stream: PLAN_CHUNK, or what is left of `limit`"""
+        nonlocal skipped_count, planned_total
+        size = min(PLAN_CHUNK, limit - planned_total) if limit else PLAN_CHUNK
+        excluded = data_agent.excluded - foreign
+        planned = list(islice(stream, size)) if size > 0 else []
+        skipped = data_agent.excluded - foreign - excluded
+        if skipped:
+            logger.info(f"⏭️  Skipping {skipped} already contacted leads")
+        skipped_count += skipped
+        planned_total += len(planned)
+        summary["total"] += len(planned)
+        return planned
+    
+    if batch:
+        # Sends that never reached the audit log: audit only, never re-send
+        for email, info in batch.unaudited():
+            audit_agent.log_result(email, info.get('company'), "SENT", subject=info.get('subject'),
+                                   has_attachment=info.get('has_attachment', False), template_used=info.get('template_used'))
+            journal.record(batch, email, 'audited')
+            if sequences:
+                lead = next((l for l in batch.leads if l.email == email), Lead(email=email, company=info.get('company')))
+                sequences.enroll(lead, info.get('subject'))
+            logger.info(f"📝 Recovered audit entry for {email}")
+        recruiters = batch.pending_leads()
+        offset = batch.cursor
+        planned_total = len(recruiters)
+        summary["total"] = len(batch.leads)
+        logger.info(f"♻️  Resuming batch {batch.batch_id} at {offset}/{len(batch.leads)}")
+    
+    # New leads (after a resumed batch, once it is done): the given ones, or the CSV
+    if leads is not None:
+        stream = iter([Lead.from_record(lead) for lead in leads])
+        if leads:
+            logger.info(f"📊 Received {len(leads)} pending recruiter records")
+    else:
+        # Streamed and anti-joined against the contacted index a chunk at a time:
+        # the first email goes out while the rest of the file is still unread
+        try:
+            with metrics.timer("data_load"):
+                stream = data_agent.iter_leads(exclude=exclude)
+        except Exception as e:
+            logger.error(f"Data ingestion failed: {e}")
+            summary["error"] = str(e)
+            if not batch:
+                return summary
+    
+    if not batch:
+        offset = 0
+        if journal:
+            # Planned a chunk at a time, so a restart never has to rescan the CSV
+            recruiters = plan_chunk()
+            batch = journal.begin(recruiters, params={"csv_path": csv_path, "limit": limit})
+        else:
+            recruiters = islice(stream, limit) if limit else stream
 
     # 2. Process each recruiter
     sent_count = 0
-    skipped_count = 0
+    summary["skipped"] = skipped_count
+    report()
+    
+    # A SenderPool takes several sends at once and paces each connection by
+    # `delay` itself; a plain EmailAgent sends one at a time with the delay here
+    parallel = hasattr(email_agent, "submit") and not test_mode
+    in_flight = deque()
+    done_positions = set()
     
-    for idx, recruiter in enumerate(recruiters, 1):
-        recipient = recruiter['email']
-        company = recruiter['company']
+    def advance(position):
+        # The cursor only moves past leads whose outcome is known
+        done_positions.add(position)
+        cursor = batch.cursor
+        while cursor + 1 in done_positions:
+            cursor += 1
+            done_positions.discard(cursor)
+        if cursor != batch.cursor:
+            journal.advance(batch, cursor)
+    
+    def record_send(position, recruiter, subject, template_used, attachment, success, error=None):
+        nonlocal sent_count
+        recipient, company = recruiter.email, recruiter.company
+        claimed.discard(recipient)
+        # 2c. Log & Audit (journal 'sent' first so a crash here can't cause a resend)
+        if success:
+            if batch:
+                journal.record(batch, recipient, 'sent')
+            audit_agent.log_result(recipient, company, "SENT", subject=subject, has_attachment=bool(attachment), template_used=template_used)
+            if batch:
+                journal.record(batch, recipient, 'audited')
+            if sequences:
+                sequences.enroll(recruiter, subject)
+            if retries and position is None:
+                retries.done(recipient)
+            logger.info(f"✅ Sent to {recipient}")
+            metrics.inc("reachai_leads_total", status="sent")
+            sent_count += 1
+        else:
+            if send_gate:
+                send_gate.refund()
+            audit_agent.log_result(recipient, company, "FAILED_SEND", subject=subject, template_used=template_used,
+                                   error=None if error is None else str(error))
+            if batch and position is not None:
+                journal.record(batch, recipient, 'failed')
+            logger.error(f"❌ Failed to send to {recipient}")
+            schedule_retry(recruiter, SEND, error)
+            metrics.inc("reachai_leads_total", status="failed_send")
+            summary["failed"] += 1
+        if batch and position is not None:
+            advance(position)
+        summary["sent"] = sent_count
+        summary["processed"] += 1
+        report(recipient)
+    
+    def schedule_retry(recruiter, stage, error):
+        if not retries:
+            return
+        status, due_at = retries.record_failure(recruiter, stage, error)
+        if status == 'dead':
+            logger.warning(f"🪦 Not retrying {recruiter.email}: {error or 'failed'}")
+        else:
+            logger.info(f"🔁 Retrying {recruiter.email} at {datetime.fromtimestamp(due_at).strftime('%Y-%m-%d %H:%M')}")
+    
+    def release(recruiter):
+        """A claimed retry that was never attempted goes back to the queue"""
+        if recruiter.email in claimed:
+            claimed.discard(recruiter.email)
+            retries.release(recruiter.email)
+    
+    def settle(block=False):
+        """Record finished pool sends in order; False once the pool ran out of quota"""
+        while in_flight and (block or in_flight[0][0].done()):
+            future, position, recruiter, subject, template_used, attachment = in_flight.popleft()
+            try:
+                success = future.result()
+            except QuotaExhausted:
+                # Never attempted: stays 'drafted' in the journal and is resumed later
+                summary["quota_exhausted"] = True
+                if send_gate:
+                    send_gate.refund()
+                release(recruiter)
+                continue
+            except CancelledError:
+                release(recruiter)
+                continue
+            record_send(position, recruiter, subject, template_used, attachment, success,
+                        getattr(future, "error", None))
+        return not summary.get("quota_exhausted")
+    
+    def lead_queue():
+        """(position in batch, lead); a journaled stream moves on to its next planned chunk"""
+        nonlocal batch
+        position = offset
+        for recruiter in recruiters:
+            position += 1
+            if batch is None:
+                summary["total"] = max(summary["total"], position)
+            yield position, recruiter
+        while stream is not None and batch is not None:
+            # Close this chunk's batch before the next one is planned
+            settle(block=True)
+            if summary.get("quota_exhausted") or batch.cursor < len(batch.leads):
+                return
+            journal.commit(batch)
+            batch = None
+            chunk = plan_chunk()
+            if not chunk:
+                return
+            batch = journal.begin(chunk, params={"csv_path": csv_path, "limit": limit})
+            for position, recruiter in enumerate(chunk, 1):
+                yield position, recruiter
+    
+    claimed = set()  # retries taken from the queue and not yet settled
+    
+    def with_retries(queue):
+        """
+        Due retries (position None) between fresh leads: one after every
+        `retry_interleave` fresh ones, so a backlog of failures neither
+        holds up new leads nor waits behind all of them; due retries left
+        when the fresh leads run out follow.
+        """
+        if not retries:
+            yield from queue
+            return
+        every = retries.interleave
         
-        # Skip if already contacted
-        if audit_agent.has_been_contacted(recipient):
-            logger.info(f"⏭️  Skipping {recipient} (already contacted)")
-            skipped_count += 1
+        def due_retry():
+            taken = retries.take()
+            if taken is None:
+                return None
+            recruiter, attempts = taken
+            claimed.add(recruiter.email)
+            summary["retried"] += 1
+            logger.info(f"🔁 Retry {attempts + 1} for {recruiter.email}")
+            return recruiter
+        
+        fresh = 0
+        for item in queue:
+            yield item
+            fresh += 1
+            if every and fresh % every == 0:
+                recruiter = due_retry()
+                if recruiter is not None:
+                    yield None, recruiter
+        while True:
+            recruiter = due_retry()
+            if recruiter is None:
+                return
+            yield None, recruiter
+    
+    paced = False  # a send happened since the last rate-limit wait
+    
+    for position, recruiter in with_retries(lead_queue()):
+        recipient = recruiter.email
+        company = recruiter.company
+        
+        if cancel_event is not None and cancel_event.is_set():
+            logger.warning("🛑 Batch cancelled. Stopping.")
+            summary["cancelled"] = True
+            break
+        
+        if parallel:
+            if not settle() or (limit and sent_count + len(in_flight) >= limit):
+                break
+            # Keep at most `capacity` drafted emails waiting on the pool
+            while len(in_flight) >= email_agent.capacity and settle():
+                wait([in_flight[0][0]])
+            if summary.get("quota_exhausted"):
+                break
+        
+        # Leads already finished by an interrupted parallel batch
+        if batch and position is not None and batch.states.get(recipient) in ('audited', 'failed', 'skipped'):
+            advance(position)
             continue
         
-        # Check business hours (skip if forced)
-        if not force and not is_business_hours():
+        # Skip if already contacted (or, for a fresh lead, waiting in the retry queue)
+        with metrics.timer("contacted_check"):
+            contacted = audit_agent.has_been_contacted(recipient)
+        queued = retries is not None and position is not None and not contacted and retries.is_queued(recipient)
+        if contacted or queued:
+            logger.info(f"⏭️  Skipping {recipient} ({'already contacted' if contacted else 'queued for retry'})")
+            skipped_count += 1
+            metrics.inc("reachai_leads_total", status="skipped")
+            summary["skipped"] = skipped_count
+            if position is None:
+                claimed.discard(recipient)
+                retries.done(recipient)
+            elif batch:
+                journal.record(batch, recipient, 'skipped')
+                advance(position)
+            continue
+        # Wait for this send's planned slot (test mode only checks business hours)
+        if slots is not None:
+            if not _wait_for_slot(slots, cancel_event):
+                summary["cancelled"] = cancel_event is not None and cancel_event.is_set()
+                break
+        elif not force and not is_business_hours():
             logger.warning("⏰ Outside business hours. Pausing pipeline.")
             break
+        elif paced and delay and not parallel:
+            # 2d. Rate limiting delay
+            logger.info(f"⏳ Waiting {delay} seconds before next email...")
+            if _wait(delay, cancel_event):
+                logger.warning("🛑 Batch cancelled. Stopping.")
+                summary["cancelled"] = True
+                break
+        paced = False
         
-        logger.info(f"📧 [{idx}/{len(recruiters)}] Processing {recipient} from {company}...")
+        # A stream read without a journal has no known total
+        progress = f"{position}/{summary['total']}" if batch or stream is None else str(position)
+        logger.info(f"📧 [{progress}] Processing {recipient} from {company}...")
         
         # 2a. Generate Personalization
         try:
@@ -132,6 +609,36 @@ def run_outreach_pipeline(csv_path, bio, test_mode=False, delay=30, resume_path=
         except Exception as e:
             logger.error(f"LLM Generation failed for {recipient}: {e}")
             audit_agent.log_result(recipient, company, "FAILED_LLM", error=str(e))
+            metrics.inc("reachai_leads_total", status="failed_llm")
+            summary["failed"] += 1
+            summary["processed"] += 1
+            claimed.discard(recipient)
+            schedule_retry(recruiter, LLM, e)
+            if batch and position is not None:
+                journal.record(batch, recipient, 'failed', error=str(e))
+                advance(position)
+            report(recipient)
+            continue
+        
+        if batch and position is not None:
+            journal.record(batch, recipient, 'drafted', company=company, subject=subject,
+                           template_used=template_used, has_attachment=bool(attachment))
+        
+        # Global pace/limit shared with the other --workers processes
+        if send_gate and not send_gate.acquire(cancel_event):
+            if cancel_event is not None and cancel_event.is_set():
+                summary["cancelled"] = True
+            else:
+                logger.info("🛑 Global batch limit reached. Stopping.")
+                summary["limit_reached"] = True
+            break
+        
+        # A retry whose claim expired while it waited for its slot belongs to another pipeline now
+        if position is None and not retries.sending(recipient):
+            claimed.discard(recipient)
+            if send_gate:
+                send_gate.refund()
+            logger.info(f"⏭️  Skipping retry of {recipient} (claimed elsewhere)")
             continue
 
         # 2b. Send Email (or simulate in test mode)
@@ -141,35 +648,69 @@ def run_outreach_pipeline(csv_path, bio, test_mode=False, delay=30, resume_path=
             if attachment:
                 logger.info(f"   Attachment: {attachment}")
             audit_agent.log_result(recipient, company, "TEST", subject=subject, has_attachment=bool(attachment), template_used=template_used)
+            metrics.inc("reachai_leads_total", status="test")
             sent_count += 1
+            if batch:
+                advance(position)
+            summary["sent"] = sent_count
+            summary["processed"] += 1
+            report(recipient)
+        elif parallel:
+            try:
+                future = email_agent.submit(recipient, subject, body, attachment_path=attachment, min_interval=delay)
+            except QuotaExhausted as e:
+                logger.warning(f"🛑 {e}. Pausing pipeline.")
+                summary["quota_exhausted"] = True
+                if send_gate:
+                    send_gate.refund()
+                release(recruiter)
+                break
+            in_flight.append((future, position, recruiter, subject, template_used, attachment))
+            continue
         else:
             success = email_agent.send_email(recipient, subject, body, attachment_path=attachment)
-            
-            # 2c. Log & Audit
-            if success:
-                audit_agent.log_result(recipient, company, "SENT", subject=subject, has_attachment=bool(attachment), template_used=template_used)
-                logger.info(f"✅ Sent to {recipient}")
-                sent_count += 1
-            else:
-                audit_agent.log_result(recipient, company, "FAILED_SEND", subject=subject, template_used=template_used)
-                logger.error(f"❌ Failed to send to {recipient}")
+            record_send(position, recruiter, subject, template_used, attachment, success,
+                        getattr(email_agent, "last_error", None))
+        paced = True
         
-        # 2d. Rate limiting delay
-        if idx < len(recruiters) and (sent_count < limit if limit else True):
-            logger.info(f"⏳ Waiting {delay} seconds before next email...")
-            time.sleep(delay)
-            
         # Check Batch Limit
         if limit and sent_count >= limit:
             logger.info(f"🛑 Batch limit of {limit} reached. Stopping.")
             break
+    
+    if in_flight:
+        if summary["cancelled"]:
+            for future, *_ in in_flight:
+                future.cancel()
+        logger.info(f"⏳ Waiting for {len(in_flight)} in-flight sends...")
+        settle(block=True)
+    
+    # Retries taken but never attempted (cancelled, paused, limit reached) stay due
+    for email in list(claimed):
+        retries.release(email)
+    claimed.clear()
+    
+    # Close the batch once every planned lead is done; otherwise the next run resumes it
+    if batch and batch.cursor >= len(batch.leads):
+        journal.commit(batch)
+    elif batch:
+        summary["batch_id"] = batch.batch_id
+        logger.info(f"📒 Batch {batch.batch_id} left open at {batch.cursor}/{len(batch.leads)}")
 
+    if stream is not None and not journal:
+        # Contacted leads dropped by the stream's anti-join
+        skipped_count += data_agent.excluded - foreign
+    
     logger.info(f"\n{'='*60}")
     logger.info(f"📊 Pipeline Execution Complete!")
     logger.info(f"   Sent: {sent_count}")
     logger.info(f"   Skipped: {skipped_count}")
-    logger.info(f"   Total Processed: {len(recruiters)}")
+    logger.info(f"   Total Processed: {summary['processed']}")
     logger.info(f"{'='*60}\n")
+    
+    summary.update(sent=sent_count, skipped=skipped_count)
+    report()
+    return summary
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Multi-Agent Recruiter Outreach System")
@@ -180,15 +721,45 @@ if __name__ == "__main__":
     parser.add_argument("--delay", type=int, default=30, help="Delay between emails in seconds")
     parser.add_argument("--resume", help="Path to resume file (overrides .env)")
     parser.add_argument("--limit", type=int, help="Limit number of emails to send (Batch Size)")
+    parser.add_argument("--workers", type=int, default=1, help="Split the batch across N processes (global delay/limit still apply)")
+    parser.add_argument("--metrics-out", help="Write stage timings/counters here when done (Prometheus text, or JSON for *.json)")
+    parser.add_argument("--profile", action="store_true", help="Profile the run (cProfile + sampled stacks) into logs/profiles/")
+    parser.add_argument("--profile-memory", action="store_true", help="With --profile, also track allocation growth (tracemalloc; slower)")
     
     args = parser.parse_args()
     
-    run_outreach_pipeline(
-        csv_path=args.csv,
-        bio=args.bio,
-        test_mode=args.test,
-        delay=args.delay,
-        resume_path=args.resume,
-        limit=args.limit,
-        force=args.force
-    )
+    profiler = None
+    if args.profile or args.profile_memory:
+        from core.utils.profiler import Profiler
+        profiler = Profiler("main", memory=args.profile_memory).start()
+    
+    try:
+        if args.workers > 1:
+            from core.scheduler.sharding import run_sharded_pipeline
+            run_sharded_pipeline(
+                csv_path=args.csv,
+                bio=args.bio,
+                workers=args.workers,
+                test_mode=args.test,
+                delay=args.delay,
+                resume_path=args.resume,
+                limit=args.limit,
+                force=args.force
+            )
+        else:
+            run_outreach_pipeline(
+                csv_path=args.csv,
+                bio=args.bio,
+                test_mode=args.test,
+                delay=args.delay,
+                resume_path=args.resume,
+                limit=args.limit,
+                force=args.force
+            )
+    finally:
+        if profiler:
+            meta = profiler.stop()
+            logger.info(f"🔬 Profile written to logs/profiles/{meta['id']}.txt")
+        if args.metrics_out:
+            metrics.dump(args.metrics_out)
+            logger.info(f"📈 Metrics written to {args.metrics_out}")
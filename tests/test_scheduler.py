@@ -0,0 +1,258 @@
+"""
+Scheduler engine, send planner and retry backoff, run against FakeClock
+and fixed `now`/`seed` values so no test waits on real time.
+
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import os
+import smtplib
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from core.agents.lead import Lead
+from core.scheduler.engine import FakeClock, Scheduler, first_run_time, schedules_from_config
+from core.scheduler.planner import SendPlanner
+from core.scheduler.retries import RetryQueue, backoff_delay
+
+T0 = datetime(2025, 1, 6, 9, 0)  # a Monday
+
+class _Edge:
+    """rng stand-in for backoff_delay: uniform() returns one end of its range"""
+    def __init__(self, high):
+        self.high = high
+
+    def uniform(self, low, high):
+        return high if self.high else low
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(T0)
+        self.scheduler = Scheduler(clock=self.clock, state_path=None)
+        self.ran = []
+
+    def callback(self, name, result=None):
+        def run(job):
+            self.ran.append(name)
+            return result
+        return run
+
+    def add(self, name, minutes, interval=None, result=None):
+        return self.scheduler.add_job(name, self.callback(name, result), T0 + timedelta(minutes=minutes),
+                                      interval=timedelta(minutes=interval) if interval else None)
+
+    def test_jobs_run_in_due_order(self):
+        self.add("c", 30)
+        self.add("a", 10)
+        self.add("b", 20)
+        self.assertEqual(self.scheduler.next_due().name, "a")
+        self.assertEqual(self.scheduler.run_pending(), [])
+
+        self.clock.advance(minutes=15)
+        self.assertEqual(self.scheduler.run_pending(), ["a"])
+        self.clock.advance(minutes=30)
+        self.assertEqual(self.scheduler.run_pending(), ["b", "c"])
+        self.assertIsNone(self.scheduler.next_due())
+
+    def test_interval_job_skips_slots_missed_while_down(self):
+        job = self.add("batch", 0, interval=10)
+        self.assertEqual(self.scheduler.run_pending(), ["batch"])
+        self.assertEqual(job.next_run, T0 + timedelta(minutes=10))
+
+        self.clock.advance(minutes=35)
+        self.assertEqual(self.scheduler.run_pending(), ["batch"])
+        self.assertEqual(job.next_run, T0 + timedelta(minutes=45))
+        self.assertEqual(job.last_run, T0 + timedelta(minutes=35))
+
+    def test_callback_returning_false_is_retried(self):
+        job = self.add("busy", 0, interval=60, result=False)
+        self.assertEqual(self.scheduler.run_pending(), ["busy"])
+        self.assertEqual(job.next_run, T0 + self.scheduler.retry_delay)
+        self.assertIsNone(job.last_run)
+
+    def test_replaced_job_drops_the_old_entry(self):
+        old = self.add("default", 60, interval=60)
+        new = self.add("default", 15, interval=15)
+        self.assertTrue(old.cancelled)
+        self.assertEqual([job.name for job in self.scheduler.jobs()], ["default"])
+        self.assertIs(self.scheduler.next_due(), new)
+
+        self.clock.advance(minutes=60)
+        self.assertEqual(self.scheduler.run_pending(), ["default"])
+        self.assertEqual(new.next_run, T0 + timedelta(minutes=75))
+
+    def test_loop_wakes_when_the_clock_advances(self):
+        fired = threading.Event()
+        self.scheduler.add_job("wake", lambda job: fired.set(), T0 + timedelta(minutes=5))
+        self.scheduler.start()
+        try:
+            self.assertFalse(fired.wait(0.1))
+            self.clock.advance(minutes=5)
+            self.assertTrue(fired.wait(5))
+        finally:
+            self.scheduler.stop()
+
+    def test_last_runs_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            state_path = os.path.join(workdir, "scheduler_state.json")
+            scheduler = Scheduler(clock=self.clock, state_path=state_path)
+            scheduler.add_job("default", lambda job: None, T0)
+            scheduler.run_pending()
+            self.assertEqual(Scheduler(clock=self.clock, state_path=state_path).last_run("default"), T0)
+
+class ConfigReloadTest(unittest.TestCase):
+    """Schedules rebuilt from config the way web_dashboard.reload_schedules does"""
+    def setUp(self):
+        self.clock = FakeClock(T0)
+        self.scheduler = Scheduler(clock=self.clock, state_path=None)
+        self.ran = []
+
+    def reload(self, config):
+        self.scheduler.clear()
+        now = self.clock.now()
+        for schedule in schedules_from_config(config):
+            name = schedule["name"]
+            next_run = first_run_time(schedule, self.scheduler.last_run(name), now)
+            self.scheduler.add_job(name, lambda job, size=schedule["batch_size"]: self.ran.append((job.name, size)),
+                                   next_run, interval=schedule["interval"], end_time=schedule["end_time"])
+
+    def test_first_run_time(self):
+        schedule = {"start_time": None, "interval": timedelta(minutes=60)}
+        self.assertEqual(first_run_time(schedule, None, T0), T0)
+        self.assertEqual(first_run_time(schedule, T0 - timedelta(minutes=20), T0), T0 + timedelta(minutes=40))
+        self.assertEqual(first_run_time(schedule, T0 - timedelta(hours=3), T0), T0)
+
+        later = dict(schedule, start_time=T0 + timedelta(days=1))
+        self.assertEqual(first_run_time(later, T0 - timedelta(minutes=20), T0), later["start_time"])
+
+    def test_changed_config_replaces_the_job(self):
+        self.reload({"auto_enabled": True, "batch_interval": 60, "batch_size": 5})
+        self.assertEqual(self.scheduler.run_pending(), ["default"])
+
+        # A shorter interval applies from the last run, not from the reload
+        self.clock.advance(minutes=5)
+        self.reload({"auto_enabled": True, "batch_interval": 15, "batch_size": 8})
+        self.assertEqual(self.scheduler.next_due().next_run, T0 + timedelta(minutes=15))
+        self.clock.advance(minutes=10)
+        self.assertEqual(self.scheduler.run_pending(), ["default"])
+        self.assertEqual(self.ran, [("default", 5), ("default", 8)])
+
+    def test_disabled_and_removed_schedules_are_dropped(self):
+        self.reload({"auto_enabled": True, "schedules": [{"name": "morning"}, {"name": "evening"}]})
+        self.assertEqual(sorted(job.name for job in self.scheduler.jobs()), ["evening", "morning"])
+
+        self.reload({"auto_enabled": True, "schedules": [{"name": "morning", "enabled": False}, {"name": "evening"}]})
+        self.assertEqual([job.name for job in self.scheduler.jobs()], ["evening"])
+        self.reload({"auto_enabled": False})
+        self.assertEqual(self.scheduler.jobs(), [])
+        self.assertEqual(self.scheduler.run_pending(), [])
+
+class SendPlannerTest(unittest.TestCase):
+    def planner(self, now, jitter=0, **config):
+        return SendPlanner(dict(config), delay=60, now=now, seed=7, jitter=jitter)
+
+    def test_window_close_continues_next_morning(self):
+        planner = self.planner(T0.replace(hour=16, minute=58), business_hours_only=True)
+        self.assertEqual(planner.timeline(4), [
+            datetime(2025, 1, 6, 16, 58), datetime(2025, 1, 6, 16, 59),
+            datetime(2025, 1, 7, 9, 0), datetime(2025, 1, 7, 9, 1),
+        ])
+
+    def test_waits_for_the_window_to_open(self):
+        planner = self.planner(T0.replace(hour=6), business_hours_only=True, start_hour=10, end_hour=12)
+        self.assertEqual(planner.timeline(1), [T0.replace(hour=10)])
+
+    def test_daily_limit_counts_todays_sends(self):
+        planner = SendPlanner({"daily_limit": 3}, delay=60, sent_today=1, now=T0.replace(hour=23, minute=50), jitter=0)
+        self.assertEqual(planner.timeline(5), [
+            datetime(2025, 1, 6, 23, 50), datetime(2025, 1, 6, 23, 51),
+            datetime(2025, 1, 7, 0, 0), datetime(2025, 1, 7, 0, 1), datetime(2025, 1, 7, 0, 2),
+        ])
+        # Tomorrow's full quota, then the day after
+        self.assertEqual(planner.timeline(6)[5], datetime(2025, 1, 8, 0, 0))
+
+    def test_quota_used_up_starts_tomorrow(self):
+        planner = SendPlanner({"daily_limit": 2, "business_hours_only": True}, delay=60, sent_today=2,
+                              now=T0.replace(hour=11), jitter=0)
+        self.assertEqual(planner.timeline(1), [datetime(2025, 1, 7, 9, 0)])
+
+    def test_end_time_stops_the_timeline(self):
+        planner = self.planner(T0, end_time="2025-01-06 09:03")
+        self.assertEqual(planner.timeline(10), [T0 + timedelta(minutes=m) for m in range(3)])
+
+    def test_jitter_stays_within_bounds(self):
+        timeline = self.planner(T0, jitter=0.3).timeline(50)
+        gaps = [(b - a).total_seconds() for a, b in zip(timeline, timeline[1:])]
+        self.assertTrue(all(60 <= gap <= 78 for gap in gaps), gaps)
+        self.assertEqual(timeline, self.planner(T0, jitter=0.3).timeline(50))
+
+    def test_empty_window_plans_nothing(self):
+        self.assertEqual(self.planner(T0, business_hours_only=True, start_hour=17, end_hour=9).timeline(3), [])
+        self.assertEqual(self.planner(T0, daily_limit=0).timeline(3), [])
+
+    def test_shards_split_one_timeline(self):
+        full = self.planner(T0).timeline(6)
+        shards = [SendPlanner({}, delay=60, now=T0, seed=7, jitter=0, shard=(i, 2)).timeline(3) for i in range(2)]
+        self.assertEqual(shards, [full[0::2], full[1::2]])
+
+    def test_stall_keeps_the_gap(self):
+        clock = [T0]
+        slots = SendPlanner({}, delay=60, now=T0, jitter=0, clock=lambda: clock[0]).slots()
+        self.assertEqual(next(slots), T0)
+        clock[0] = T0 + timedelta(minutes=5)  # the first send hung for five minutes
+        self.assertEqual(next(slots), T0 + timedelta(minutes=1))  # overdue: used right away
+        self.assertEqual(next(slots), T0 + timedelta(minutes=6))
+        clock[0] = T0 + timedelta(minutes=6)
+        self.assertEqual(next(slots), T0 + timedelta(minutes=7))
+
+class RetryBackoffTest(unittest.TestCase):
+    SETTINGS = {"retry_max_attempts": 3, "retry_base_minutes": 5, "retry_max_minutes": 30, "retry_interleave": 4}
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.queue = RetryQueue(os.path.join(self.workdir.name, "retry_queue.db"), settings=self.SETTINGS)
+        self.lead = Lead(first_name="Ada", email="Ada@Example.com", company="Acme")
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        high = [backoff_delay(n, 5, 30, _Edge(True)) for n in range(1, 6)]
+        self.assertEqual(high, [300, 600, 1200, 1800, 1800])
+        self.assertEqual(backoff_delay(3, 5, 30, _Edge(False)), 600)  # half fixed, half jitter
+
+    def attempts_after_retry(self, due_at):
+        taken = self.queue.take(now=due_at)
+        self.assertIsNotNone(taken)
+        lead, attempts = taken
+        self.assertEqual(lead.email, self.lead.email)
+        return attempts
+
+    def test_attempts_count_up_to_dead(self):
+        status, due_at = self.queue.record_failure(self.lead, "send", TimeoutError(), now=1000)
+        self.assertEqual(status, "pending")
+        self.assertTrue(1000 + 150 <= due_at <= 1000 + 300)
+        self.assertEqual(self.attempts_after_retry(due_at), 1)
+
+        status, due_at = self.queue.record_failure(self.lead, "send", TimeoutError(), now=2000)
+        self.assertTrue(2000 + 300 <= due_at <= 2000 + 600)
+        self.assertEqual(self.attempts_after_retry(due_at), 2)
+
+        self.assertEqual(self.queue.record_failure(self.lead, "send", TimeoutError(), now=3000), ("dead", None))
+        self.assertEqual(self.queue.stats()["dead"], 1)
+
+    def test_sender_failures_are_not_counted(self):
+        refused = smtplib.SMTPSenderRefused(553, b"sender rejected", "outreach@example.com")
+        for now in (1000, 2000, 3000, 4000):
+            status, due_at = self.queue.record_failure(self.lead, "send", refused, now=now)
+            self.assertEqual(status, "pending")
+            self.assertEqual(self.attempts_after_retry(due_at), 0)
+
+    def test_permanent_failure_is_dead_at_once(self):
+        self.assertEqual(self.queue.record_failure(self.lead, "llm", ValueError("no email"), now=1000), ("dead", None))
+        self.assertIsNone(self.queue.take(now=10 ** 10))
+        self.assertEqual(self.queue.requeue(), 1)
+        self.assertEqual(self.attempts_after_retry(10 ** 10), 0)
+
+if __name__ == "__main__":
+    unittest.main()
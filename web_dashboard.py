@@ -3,42 +3,67 @@ import sys
 import json
 import logging
 import signal
-import subprocess
 import threading
 import time
-import pandas as pd
 from datetime import datetime, timedelta
-import pytz
-import math
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, Response, g, render_template, jsonify, request, send_from_directory
 from dotenv import load_dotenv
 from core.agents.audit_agent import AuditAgent
-from core.agents.discovery_agent import DiscoveryAgent
-from core.agents.templates import EmailTemplates
-
-DISCOVERY_LOG = "logs/discovery_results.json"
+from core.agents.lead import LEAD_FIELDS, leads_from_frame
+from core.utils.discovery_store import DiscoveryStore
+from core.utils.dedup_index import get_dedup_index, QUEUE, DISCOVERY, OUTREACH
+from core.scheduler.send_worker import SendWorker
+from core.scheduler.engine import Scheduler, ConfigWatcher, schedules_from_config, first_run_time
+from core.utils.config import SCHEDULE_CONFIG, schedule_config
+from core.utils import columnar, metrics
 
 app = Flask(__name__, template_folder='ui/templates')
 
-def sanitize_data(obj):
-    """Recursively replace NaN with None for JSON compatibility"""
-    if isinstance(obj, float) and math.isnan(obj):
-        return None
-    if isinstance(obj, dict):
-        return {k: sanitize_data(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [sanitize_data(i) for i in obj]
-    return obj
+# Shared append-only discovery history (logs/discovery_results.jsonl)
+discovery_store = DiscoveryStore()
+
+# Shared dedup index over the queue, discovery history and outreach log
+dedup_index = get_dedup_index()
+
+QUEUE_CSV_COLUMNS = ['first_name', 'email', 'company', 'role_hiring_for', 'linkedin', 'phone']
+
+def append_to_queue_csv(rows, csv_path="data/recruiters.csv"):
+    """
+    Append lead rows to the queue CSV, creating it if needed.
+    Only the header is read; the file is rewritten solely when an old
+    queue is missing the linkedin/phone columns.
+    """
+    import pandas as pd
+    new_df = pd.DataFrame(rows, columns=QUEUE_CSV_COLUMNS)
+    
+    if not os.path.exists(csv_path):
+        os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        new_df.to_csv(csv_path, index=False)
+        return
+    
+    with open(csv_path, 'r', newline='') as f:
+        header = f.readline().strip().split(',')
+    
+    if 'linkedin' not in header or 'phone' not in header:
+        existing_df = pd.read_csv(csv_path)
+        for col in ('linkedin', 'phone'):
+            if col not in existing_df.columns:
+                existing_df[col] = ''
+        existing_df.to_csv(csv_path, index=False)
+        header = list(existing_df.columns)
+    
+    new_df.reindex(columns=header).to_csv(csv_path, mode='a', header=False, index=False)
 
 def get_stats():
     """Get dashboard statistics"""
+    import pandas as pd
     audit_agent = AuditAgent()
     stats = audit_agent.get_stats()
     
     # Get template stats
     template_stats = {}
     if os.path.exists("logs/outreach_log.csv"):
-        df = pd.read_csv("logs/outreach_log.csv")
+        df = audit_agent.read_log(['status', 'template_used'])
         if 'template_used' in df.columns and not df.empty:
             for template in df['template_used'].dropna().unique():
                 template_df = df[df['template_used'] == template]
@@ -59,7 +84,7 @@ def get_stats():
     # Get scheduled emails
     scheduled = []
     if os.path.exists("logs/outreach_log.csv"):
-        df = pd.read_csv("logs/outreach_log.csv")
+        df = audit_agent.read_log(['status', 'timestamp'])
         if not df.empty and 'timestamp' in df.columns:
             df['timestamp'] = pd.to_datetime(df['timestamp'])
             last_sent = df[df['status'] == 'SENT'].sort_values('timestamp', ascending=False)
@@ -96,9 +121,7 @@ def index():
 @app.route('/api/stats')
 def api_stats():
     """API endpoint for dashboard data"""
-    data = get_stats()
-    sanitized_data = sanitize_data(data)
-    response = jsonify(sanitized_data)
+    response = jsonify(get_stats())
     response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '0'
@@ -120,9 +143,20 @@ def add_lead():
             if field not in data:
                 return jsonify({"error": f"Missing field: {field}"}), 400
         
+        # Skip leads already queued or contacted (outreach entries checked against the log first)
+        AuditAgent().sync_index()
+        new_leads, _ = dedup_index.filter_new([data], QUEUE, against=(QUEUE, OUTREACH), record=False)
+        if not new_leads:
+            if not dedup_index.canonical(data['email']):
+                return jsonify({"error": f"Invalid email: {data['email']}"}), 400
+            if dedup_index.contains(data['email'], (OUTREACH,)):
+                return jsonify({"status": "duplicate", "source": OUTREACH,
+                                "message": f"{data['email']} was already contacted"}), 200
+            return jsonify({"status": "duplicate", "source": QUEUE,
+                            "message": f"{data['email']} already in queue"}), 200
+        
         # Add to recruiters.csv
-        csv_path = "data/recruiters.csv"
-        new_row = pd.DataFrame([{
+        append_to_queue_csv([{
             'first_name': data['first_name'],
             'email': data['email'],
             'company': data['company'],
@@ -130,25 +164,7 @@ def add_lead():
             'linkedin': data.get('linkedin', ''),
             'phone': data.get('phone', '')
         }])
-        
-        if os.path.exists(csv_path):
-            # Check if we need to add missing columns
-            existing_df = pd.read_csv(csv_path)
-            changed = False
-            if 'linkedin' not in existing_df.columns:
-                existing_df['linkedin'] = ''
-                changed = True
-            if 'phone' not in existing_df.columns:
-                existing_df['phone'] = ''
-                changed = True
-            
-            if changed:
-                existing_df.to_csv(csv_path, index=False)
-            
-            new_row.to_csv(csv_path, mode='a', header=False, index=False)
-        else:
-            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-            new_row.to_csv(csv_path, index=False)
+        dedup_index.add(data['email'], QUEUE)
             
         return jsonify({"status": "success", "message": "Lead added to ReachAI queue"}), 201
         
@@ -161,6 +177,9 @@ def discover_leads():
     try:
         query = request.json.get('query')
         max_domains = request.json.get('max_domains', 5)  # Limit credit usage
+        filters = request.json.get('filters')  # Optional Hunter.io department/seniority/type/paging
+        skip_searched = request.json.get('skip_searched', False)  # Don't re-mine known domains
+        refresh = request.json.get('refresh', False)  # Bypass the AI company cache
         
         if not query:
             return jsonify({"error": "No query provided"}), 400
@@ -171,17 +190,10 @@ def discover_leads():
             progress_logs.append({"message": message, "type": msg_type})
             print(f"[Discovery] {message}")
         
+        from core.agents.discovery_agent import DiscoveryAgent
         agent = DiscoveryAgent(progress_callback=progress_callback)
-        leads = agent.run_discovery(query, max_domains=max_domains)
-        
-        # Persist results
-        current_data = []
-        if os.path.exists(DISCOVERY_LOG):
-            with open(DISCOVERY_LOG, 'r') as f:
-                try:
-                    current_data = json.load(f)
-                except:
-                    pass
+        leads = agent.run_discovery(query, max_domains=max_domains, filters=filters,
+                                    skip_searched=skip_searched, use_cache=not refresh)
         
         # Add timestamp and query info to each lead for the dashboard
         timestamp = datetime.now().isoformat()
@@ -190,18 +202,15 @@ def discover_leads():
             if 'search_query' not in lead:
                 lead['search_query'] = query
         
-        # Prepend new leads to keep history
-        updated_data = leads + current_data
-        # Limit history to 1000 leads
-        updated_data = updated_data[:1000]
-        
-        os.makedirs(os.path.dirname(DISCOVERY_LOG), exist_ok=True)
-        with open(DISCOVERY_LOG, 'w') as f:
-            json.dump(updated_data, f, indent=2)
+        # Persist results (append-only, full history is kept); skip emails already discovered
+        new_leads, _ = dedup_index.filter_new(leads, DISCOVERY, record=False)
+        discovery_store.append(new_leads)
+        dedup_index.add_many([lead['email'] for lead in new_leads], DISCOVERY)
         
         return jsonify({
             "status": "success", 
             "leads_found": len(leads), 
+            "new_leads": len(new_leads),
             "leads": leads,
             "progress": progress_logs,
             "errors": agent.errors
@@ -216,22 +225,21 @@ def discover_leads():
 
 @app.route('/api/discover/results', methods=['GET'])
 def get_discovery_results():
-    """Retrieve history of discovered leads"""
-    if os.path.exists(DISCOVERY_LOG):
-        with open(DISCOVERY_LOG, 'r') as f:
-            try:
-                data = json.load(f)
-                return jsonify(sanitize_data(data))
-            except:
-                return jsonify([])
-    return jsonify([])
+    """
+    One page of discovered leads, newest first: ?limit=N (default 50, at
+    most 500) and ?cursor= from the previous page's next_cursor.
+    """
+    limit = max(min(request.args.get('limit', 50, type=int), 500), 1)
+    cursor = request.args.get('cursor', type=int)
+    leads, next_cursor = discovery_store.page(cursor=cursor, limit=limit)
+    return jsonify({"leads": leads, "next_cursor": next_cursor, "total": len(discovery_store)})
 
 @app.route('/api/discover/clear', methods=['POST'])
 def clear_discovery():
     """Clear all discovered leads"""
     try:
-        if os.path.exists(DISCOVERY_LOG):
-            os.remove(DISCOVERY_LOG)
+        discovery_store.clear()
+        dedup_index.clear_source(DISCOVERY)
         return jsonify({"status": "success", "message": "Discovery results cleared"})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
@@ -240,7 +248,7 @@ def clear_discovery():
 def toggle_scheduler():
     """Enable or disable the scheduler"""
     try:
-        from utils.config import load_schedule_config, save_schedule_config
+        from core.utils.config import load_schedule_config, save_schedule_config
         config = load_schedule_config()
         
         # Toggle current state
@@ -275,27 +283,16 @@ def fetch_hunter_leads():
     
     print("🔍 Fetching leads from Hunter.io Leads Database (FREE)...")
     
-    # Load existing leads to check for duplicates
-    existing_emails = set()
-    existing_leads = []
-    if os.path.exists(DISCOVERY_LOG):
-        try:
-            with open(DISCOVERY_LOG, 'r') as f:
-                existing_leads = json.load(f)
-                existing_emails = {lead.get('email', '').lower() for lead in existing_leads if lead.get('email')}
-        except:
-            pass
-    
-    print(f"📊 Found {len(existing_emails)} existing leads in database")
+    existing_count = len(discovery_store)
+    print(f"📊 Found {existing_count} existing leads in database")
     
     all_leads = []
     offset = 0
     limit = 100  # Max per request
-    max_leads = 1000  # Increased limit to store all leads
     total_from_hunter = 0
     
     try:
-        while len(all_leads) < max_leads:
+        while True:
             url = f"https://api.hunter.io/v2/leads?api_key={api_key}&offset={offset}&limit={limit}"
             
             response = requests.get(url, timeout=15)
@@ -343,29 +340,17 @@ def fetch_hunter_leads():
         print(f"❌ Exception: {e}")
         return jsonify({"error": str(e)}), 500
     
-    # Filter out duplicates
-    new_leads = []
-    skipped_count = 0
-    for lead in all_leads:
-        email = (lead.get('email') or '').lower()
-        if email and email not in existing_emails:
-            new_leads.append(lead)
-            existing_emails.add(email)  # Prevent duplicates within this batch
-        else:
-            skipped_count += 1
+    # Filter out duplicates (O(1) lookups against the shared dedup index)
+    new_leads, skipped_count = dedup_index.filter_new(all_leads, DISCOVERY, record=False)
     
     print(f"📧 Hunter.io has {total_from_hunter} total leads")
     print(f"✅ New leads to import: {len(new_leads)}")
     print(f"⏭️  Skipped (already exists): {skipped_count}")
     
     if new_leads:
-        # Merge with existing leads (new ones first)
-        combined_leads = new_leads + existing_leads
-        
-        # Save to discovery log
-        os.makedirs(os.path.dirname(DISCOVERY_LOG), exist_ok=True)
-        with open(DISCOVERY_LOG, 'w') as f:
-            json.dump(combined_leads, f, indent=2)
+        # Append to discovery log (newest rows are read first)
+        discovery_store.append(new_leads)
+        dedup_index.add_many([lead['email'] for lead in new_leads], DISCOVERY)
         
         message = f"✅ Imported {len(new_leads)} NEW leads | ⏭️ Skipped {skipped_count} (already exist)"
     else:
@@ -376,7 +361,7 @@ def fetch_hunter_leads():
         "total_in_hunter": total_from_hunter,
         "new_leads": len(new_leads),
         "skipped": skipped_count,
-        "total_in_database": len(existing_leads) + len(new_leads),
+        "total_in_database": existing_count + len(new_leads),
         "message": message
     })
 
@@ -390,38 +375,28 @@ def get_queue_status():
         if not os.path.exists(csv_path):
             return jsonify({"queue": []})
         
-        df = pd.read_csv(csv_path)
+        leads = leads_from_frame(columnar.read_csv(csv_path))
         
-        # Get outreach log to check status
+        # Latest logged status per address (email/status columns only)
         audit_agent = AuditAgent()
-        log_df = None
+        latest = {}
         if os.path.exists("logs/outreach_log.csv"):
-            log_df = pd.read_csv("logs/outreach_log.csv")
+            log_df = audit_agent.read_log(['email', 'status']).dropna()
+            latest = dict(zip(log_df['email'], log_df['status']))
         
         # Build queue with status
         queue = []
-        for _, row in df.iterrows():
-            email = row['email']
-            
+        for lead in leads:
             # Check if contacted
             status = 'pending'
-            if log_df is not None and not log_df.empty:
-                matches = log_df[log_df['email'] == email]
-                if not matches.empty:
-                    latest_status = matches.iloc[-1]['status']
-                    status = latest_status.lower()
+            if lead.email in latest:
+                status = latest[lead.email].lower()
             
-            queue.append({
-                "first_name": row['first_name'],
-                "email": email,
-                "company": row['company'],
-                "role_hiring_for": row['role_hiring_for'],
-                "linkedin": row.get('linkedin', '') if 'linkedin' in row.index else '',
-                "phone": row.get('phone', '') if 'phone' in row.index else '',
-                "status": status
-            })
+            record = {field: getattr(lead, field) for field in LEAD_FIELDS}
+            record["status"] = status
+            queue.append(record)
         
-        return jsonify(sanitize_data({"queue": queue}))
+        return jsonify({"queue": queue})
         
     except Exception as e:
         print(f"Queue status error: {e}")
@@ -446,13 +421,8 @@ def get_send_history():
 
 @app.route('/api/send-now', methods=['POST'])
 def send_now():
-    """Trigger immediate email sending using existing main.py logic"""
-    global active_process
-    
+    """Queue an immediate send batch on the in-process send worker"""
     try:
-        import subprocess
-        import sys
-        
         data = request.json
         count = data.get('count', 5)
         
@@ -485,30 +455,16 @@ def send_now():
         if count < 1 or count > 30:
             return jsonify({"error": "Count must be between 1 and 30"}), 400
         
-        # Check if already running (and clean up completed processes)
-        if active_process:
-            poll_result = active_process.poll()
-            if poll_result is None:
-                # Process is actually running
-                pid = active_process.pid
-                msg = f"Email sending already in progress (PID: {pid}). Please wait for it to finish."
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] ⚠️  Send blocked - {msg}")
-                return jsonify({"error": msg, "pid": pid}), 409
-            else:
-                # Process completed, clean up
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 🧹 Cleaned up completed process {active_process.pid}")
-                active_process = None
-
         # Pre-send Validation: Check how many leads are actually pending
         try:
-            from agents.audit_agent import AuditAgent
-            from agents.data_agent import DataAgent
+            from core.agents.audit_agent import AuditAgent
+            from core.agents.data_agent import DataAgent
             
             data_agent = DataAgent("data/recruiters.csv")
             audit_agent = AuditAgent()
             
-            all_leads = data_agent.load_data()
-            pending_leads = [l for l in all_leads if not audit_agent.has_been_contacted(l['email'])]
+            # Stops reading as soon as `count` uncontacted leads are found
+            pending_leads = data_agent.pending_leads(audit_agent.contacted_mask, limit=count)
             
             if not pending_leads:
                 msg = "No pending leads found in your queue! All leads in recruiters.csv have already been contacted."
@@ -518,46 +474,32 @@ def send_now():
                     "details": "Add more leads in the Discovery tab or clean your log to re-send."
                 }), 400
             
-            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Validation Passed: {len(pending_leads)} pending leads available.")
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Validation Passed: {len(pending_leads)} of {count} requested leads pending.")
         except Exception as e:
             print(f"Warning: Pre-send validation skipped due to error: {e}")
         
-        # Use existing main.py with proper arguments including --limit
-        env = os.environ.copy()
-        env['SKIP_INBOX_CHECK'] = 'true'  # Skip inbox for faster sending
-        
-        # Build command with --limit for batch control and --force for manual override
-        cmd = [
-            sys.executable,
-            "main.py",
-            "--bio", "Rikin Shah",
-            "--csv", "data/recruiters.csv",
-            "--limit", str(count),
-            "--delay", "30",
-            "--force"
-        ]
+        # Same batch main.py --limit N --delay 30 --force would run, minus the process spawn
+        params = {
+            "csv_path": "data/recruiters.csv",
+            "bio": "Rikin Shah",
+            "limit": count,
+            "delay": 30,
+            "force": True,
+            "skip_inbox": True  # Skip inbox for faster sending (follow-ups then wait for a run that checks it)
+        }
+        queued_behind = send_worker.current_job_id
+        job_id = send_worker.submit(params, source="manual")
         
         print(f"\n{'='*60}")
-        print(f"🚀 MANUAL SEND triggered at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🚀 MANUAL SEND queued at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"📧 Count: {count} emails")
-        print(f"⚡ Command: {' '.join(cmd)}")
-        print(f"{'='*60}")
-        
-        # Start process in background
-        active_process = subprocess.Popen(
-            cmd,
-            cwd=os.getcwd(),
-            env=env
-            # Removed PIPE to allow direct terminal output on Windows
-        )
-        
-        print(f"✅ Send process started (PID: {active_process.pid})")
-        print(f"📊 Activity will appear in terminal and Activity tab")
+        print(f"🆔 Job: {job_id}" + (f" (queued behind {queued_behind})" if queued_behind else ""))
         print(f"{'='*60}\n")
 
         return jsonify({
             "status": "success",
-            "message": f"Started sending emails to top {count} pending leads. Check terminal and Activity tab for results."
+            "job_id": job_id,
+            "message": f"Queued sending to top {count} pending leads (job {job_id}). Check the Activity tab for results."
         })
             
     except Exception as e:
@@ -568,8 +510,8 @@ def send_now():
 def get_templates():
     """Get all email templates with resume mappings"""
     try:
-        from agents.templates import EmailTemplates
-        from utils.config import load_template_config
+        from core.agents.templates import EmailTemplates
+        from core.utils.config import load_template_config
         
         # Load resume mappings from config
         template_config = load_template_config()
@@ -594,7 +536,7 @@ def get_templates():
                 'resume': resume
             })
         
-        return jsonify(sanitize_data({'templates': templates}))
+        return jsonify({'templates': templates})
     except Exception as e:
         print(f"Templates error: {e}")
         return jsonify({"templates": [], "error": str(e)})
@@ -603,7 +545,7 @@ def get_templates():
 def save_template():
     """Save template configuration"""
     try:
-        from utils.config import load_template_config, save_template_config
+        from core.utils.config import load_template_config, save_template_config
         
         data = request.json
         template_key = data.get('key')
@@ -637,7 +579,7 @@ def save_template():
 def get_schedule():
     """Get schedule configuration"""
     try:
-        from utils.config import load_schedule_config
+        from core.utils.config import load_schedule_config
         config = load_schedule_config()
         return jsonify(config)
     except Exception as e:
@@ -646,14 +588,29 @@ def get_schedule():
 
 @app.route('/api/schedule/save', methods=['POST'])
 def save_schedule():
-    """Save schedule configuration"""
+    """
+    Save schedule settings. The posted keys are merged into the current
+    config, so a form that only edits some of them leaves the rest
+    (schedules, follow_up_days, retry_*) alone; a key posted as null is
+    removed.
+    """
     try:
-        from utils.config import save_schedule_config
+        from core.utils.config import load_schedule_config, save_schedule_config
         
-        data = request.json
-        save_schedule_config(data)
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid schedule: expected a JSON object"}), 400
+        config = load_schedule_config()
+        for key, value in data.items():
+            if value is None:
+                config.pop(key, None)
+            else:
+                config[key] = value
+        save_schedule_config(config)
         
         return jsonify({"status": "success", "message": "Schedule settings saved"})
+    except ValueError as e:
+        return jsonify({"error": f"Invalid schedule: {e}"}), 400
     except Exception as e:
         print(f"Save schedule error: {e}")
         return jsonify({"error": str(e)}), 500
@@ -662,6 +619,7 @@ def save_schedule():
 def remove_lead():
     """Remove a lead from the queue (CSV)"""
     try:
+        import pandas as pd
         data = request.json
         email_to_remove = data.get('email')
         
@@ -682,6 +640,7 @@ def remove_lead():
             return jsonify({"error": "Lead not found"}), 404
         
         df.to_csv(csv_path, index=False)
+        dedup_index.remove(email_to_remove, QUEUE)
         return jsonify({"status": "success", "message": f"Removed {email_to_remove}"}), 200
         
     except Exception as e:
@@ -691,6 +650,7 @@ def remove_lead():
 def remove_all_leads_from_queue():
     """Remove all pending leads from the queue"""
     try:
+        import pandas as pd
         csv_path = "data/recruiters.csv"
         if not os.path.exists(csv_path):
             return jsonify({"status": "success", "message": "Queue already empty", "count": 0})
@@ -702,16 +662,18 @@ def remove_all_leads_from_queue():
         log_path = "logs/outreach_log.csv"
         contacted_emails = set()
         if os.path.exists(log_path):
-            log_df = pd.read_csv(log_path)
+            log_df = columnar.read_csv(log_path, ['email'])
             if not log_df.empty:
                 contacted_emails = set(log_df['email'].unique())
         
         original_count = len(df)
         # Keep leads that ARE in contacted_emails
+        removed_emails = df.loc[~df['email'].isin(contacted_emails), 'email']
         df = df[df['email'].isin(contacted_emails)]
         removed_count = original_count - len(df)
         
         df.to_csv(csv_path, index=False)
+        dedup_index.remove_many(removed_emails, QUEUE)
         return jsonify({
             "status": "success", 
             "message": f"Removed {removed_count} pending leads", 
@@ -731,33 +693,17 @@ def import_all_leads():
         if not leads:
             return jsonify({"error": "No leads provided"}), 400
         
-        csv_path = "data/recruiters.csv"
-        
-        # Read existing CSV
-        if os.path.exists(csv_path):
-            existing_df = pd.read_csv(csv_path)
-            existing_emails = set(existing_df['email'].values)
-        else:
-            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
-            existing_emails = set()
-        
-        # Filter out duplicates
-        new_leads = []
-        duplicates_count = 0
-        for lead in leads:
-            if lead['email'] in existing_emails:
-                duplicates_count += 1
-                continue
-                
-            new_leads.append({
-                'first_name': lead['first_name'],
-                'email': lead['email'],
-                'company': lead['company'],
-                'role_hiring_for': lead['role_hiring_for'],
-                'linkedin': lead.get('linkedin', ''),
-                'phone': lead.get('phone', '')
-            })
-            existing_emails.add(lead['email'])
+        # Filter out duplicates against the queue and outreach history
+        AuditAgent().sync_index()
+        unique_leads, duplicates_count = dedup_index.filter_new(leads, QUEUE, against=(QUEUE, OUTREACH), record=False)
+        new_leads = [{
+            'first_name': lead['first_name'],
+            'email': lead['email'],
+            'company': lead['company'],
+            'role_hiring_for': lead['role_hiring_for'],
+            'linkedin': lead.get('linkedin', ''),
+            'phone': lead.get('phone', '')
+        } for lead in unique_leads]
         
         if not new_leads:
             return jsonify({
@@ -768,25 +714,8 @@ def import_all_leads():
             }), 200
         
         # Append to CSV
-        new_df = pd.DataFrame(new_leads)
-        
-        if os.path.exists(csv_path):
-            # Check if we need to add missing columns
-            existing_df = pd.read_csv(csv_path)
-            changed = False
-            if 'linkedin' not in existing_df.columns:
-                existing_df['linkedin'] = ''
-                changed = True
-            if 'phone' not in existing_df.columns:
-                existing_df['phone'] = ''
-                changed = True
-            
-            if changed:
-                existing_df.to_csv(csv_path, index=False)
-                
-            new_df.to_csv(csv_path, mode='a', header=False, index=False)
-        else:
-            new_df.to_csv(csv_path, index=False)
+        append_to_queue_csv(new_leads)
+        dedup_index.add_many([lead['email'] for lead in new_leads], QUEUE)
         
         msg = f"Imported {len(new_leads)} leads."
         if duplicates_count > 0:
@@ -802,6 +731,80 @@ def import_all_leads():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def csv_importer():
+    """core/csv-importer, loaded on first use to keep dashboard start-up light"""
+    import importlib
+    return importlib.import_module("core.csv-importer")
+
+_upload_jobs = None
+
+def get_upload_jobs():
+    global _upload_jobs
+    if _upload_jobs is None:
+        _upload_jobs = csv_importer().UploadJobs()
+    return _upload_jobs
+
+@app.route('/api/leads/uploads', methods=['POST'])
+def create_lead_upload():
+    """
+    Start a CSV upload: returns a job id to POST the file to
+    (multipart/form-data, field "file") and to poll for progress.
+        curl -X POST localhost:5001/api/leads/uploads
+        curl -F file=@leads.csv localhost:5001/api/leads/uploads/<job_id>
+    """
+    return jsonify({"status": "success", "job_id": get_upload_jobs().create()}), 201
+
+@app.route('/api/leads/uploads/<job_id>', methods=['POST'])
+def upload_leads(job_id):
+    """
+    Import an uploaded CSV while it streams in: the multipart body is
+    decoded from the socket and rows are validated, deduped and appended
+    to the queue in batches, so the file is never held in memory.
+    """
+    jobs = get_upload_jobs()
+    if not jobs.get(job_id):
+        return jsonify({"error": f"Unknown upload job {job_id}"}), 404
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        return jsonify({"error": "Expected a multipart/form-data upload"}), 400
+
+    importer = csv_importer()
+    stream = importer.MultipartFileStream(request.stream, boundary)
+    try:
+        has_file = stream.start()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not has_file:
+        return jsonify({"error": "No file field in upload"}), 400
+    if not jobs.start(job_id, stream.filename):
+        return jsonify({"error": f"Upload job {job_id} was already used"}), 409
+
+    try:
+        stats = importer.CSVImporter(
+            dedup_index=dedup_index,
+            progress=lambda stats: jobs.update(job_id, stats),
+            progress_every=0.5,
+        ).import_stream(stream, total_bytes=request.content_length, name=stream.filename or "upload")
+    except ValueError as e:
+        jobs.finish(job_id, error=str(e))
+        return jsonify(jobs.get(job_id)), 400
+    except Exception as e:
+        jobs.finish(job_id, error=str(e))
+        return jsonify(jobs.get(job_id)), 500
+
+    jobs.finish(job_id, stats)
+    print(f"📥 Upload {job_id} ({stream.filename}): imported {stats.imported}, "
+          f"{stats.duplicates} duplicates, {stats.invalid_email + stats.missing_fields} invalid")
+    return jsonify(jobs.get(job_id)), 201
+
+@app.route('/api/leads/uploads/<job_id>', methods=['GET'])
+def get_lead_upload(job_id):
+    """Progress of an upload job (rows, imported, duplicates, bytes read)"""
+    job = get_upload_jobs().get(job_id)
+    if not job:
+        return jsonify({"error": "Upload job not found"}), 404
+    return jsonify(job)
+
 @app.route('/api/download/sample-csv')
 def download_sample_csv():
     """Download a sample CSV template"""
@@ -819,8 +822,111 @@ def download_sample_csv():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-# Global process tracker for scheduler
-active_process = None
+@app.route('/api/send-jobs', methods=['GET'])
+def list_send_jobs():
+    """Recent send jobs with their status and progress"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({"jobs": send_worker.list_jobs(limit=limit), "current": send_worker.current_job_id})
+
+@app.route('/api/senders', methods=['GET'])
+def sender_accounts():
+    """Quota and health of each sender account (null until the pool has been used)"""
+    return jsonify({"accounts": send_worker.sender_status()})
+
+@app.route('/api/follow-ups', methods=['GET'])
+def follow_up_status():
+    """Follow-up sequence counts by status, plus how many steps are due now"""
+    from core.scheduler.sequences import SequenceStore
+    return jsonify(SequenceStore().stats())
+
+@app.route('/api/retries', methods=['GET'])
+def retry_status():
+    """Retry queue counts by status, how many are due now, and when the next one is"""
+    from core.scheduler.retries import RetryQueue
+    queue = RetryQueue()
+    return jsonify(dict(queue.stats(), next_due=queue.next_due()))
+
+@app.route('/api/retries/requeue', methods=['POST'])
+def requeue_retries():
+    """Give dead retries a fresh set of attempts: all of them, or the posted `emails`"""
+    from core.scheduler.retries import RetryQueue
+    data = request.get_json(silent=True) or {}
+    emails = data.get('emails')
+    if emails is not None and not isinstance(emails, list):
+        return jsonify({"error": "emails must be a list"}), 400
+    count = RetryQueue().requeue(emails)
+    return jsonify({"status": "success", "message": f"Requeued {count} dead retries", "count": count})
+
+@app.route('/api/send-jobs/<job_id>', methods=['GET'])
+def get_send_job(job_id):
+    """Status and per-lead progress of one send job"""
+    job = send_worker.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/api/send-jobs/<job_id>/cancel', methods=['POST'])
+def cancel_send_job(job_id):
+    """Cancel a queued job or stop the running one after the current email"""
+    if not send_worker.cancel(job_id):
+        return jsonify({"error": "Job is not queued or running"}), 409
+    return jsonify({"status": "success", "message": f"Cancellation requested for job {job_id}"})
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timings and counters in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+# --- Profiling ---
+# Opt in per request with ?profile=1 (or X-Profile: 1); "memory" also
+# records tracemalloc growth. The profile id comes back in X-Profile-Id.
+
+@app.before_request
+def start_request_profile():
+    mode = request.args.get('profile') or request.headers.get('X-Profile')
+    if not mode or mode in ('0', 'false'):
+        return
+    from core.utils.profiler import Profiler
+    g.profiler = Profiler(f"{request.method} {request.path}", memory='memory' in mode).start()
+
+@app.after_request
+def finish_request_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler:
+        meta = profiler.stop()
+        response.headers['X-Profile-Id'] = meta['id']
+    return response
+
+@app.teardown_request
+def abort_request_profile(exc):
+    # after_request is skipped when a view raises; still write the profile
+    profiler = g.pop('profiler', None)
+    if profiler:
+        profiler.stop()
+
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    """Recent pipeline/request profiles, newest first"""
+    from core.utils.profiler import list_profiles as recent_profiles
+    return jsonify({"profiles": recent_profiles(limit=request.args.get('limit', 50, type=int))})
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+@app.route('/api/profiles/<profile_id>/<kind>', methods=['GET'])
+def get_profile(profile_id, kind='report'):
+    """One profile artifact: report (text), collapsed (folded stacks), prof (pstats) or meta"""
+    from flask import send_file
+    from core.utils.profiler import profile_path
+    path = profile_path(profile_id, kind)
+    if not path:
+        return jsonify({"error": "Profile not found"}), 404
+    if kind == 'prof':
+        return send_file(os.path.abspath(path), as_attachment=True, download_name=f"{profile_id}.prof")
+    mimetype = "application/json" if kind == 'meta' else "text/plain"
+    with open(path, 'r') as f:
+        return Response(f.read(), mimetype=mimetype)
+
+# In-process send worker (warm agents, persistent job queue in logs/send_jobs.db)
+send_worker = SendWorker()
 
 # Global scheduler state
 scheduler_state = {
@@ -834,11 +940,16 @@ scheduler_state = {
 @app.route('/api/scheduler/status', methods=['GET'])
 def get_scheduler_status():
     """Return scheduler status with current config"""
-    from utils.config import load_schedule_config
+    from core.utils.config import load_schedule_config
     config = load_schedule_config()
     
     # Include config in response so frontend always shows latest settings
     response = dict(scheduler_state)
+    if response["status"] == "Active":
+        response["next_check"], message = describe_next_run()
+        if response["next_check"]:
+            response["message"] = message
+    response['schedules'] = [job.to_dict() for job in schedule_engine.jobs()]
     response['config'] = {
         'start_time': config.get('start_time', ''),
         'batch_interval': config.get('batch_interval', 60),
@@ -848,153 +959,121 @@ def get_scheduler_status():
     return jsonify(response)
 
 
+@app.route('/api/scheduler/plan', methods=['GET'])
+def get_send_plan():
+    """The next `count` planned dispatch times under the current schedule config"""
+    from main import build_planner
+    from core.agents.audit_agent import AuditAgent
+    from core.utils.config import load_schedule_config
+    
+    count = min(request.args.get('count', 20, type=int), 1000)
+    delay = load_schedule_config().get('delay_seconds', 30)
+    planner = build_planner(AuditAgent(), delay)
+    return jsonify({
+        "daily_limit": planner.daily_limit,
+        "sent_today": planner.sent_today,
+        "slots": [slot.strftime("%Y-%m-%d %H:%M:%S") for slot in planner.timeline(count)]
+    })
+
+
 # --- Background Scheduler ---
-def scholarship_scheduler():
-    """Background thread - runs at configured start_time, then repeats at interval"""
-    global active_process, scheduler_state
+# Event-driven: the engine sleeps until the next batch is due and reloads
+# schedules only when config/schedule.json changes.
+schedule_engine = Scheduler()
+
+def make_batch_callback(schedule):
+    """Scheduler callback that queues one batch for `schedule` on the send worker"""
+    def run_batch(job):
+        now = datetime.now()
+        
+        # Check if a batch is already running or queued (retried in 30s)
+        if send_worker.is_busy():
+            job_id = send_worker.current_job_id
+            print(f"[{now.strftime('%H:%M:%S')}] ⏳ Email send already in progress (job: {job_id})")
+            scheduler_state["message"] = f"Sending in progress (job: {job_id})"
+            return False
+        
+        batch_size = schedule["batch_size"]
+        delay = schedule["delay_seconds"]
+        
+        print(f"\n{'='*60}")
+        print(f"🚀 SCHEDULER TRIGGERED [{schedule['name']}] at {now.strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📧 Batch Size: {batch_size} emails")
+        print(f"⏱️  Delay: {delay} seconds")
+        print(f"🔄 Next batch in: {schedule['interval'].total_seconds() / 60:.0f} minutes")
+        print(f"{'='*60}\n")
+        
+        # The batch follows the send-window plan (hours, daily_limit, jitter) inside this campaign
+        job_id = send_worker.submit({
+            "csv_path": "data/recruiters.csv",
+            "bio": "Rikin Shah",
+            "limit": batch_size,
+            "delay": delay,
+            "force": False,
+            "window": {key: schedule[key].isoformat(sep=' ', timespec='seconds')
+                       for key in ("start_time", "end_time") if schedule[key]}
+        }, source=f"scheduler:{schedule['name']}")
+        
+        scheduler_state["last_run"] = now.strftime("%Y-%m-%d %H:%M:%S")
+        scheduler_state["message"] = f"🚀 Running batch ({batch_size} emails)"
+        print(f"[{now.strftime('%H:%M:%S')}] ✅ Queued send job: {job_id}")
+        return True
+    return run_batch
+
+def reload_schedules():
+    """Rebuild the engine's timer queue from config/schedule.json"""
+    from core.utils.config import load_schedule_config
     
-    import time
-    from datetime import datetime, timedelta
-    from utils.config import load_schedule_config
+    now = datetime.now()
+    schedule_engine.clear()
+    
+    try:
+        schedules = schedules_from_config(load_schedule_config())
+    except ValueError as e:
+        print(f"[{now.strftime('%H:%M:%S')}] ❌ Error parsing schedule: {e}")
+        scheduler_state["status"] = "Active"
+        scheduler_state["message"] = f"Invalid start_time: {e}"
+        return
     
-    print("⏰ Scheduler Started - Using start_time datetime with interval repeats")
+    if not schedules:
+        scheduler_state["status"] = "Disabled"
+        scheduler_state["message"] = "Auto-Sending Disabled"
+        print(f"[{now.strftime('%H:%M:%S')}] ⏸️  Scheduler Disabled")
+        return
     
     scheduler_state["status"] = "Active"
-    last_run_time = None  # Track when we last ran to use interval
+    for schedule in schedules:
+        if schedule["end_time"] and now > schedule["end_time"]:
+            continue
+        next_run = first_run_time(schedule, schedule_engine.last_run(schedule["name"]), now)
+        schedule_engine.add_job(schedule["name"], make_batch_callback(schedule), next_run,
+                                interval=schedule["interval"], end_time=schedule["end_time"])
+        print(f"[{now.strftime('%H:%M:%S')}] 📅 [{schedule['name']}] Next run: {next_run.strftime('%Y-%m-%d %H:%M')}")
+    scheduler_state["message"] = "Scheduled"
+
+def describe_next_run():
+    """Human-readable countdown to the next due batch"""
+    upcoming = schedule_engine.next_due()
+    if not upcoming:
+        return None, scheduler_state["message"]
     
-    while True:
-        try:
-            now = datetime.now()
-            
-            # Load config
-            config = load_schedule_config()
-            if not config or not config.get("auto_enabled", False):
-                scheduler_state["status"] = "Disabled"
-                scheduler_state["message"] = "Auto-Sending Disabled"
-                print(f"[{now.strftime('%H:%M:%S')}] ⏸️  Scheduler Disabled")
-                time.sleep(60)
-                continue
-            
-            scheduler_state["status"] = "Active"
-            
-            # Get start_time as full datetime (format: YYYY-MM-DDTHH:MM or YYYY-MM-DD HH:MM)
-            start_time_str = config.get("start_time", "")
-            batch_interval = config.get("batch_interval", 60)  # Minutes between batches
-            
-            # Determine next run time
-            next_run = None
-            start_datetime = None
-            
-            if start_time_str:
-                try:
-                    # Parse the start_time (supports both T and space separators)
-                    clean_start_time = start_time_str.replace("T", " ")
-                    if len(clean_start_time) == 16:  # YYYY-MM-DD HH:MM
-                        start_datetime = datetime.strptime(clean_start_time, "%Y-%m-%d %H:%M")
-                    elif len(clean_start_time) == 10:  # YYYY-MM-DD only
-                        start_datetime = datetime.strptime(clean_start_time, "%Y-%m-%d")
-                    else:
-                        raise ValueError(f"Unknown format: {start_time_str}")
-                    
-                    print(f"[{now.strftime('%H:%M:%S')}] 📅 Config start_time: {start_datetime}")
-                    
-                except Exception as e:
-                    print(f"[{now.strftime('%H:%M:%S')}] ❌ Error parsing start_time '{start_time_str}': {e}")
-                    scheduler_state["message"] = f"Invalid start_time: {start_time_str}"
-                    time.sleep(60)
-                    continue
-            
-            # Logic to determine next run:
-            # 1. If never run, use start_datetime (or now if past/not set)
-            # 2. If start_datetime is in the future, always wait for it (allows reschedule)
-            # 3. Otherwise, use last_run_time + interval
-            
-            if start_datetime and start_datetime > now:
-                # Config start_time is in the future - always respect this (allows reschedule)
-                next_run = start_datetime
-                print(f"[{now.strftime('%H:%M:%S')}] ⏳ Waiting for configured start_time")
-            elif last_run_time is None:
-                # Never run before
-                if start_datetime and now >= start_datetime:
-                    # Start time is in the past - run immediately!
-                    next_run = now
-                    print(f"[{now.strftime('%H:%M:%S')}] ⚡ Start time is in the past - running immediately!")
-                elif start_datetime:
-                    next_run = start_datetime
-                else:
-                    # No start_time set - run now
-                    next_run = now
-            else:
-                # We have run before - use interval from last run
-                next_run = last_run_time + timedelta(minutes=batch_interval)
+    total_seconds = max((upcoming.next_run - datetime.now()).total_seconds(), 0)
+    hours_until = int(total_seconds // 3600)
+    minutes_until = int((total_seconds % 3600) // 60)
+    next_check = upcoming.next_run.strftime("%Y-%m-%d %H:%M:%S")
+    return next_check, f"Next run in {hours_until}h {minutes_until}m at {upcoming.next_run.strftime('%Y-%m-%d %H:%M')}"
 
-            
-            # Calculate time until next run
-            time_until = next_run - now
-            total_seconds = time_until.total_seconds()
-            
-            if total_seconds > 0:
-                hours_until = int(total_seconds // 3600)
-                minutes_until = int((total_seconds % 3600) // 60)
-                scheduler_state["message"] = f"Next run in {hours_until}h {minutes_until}m at {next_run.strftime('%Y-%m-%d %H:%M')}"
-                scheduler_state["next_check"] = next_run.strftime("%Y-%m-%d %H:%M:%S")
-                print(f"[{now.strftime('%H:%M:%S')}] 📅 Next run: {next_run.strftime('%Y-%m-%d %H:%M')} ({hours_until}h {minutes_until}m)")
-                time.sleep(30)  # Check every 30 seconds
-                continue
-            
-            # Time to run!
-            # Check if process is already running
-            if active_process and active_process.poll() is None:
-                print(f"[{now.strftime('%H:%M:%S')}] ⏳ Email send already in progress (PID: {active_process.pid})")
-                scheduler_state["message"] = f"Sending in progress (PID: {active_process.pid})"
-                time.sleep(30)
-                continue
-            
-            # Execute batch
-            batch_size = config.get("batch_size", 5)
-            delay = config.get("delay_seconds", 30)
-            
-            print(f"\n{'='*60}")
-            print(f"🚀 SCHEDULER TRIGGERED at {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"📧 Batch Size: {batch_size} emails")
-            print(f"⏱️  Delay: {delay} seconds")
-            print(f"🔄 Next batch in: {batch_interval} minutes")
-            print(f"{'='*60}\n")
-            
-            scheduler_state["message"] = f"🚀 Running batch ({batch_size} emails)"
-            
-            cmd = [sys.executable, "main.py", "--limit", str(batch_size), "--delay", str(delay), "--bio", "Rikin Shah", "--force"]
-            
-            # Set environment
-            env = os.environ.copy()
-            if config.get("daily_limit"):
-                env["DAILY_EMAIL_LIMIT"] = str(config.get("daily_limit"))
-            
-            # Start process - don't capture stdout so it streams to terminal
-            active_process = subprocess.Popen(
-                cmd,
-                cwd=os.getcwd(),
-                env=env
-            )
-            
-            # Mark last run time
-            last_run_time = now
-            scheduler_state["last_run"] = now.strftime("%Y-%m-%d %H:%M:%S")
-            print(f"[{now.strftime('%H:%M:%S')}] ✅ Started process PID: {active_process.pid}")
-            
-            # Wait before next check
-            time.sleep(30)
+# Saves through the config store reload immediately; the watcher only
+# has to notice edits made to the file by hand
+schedule_config.subscribe(lambda config: reload_schedules())
+config_watcher = ConfigWatcher(SCHEDULE_CONFIG, schedule_config.refresh)
 
-            
-        except Exception as e:
-            print(f"❌ Scheduler Error: {e}")
-            import traceback
-            traceback.print_exc()
-            scheduler_state["message"] = f"Error: {str(e)}"
-            time.sleep(60)
-
-# Start Scheduler
-threading.Thread(target=scholarship_scheduler, daemon=True).start()
+# Start send worker and scheduler
+send_worker.start()
+print("⏰ Scheduler Started - event-driven, wakes at the next due batch")
+reload_schedules()
+schedule_engine.start()
+config_watcher.start()
 
 if __name__ == '__main__':
     print("🚀 Starting Web Dashboard...")